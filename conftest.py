@@ -0,0 +1,16 @@
+"""
+Shared test setup: one QApplication for the whole run
+
+Widget tests need a QApplication, and Qt allows a single application per
+process; it has to exist before the tests that only need a
+QCoreApplication are imported and create one of their own.
+"""
+
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication(sys.argv)
@@ -24,19 +24,6 @@ class MockGPIO:
 sys.modules['RPi'] = type(sys)('RPi')
 sys.modules['RPi.GPIO'] = MockGPIO()
 
-# Mock gpsd
-class MockGPSD:
-    def connect(self): pass
-    def get_current(self): 
-        class Packet:
-            mode = 0
-            lat = 0
-            lon = 0
-            hspeed = 0
-        return Packet()
-
-sys.modules['gpsd'] = MockGPSD()
-
 # Import QtWebEngine first (must be before QApplication)
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWidgets import QApplication
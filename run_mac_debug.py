@@ -24,24 +24,32 @@ class MockGPIO:
 sys.modules['RPi'] = type(sys)('RPi')
 sys.modules['RPi.GPIO'] = MockGPIO()
 
-# Mock gpsd
-class MockGPSD:
-    def connect(self): pass
-    def get_current(self): 
-        class Packet:
-            mode = 0
-            lat = 0
-            lon = 0
-            hspeed = 0
-        return Packet()
-
-sys.modules['gpsd'] = MockGPSD()
+# Stand in for gpsd by replaying a recording (NMEA log, .gpx or .trk):
+#   python3 run_mac_debug.py --replay data/tracks/round.gpx --speed 10
+def start_fake_gpsd(argv):
+    import argparse
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--replay')
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--gpsd-port', type=int, default=2947)
+    args, rest = parser.parse_known_args(argv[1:])
+    argv[1:] = rest
+    if not args.replay:
+        return None
+    
+    from gps.replay import FakeGpsdServer, load_recording
+    server = FakeGpsdServer(load_recording(args.replay), port=args.gpsd_port,
+                            speed=args.speed).start()
+    print(f"Replaying {args.replay} at {args.speed}x as gpsd on port {server.port}")
+    return server
 
 def main():
     print("Starting Golf Cart CarPlay System (Debug Mode)")
     print("=" * 50)
     
     try:
+        fake_gpsd = start_fake_gpsd(sys.argv)
+        
         # Import QtWebEngine first (required for WebEngine to work properly)
         from PyQt5.QtWebEngineWidgets import QWebEngineView
         from PyQt5.QtWidgets import QApplication
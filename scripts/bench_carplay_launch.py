@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Measure launch-to-visible time of the mock CarPlay surface
+
+Launches and hides the CarPlay interface several times through
+CarPlayManager and reports the time from launch to first paint for the
+first launch (includes building the widget tree unless it was prebuilt)
+and for the repeat launches that reuse it.
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_carplay_launch.py [launches] [--prebuild]
+"""
+
+import os
+import sys
+import time
+
+os.environ['DEBUG'] = '1'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication
+
+from carplay.carplay_manager import CarPlayManager
+
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+    return condition()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    launches = int(args[0]) if args else 10
+    app = QApplication(sys.argv)
+
+    manager = CarPlayManager()
+    manager.openauto_path = None
+    if '--prebuild' in sys.argv:
+        manager.prebuild_carplay_widget()
+
+    for i in range(launches):
+        manager.launch_custom_carplay()
+        if not wait_for(app, lambda: len(manager.launch_timings) > i):
+            print("CarPlay surface never painted")
+            return
+        manager.hide_carplay()
+        app.processEvents()
+
+    first, repeats = manager.launch_timings[0], manager.launch_timings[1:]
+    print(f"first launch:   {first:8.2f} ms")
+    if repeats:
+        print(f"repeat launch:  {sum(repeats) / len(repeats):8.2f} ms "
+              f"(mean of {len(repeats)}, max {max(repeats):.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
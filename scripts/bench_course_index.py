@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure course spatial index queries on a generated 36-hole course
+
+Compares the grid index against a linear scan over every feature for
+"nearest N", "within radius" and the hysteresis hole tracker, and checks
+that both return the same distances.
+
+Usage: python3 scripts/bench_course_index.py [queries] [holes]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from course.spatial_index import SpatialIndex, HoleTracker
+from synthetic_course import generate_course
+
+
+def brute_nearest(features, x, y, n):
+    return sorted((f.distance(x, y), f.index) for f in features)[:n]
+
+
+def brute_within(features, x, y, radius):
+    return sorted(d for d in (f.distance(x, y) for f in features) if d <= radius)
+
+
+def timed(label, function, positions, baseline=None):
+    start = time.perf_counter()
+    for x, y in positions:
+        function(x, y)
+    per_query = (time.perf_counter() - start) / len(positions) * 1e6
+    suffix = f"  ({baseline / per_query:.0f}x faster)" if baseline else ""
+    print(f"{label:<28} {per_query:>9.1f} us/query{suffix}")
+    return per_query
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    holes = int(sys.argv[2]) if len(sys.argv) > 2 else 36
+
+    start = time.perf_counter()
+    course = course_from_geojson(generate_course(holes))
+    index = SpatialIndex(course.features)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{holes} holes, {len(course.features)} features, {len(index.cells)} cells, "
+          f"built in {build_ms:.0f} ms\n")
+
+    min_x, min_y, max_x, max_y = (v * index.cell_size for v in index.extent)
+    rng = random.Random(1)
+    positions = [(rng.uniform(min_x, max_x), rng.uniform(min_y, max_y))
+                 for _ in range(queries)]
+
+    for x, y in positions[:200]:
+        grid = [round(d, 6) for d, _ in index.nearest(x, y, 5)]
+        assert grid == [round(d, 6) for d, _ in brute_nearest(course.features, x, y, 5)]
+        grid = [round(d, 6) for d, _ in index.within(x, y, 50)]
+        assert grid == [round(d, 6) for d in brute_within(course.features, x, y, 50)]
+
+    features = course.features
+    scan = timed("nearest 5 (linear scan)", lambda x, y: brute_nearest(features, x, y, 5),
+                 positions)
+    timed("nearest 5 (grid)", lambda x, y: index.nearest(x, y, 5), positions, scan)
+    scan = timed("within 50 m (linear scan)", lambda x, y: brute_within(features, x, y, 50),
+                 positions)
+    timed("within 50 m (grid)", lambda x, y: index.within(x, y, 50), positions, scan)
+
+    # A cart driving down the holes at 10 Hz
+    tracker = HoleTracker(index)
+    drive = []
+    for hole in course.holes:
+        tee = course.features_for_hole(hole, 'tee')[0].points[0]
+        green = course.features_for_hole(hole, 'green_middle')[0].points[0]
+        for i in range(200):
+            t = i / 200
+            drive.append((tee[0] + (green[0] - tee[0]) * t + rng.gauss(0, 4),
+                          tee[1] + (green[1] - tee[1]) * t + rng.gauss(0, 4)))
+    changes = []
+    per_query = timed("current hole (tracker)", lambda x, y: changes.append(tracker.update(x, y)),
+                      drive)
+    switches = sum(1 for a, b in zip(changes, changes[1:]) if a != b)
+    print(f"\n{switches} hole changes over {len(course.holes)} holes driven; "
+          f"{per_query / 1e5:.2%} of a 10 Hz frame budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Measure loading a course from a pack against loading its GeoJSON
+
+Generates several 36-hole courses at different locations, writes each as
+GeoJSON and as a course pack, then times:
+  - GeoJSON: parse, project, path graph, POIs and every hole's targets
+  - pack: open (mmap + index + meta), course-wide features, path graph,
+    POIs and the first hole, then each further hole on demand
+  - picking the pack for a fix out of all of them
+and reports file sizes and Python heap held by each loaded course.
+
+Usage: python3 scripts/bench_course_pack.py [courses] [holes]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson, load_course
+from course.course_pack import CoursePack, open_packs, pack_for_position, write_pack
+from course.poi_search import pois_from_course
+from course.routing import PathGraph
+from synthetic_course import generate_course
+from course.yardage import YardageEngine
+
+
+def load_geojson(path):
+    course = load_course(path)
+    graph = PathGraph.from_course(course)
+    pois = pois_from_course(course)
+    yardage = YardageEngine(course)
+    return course, graph, pois, yardage
+
+
+def load_pack(path):
+    pack = CoursePack(path)
+    course = pack.course()
+    graph = pack.path_graph()
+    pois = pack.pois(course.projection)
+    yardage = YardageEngine(course, lazy=True)
+    yardage.hole_targets(course.holes[0])
+    return pack, course, graph, pois, yardage
+
+
+def best_of(runs, function, *args):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+        if isinstance(result, tuple) and isinstance(result[0], CoursePack):
+            result[0].close()
+    return best * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    holes = int(sys.argv[2]) if len(sys.argv) > 2 else 36
+    rng = random.Random(2)
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        origins = []
+        for i in range(count):
+            origin = (rng.uniform(33.0, 37.0), rng.uniform(-84.0, -76.0))
+            origins.append(origin)
+            data = generate_course(holes, seed=i, origin=origin, name=f"Course {i}")
+            geojson = os.path.join(directory, f"course{i}.geojson")
+            with open(geojson, 'w') as f:
+                json.dump(data, f)
+            write_pack(course_from_geojson(data), os.path.join(directory, f"course{i}.cpk"))
+
+        geojson = os.path.join(directory, "course0.geojson")
+        pack_path = os.path.join(directory, "course0.cpk")
+        print(f"{count} courses of {holes} holes; course 0: GeoJSON "
+              f"{os.path.getsize(geojson) / 1024:.0f} KiB, pack "
+              f"{os.path.getsize(pack_path) / 1024:.0f} KiB")
+
+        print(f"GeoJSON, everything:         {best_of(5, load_geojson, geojson):7.1f} ms")
+        print(f"pack, course-wide + hole 1:  {best_of(5, load_pack, pack_path):7.1f} ms")
+        print(f"  open (mmap, index, meta):  {best_of(20, CoursePack, pack_path):7.2f} ms")
+
+        pack, course, _, _, yardage = load_pack(pack_path)
+        start = time.perf_counter()
+        for hole in course.holes[1:]:
+            yardage.hole_targets(hole)
+        per_hole = (time.perf_counter() - start) * 1000 / max(1, len(course.holes) - 1)
+        print(f"  each further hole:         {per_hole:7.2f} ms")
+        pack.close()
+
+        tracemalloc.start()
+        kept = load_geojson(geojson)
+        geojson_heap = tracemalloc.get_traced_memory()[0]
+        del kept
+        tracemalloc.stop()
+        tracemalloc.start()
+        kept = load_pack(pack_path)
+        pack_heap = tracemalloc.get_traced_memory()[0]
+        kept[0].close()
+        del kept
+        tracemalloc.stop()
+        print(f"heap held: GeoJSON {geojson_heap / 1024:.0f} KiB, "
+              f"pack with one hole {pack_heap / 1024:.0f} KiB")
+
+        start = time.perf_counter()
+        packs = open_packs(directory)
+        opened = (time.perf_counter() - start) * 1000
+        fixes = [(lat + rng.uniform(-0.002, 0.004), lon + rng.uniform(-0.002, 0.004))
+                 for lat, lon in origins for _ in range(50)]
+        start = time.perf_counter()
+        picked = [pack_for_position(packs, lat, lon) for lat, lon in fixes]
+        select_us = (time.perf_counter() - start) * 1e6 / len(fixes)
+        correct = sum(p is not None and p.slug == f"course{i // 50}"
+                      for i, p in enumerate(picked))
+        print(f"open all {len(packs)} packs: {opened:.1f} ms; pick by fix: {select_us:.1f} us "
+              f"({correct}/{len(fixes)} correct)")
+        for pack in packs:
+            pack.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Measure memory-mapped DEM lookups and plays-like yardages per fix
+
+Writes a 1 arc-second (~30 m) tiled GeoTIFF of a whole 1x1 degree SRTM
+cell (3601x3601 float32 in 256-pixel tiles, ~60 MB) around a generated 18-hole course, then
+times single lookups, batched lookups and the per-fix plays-like update
+a cart runs, and reports how much of the raster ended up resident.
+Linux only (reads VmRSS from /proc).
+
+Usage: python3 scripts/bench_elevation.py [fixes] [batch]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from course.elevation import Dem, PlaysLikeEngine, write_geotiff
+from synthetic_course import generate_course
+from course.yardage import YardageEngine
+
+SIZE = 3601
+PIXEL = 1.0 / (SIZE - 1)
+
+
+def resident_mb():
+    """Current resident set, which counts the DEM pages mapped in so far"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def main():
+    fixes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    rng = np.random.default_rng(7)
+
+    course = course_from_geojson(generate_course(18))
+    lat0, lon0 = course.projection.origin_lat, course.projection.origin_lon
+    north, west = np.floor(lat0) + 1, np.floor(lon0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cell.tif")
+        rows = np.arange(SIZE, dtype=np.float32)[:, None]
+        cols = np.arange(SIZE, dtype=np.float32)[None, :]
+        write_geotiff(path, 80 + 30 * np.sin(rows / 90) * np.cos(cols / 70),
+                      west - PIXEL / 2, north + PIXEL / 2, PIXEL, tile=256)
+        size_mb = os.path.getsize(path) / 1e6
+        del rows, cols
+        before = resident_mb()
+
+        start = time.perf_counter()
+        dem = Dem.open(path)
+        print(f"{dem.width}x{dem.height} tiled GeoTIFF, {size_mb:.0f} MB, "
+              f"opened in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        lats = lat0 + rng.uniform(-0.005, 0.005, fixes)
+        lons = lon0 + rng.uniform(-0.005, 0.005, fixes)
+        start = time.perf_counter()
+        for lat, lon in zip(lats.tolist(), lons.tolist()):
+            dem.height_at(lat, lon)
+        single = (time.perf_counter() - start) / fixes
+        print(f"  single lookup: {single * 1e6:.1f} us, "
+              f"resident +{resident_mb() - before:.1f} MB after {fixes} fixes on the course")
+
+        far_lats = north - rng.uniform(0, 1, batch)
+        far_lons = west + rng.uniform(0, 1, batch)
+        start = time.perf_counter()
+        dem.heights(far_lats, far_lons)
+        batched = time.perf_counter() - start
+        print(f"  batched lookup anywhere in the cell: {batch / batched / 1e6:.2f} M points/s")
+
+        yardage = YardageEngine(course)
+        engine = PlaysLikeEngine(yardage, dem)
+        holes = course.holes
+        start = time.perf_counter()
+        for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+            engine.green_yards(lat, lon, holes[i % len(holes)])
+        per_fix = (time.perf_counter() - start) / fixes
+        start = time.perf_counter()
+        for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+            yardage.green_yards(lat, lon, holes[i % len(holes)])
+        plain = (time.perf_counter() - start) / fixes
+        print(f"  plays-like green yards per fix: {per_fix * 1e6:.1f} us "
+              f"(plain yardages {plain * 1e6:.1f} us)")
+        print(f"  resident +{resident_mb() - before:.1f} MB once batches touched the whole cell")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure geofence containment queries on a generated 36-hole course
+
+Builds the course's fences (greens plus margin, hole outlines, clubhouse)
+and adds random concave no-cart zones, then compares the precomputed grid
+against testing every polygon, checking both agree on every query.
+
+Usage: python3 scripts/bench_geofence.py [queries] [extra_zones]
+"""
+
+import os
+import sys
+import math
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from course.geo import point_in_polygon
+from course.geofence import Geofence, GeofenceGrid, fences_from_course
+from synthetic_course import generate_course
+
+
+def random_zone(rng, index, bounds):
+    x0, y0, x1, y1 = bounds
+    cx, cy = rng.uniform(x0, x1), rng.uniform(y0, y1)
+    radius = rng.uniform(10, 60)
+    sides = rng.randint(6, 40)
+    points = [(cx + radius * rng.uniform(0.4, 1.0) * math.cos(2 * math.pi * i / sides),
+               cy + radius * rng.uniform(0.4, 1.0) * math.sin(2 * math.pi * i / sides))
+              for i in range(sides)]
+    return Geofence(index, f"Zone {index}", 'no_cart', None, points)
+
+
+def brute_query(fences, x, y):
+    return [f.index for f in fences if point_in_polygon(x, y, f.points)]
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    extra = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(3)
+
+    course = course_from_geojson(generate_course(36))
+    fences = fences_from_course(course)
+    xs = [x for f in fences for x, _ in f.points]
+    ys = [y for f in fences for _, y in f.points]
+    bounds = (min(xs), min(ys), max(xs), max(ys))
+    for _ in range(extra):
+        fences.append(random_zone(rng, len(fences), bounds))
+    vertices = sum(len(f.points) for f in fences)
+    print(f"{len(fences)} fences, {vertices} vertices")
+
+    for cell_size in (5.0, 10.0, 20.0):
+        start = time.perf_counter()
+        grid = GeofenceGrid(fences, cell_size)
+        build = time.perf_counter() - start
+        print(f"  cell {cell_size:4.0f} m: built in {build * 1000:.0f} ms, "
+              f"{len(grid.cells)} cells ({grid.boundary_cells} on an edge)")
+
+    grid = GeofenceGrid(fences, 10.0)
+    points = [(rng.uniform(bounds[0], bounds[2]), rng.uniform(bounds[1], bounds[3]))
+              for _ in range(queries)]
+
+    start = time.perf_counter()
+    grid_results = [sorted(grid.query(x, y)) for x, y in points]
+    grid_time = time.perf_counter() - start
+
+    brute_points = points[:max(1, queries // 20)]
+    start = time.perf_counter()
+    brute_results = [brute_query(fences, x, y) for x, y in brute_points]
+    brute_time = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(grid_results, brute_results))
+    no_edges = sum(1 for x, y in points
+                   if not grid.cells.get(grid.cell(x, y), ((), ()))[1])
+    grid_us = grid_time / len(points) * 1e6
+    brute_us = brute_time / len(brute_points) * 1e6
+    print(f"grid:        {grid_us:7.2f} us/query")
+    print(f"all fences:  {brute_us:7.2f} us/query ({brute_us / grid_us:.0f}x slower)")
+    print(f"no edge tests needed for {no_edges / len(points):.1%} of queries")
+    print(f"mismatches:  {mismatches} of {len(brute_points)}")
+
+
+if __name__ == '__main__':
+    main()
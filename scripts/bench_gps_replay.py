@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark the GPS pipeline end-to-end from a replayed round
+
+Drives a cart round along the cart paths of a generated course, saves it
+as GPX, then:
+  - streams it through the fake gpsd server into GpsdClient (with the
+    smoother) flat out, and at 100x to check replay timing
+  - feeds every fix through GPSNavigation.update_gps_data (hole tracking,
+    yardages, route following) with the native map renderer
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_gps_replay.py [seconds]
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import random
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from course.course_data import course_from_geojson
+from course.routing import PathGraph
+from synthetic_course import generate_course
+from gps.gpsd_client import GpsdClient
+from gps.replay import FakeGpsdServer, ReplaySource, load_recording
+from gps.smoothing import GpsSmoother
+from gps.track_recorder import Track, export_gpx
+
+
+def drive_round(course, speed=5.0, noise=2.0, seed=1):
+    """Track of 1 Hz fixes driving from the clubhouse to the far end of the paths and back"""
+    graph = PathGraph.from_course(course)
+    clubhouse = course.to_local(*course.destinations()["Clubhouse"])
+    far = max(graph.nodes, key=lambda p: math.hypot(p[0] - clubhouse[0], p[1] - clubhouse[1]))
+    points = graph.route(clubhouse, far).points
+    points = points + points[::-1]
+
+    rng = random.Random(seed)
+    samples = []
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        steps = max(1, int(math.hypot(bx - ax, by - ay) / speed))
+        for i in range(steps):
+            t = i / steps
+            samples.append((ax + (bx - ax) * t + rng.gauss(0, noise),
+                            ay + (by - ay) * t + rng.gauss(0, noise)))
+    coords = [course.projection.to_latlon(x, y) for x, y in samples]
+    n = len(coords)
+    return Track(1714800000.0 + np.arange(n, dtype=np.float64),
+                 np.array([c[0] for c in coords]), np.array([c[1] for c in coords]),
+                 np.full(n, speed), np.full(n, np.nan), np.full(n, 0.9))
+
+
+def stream(fixes, speed, seconds):
+    server = FakeGpsdServer(fixes, speed=speed).start()
+    client = GpsdClient('127.0.0.1', server.port)
+    client.smoother = GpsSmoother()
+    client.start()
+    time.sleep(0.5)
+    before, start = client.reports, time.perf_counter()
+    time.sleep(seconds)
+    received = client.reports - before
+    elapsed = time.perf_counter() - start
+    client.stop()
+    server.stop()
+    return received / elapsed
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        geojson = generate_course(18)
+        course_path = os.path.join(directory, "course.geojson")
+        with open(course_path, 'w') as f:
+            json.dump(geojson, f)
+        course = course_from_geojson(geojson)
+
+        gpx_path = os.path.join(directory, "round.gpx")
+        with open(gpx_path, 'w') as out:
+            export_gpx(drive_round(course), out)
+        start = time.perf_counter()
+        fixes = load_recording(gpx_path)
+        print(f"round: {len(fixes)} fixes ({len(fixes) / 60:.0f} min), "
+              f"loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        print(f"fake gpsd -> GpsdClient flat out: {stream(fixes, 0, seconds):8.0f} fixes/s")
+        rate = stream(fixes, 100, seconds)
+        print(f"fake gpsd -> GpsdClient at 100x:  {rate:8.1f} fixes/s (expected 100)")
+
+        from ui.gps_navigation import GPSNavigation
+
+        class Window(QWidget):
+            settings = {
+                'gps': {'enabled': False},
+                'maps': {'renderer': 'native', 'mbtiles_path': os.path.join(directory, 'none')},
+                'course': {'geojson_path': course_path, 'learn_speeds': False},
+            }
+
+        navigation = GPSNavigation(Window())
+        navigation.gps_source = ReplaySource(gpx_path, speed=0)
+        navigation.navigate_to_destination("Clubhouse")
+        timings = []
+        for fix in fixes:
+            navigation.gps_source.fix = fix._replace(received=time.monotonic())
+            start = time.perf_counter()
+            navigation.update_gps_data()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"GPSNavigation.update_gps_data: mean {sum(timings) / len(timings) * 1000:.2f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms, "
+              f"{navigation.router.reroutes} reroutes")
+        navigation.stop_gps()
+        app.processEvents()
+
+
+if __name__ == '__main__':
+    main()
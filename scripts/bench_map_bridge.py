@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Time destination changes on the web map: page reload vs QWebChannel bridge
+
+For each destination the map is moved twice: by loading a new page URL
+(the old way: HTML, JS and tiles all reloaded) and by posting a center +
+marker update through MapBridge, which the page applies in its next
+animation frame. Reload time is measured to loadFinished, so it is a lower
+bound; bridge time runs from the update to the page's frameDrawn ack.
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_map_bridge.py [moves]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+DESTINATIONS = [
+    (35.7796, -78.6382), (35.7810, -78.6370), (35.7798, -78.6385),
+    (35.7802, -78.6378), (35.7825, -78.6360), (35.7790, -78.6390),
+]
+
+
+def wait(app, condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.0005)
+    return condition()
+
+
+def summary(values):
+    values = sorted(values)
+    return (f"median {values[len(values) // 2]:7.1f} ms  "
+            f"p95 {values[int(len(values) * 0.95)]:7.1f} ms")
+
+
+def main():
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    try:
+        from PyQt5.QtWebEngineWidgets import QWebEngineView
+        from PyQt5.QtWebChannel import QWebChannel
+    except ImportError as e:
+        print(f"QtWebEngine unavailable: {e}")
+        return
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QUrl, QFile, QIODevice
+    from maps.tile_store import MBTilesStore
+    from maps.tile_server import TileServer
+    from ui.map_bridge import MapBridge
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        server = TileServer(MBTilesStore(os.path.join(tmp, 'empty.mbtiles'))).start()
+        script = QFile(':/qtwebchannel/qwebchannel.js')
+        script.open(QIODevice.ReadOnly)
+        server.add_asset('qwebchannel.js', script.readAll())
+
+        view = QWebEngineView()
+        view.resize(800, 400)
+        view.show()
+        loads = []
+        view.loadFinished.connect(loads.append)
+
+        reload_ms = []
+        for i in range(moves):
+            lat, lon = DESTINATIONS[i % len(DESTINATIONS)]
+            count = len(loads)
+            start = time.perf_counter()
+            view.setUrl(QUrl(server.map_url(lat, lon, 17, marker=(lat, lon))))
+            wait(app, lambda: len(loads) > count)
+            reload_ms.append((time.perf_counter() - start) * 1000)
+
+        bridge = MapBridge()
+        channel = QWebChannel()
+        channel.registerObject('bridge', bridge)
+        view.page().setWebChannel(channel)
+        view.setUrl(QUrl(server.map_url(*DESTINATIONS[0], 17)))
+        wait(app, lambda: bridge.ready)
+
+        bridge_ms = []
+        for i in range(moves):
+            lat, lon = DESTINATIONS[i % len(DESTINATIONS)]
+            bridge.set_center(lat, lon, 17)
+            bridge.set_destination(lat, lon)
+            wait(app, lambda: not bridge.pending and not bridge.in_flight)
+            bridge_ms.append(bridge.last_latency_ms)
+
+        print(f"{moves} destination changes")
+        print(f"page reload (setUrl): {summary(reload_ms)}")
+        print(f"bridge update:        {summary(bridge_ms)}")
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Compare the web (QWebEngineView) and native (QPainter) map renderers
+
+Each renderer runs in its own subprocess so resident memory is not shared.
+A synthetic MBTiles file covering the demo course is generated, then each
+renderer is timed from process start to first complete map paint, panned
+for a number of frames, and its RSS (including Chromium helper processes
+for the web renderer) is read from /proc.
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_map_renderers.py [frames]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+START = time.perf_counter()
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+CENTER = (35.7796, -78.6382)
+BBOX = (35.770, -78.650, 35.790, -78.625)
+ZOOM = 17
+
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss_kb(pid):
+    """RSS of a process plus all of its descendants"""
+    total = rss_kb(pid)
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(c) for c in f.read().split()]
+    except OSError:
+        children = []
+    return total + sum(tree_rss_kb(child) for child in children)
+
+
+def make_tiles(path):
+    from PyQt5.QtGui import QGuiApplication, QImage, QColor, QPainter
+    from PyQt5.QtCore import QBuffer, QByteArray
+    from maps.tiles import tiles_in_bbox
+    from maps.tile_store import MBTilesStore
+
+    app = QGuiApplication([])
+    store = MBTilesStore(path)
+    for z, x, y in tiles_in_bbox(*BBOX, ZOOM):
+        image = QImage(256, 256, QImage.Format_RGB32)
+        image.fill(QColor(40 + x % 7 * 20, 110 + y % 5 * 20, 60))
+        painter = QPainter(image)
+        painter.drawText(10, 20, f"{z}/{x}/{y}")
+        painter.end()
+        data = QByteArray()
+        buf = QBuffer(data)
+        buf.open(QBuffer.WriteOnly)
+        image.save(buf, 'PNG')
+        store.put_tile(z, x, y, bytes(data), commit=False)
+    store.commit()
+    count = store.tile_count()
+    del app
+    return count
+
+
+def run_native(path, frames):
+    from PyQt5.QtWidgets import QApplication
+    from maps.tile_store import MBTilesStore
+    from ui.native_map import NativeMapView
+
+    app = QApplication(sys.argv)
+    view = NativeMapView(MBTilesStore(path), CENTER, ZOOM)
+    view.resize(1024, 520)
+    view.show()
+    view.repaint()
+    # Tiles load on a background thread and repaint the view as they arrive
+    deadline = time.monotonic() + 30
+    while not view.loader.idle() and time.monotonic() < deadline:
+        app.processEvents()
+    app.processEvents()
+    view.repaint()
+    startup = time.perf_counter() - START
+
+    times = []
+    lat, lon = CENTER
+    for i in range(frames):
+        view.set_center(lat + i * 0.00002, lon + i * 0.00003)
+        view.repaint()
+        times.append(view.last_frame_ms)
+    view.stop_loading()
+    return startup, times
+
+
+def run_web(path, frames):
+    from PyQt5.QtWebEngineWidgets import QWebEngineView
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QUrl
+    from maps.tile_store import MBTilesStore
+    from maps.tile_server import TileServer
+
+    app = QApplication(sys.argv)
+    server = TileServer(MBTilesStore(path)).start()
+    view = QWebEngineView()
+    view.resize(1024, 520)
+    loaded = []
+    view.loadFinished.connect(loaded.append)
+    view.load(QUrl(server.map_url(*CENTER, ZOOM)))
+    view.show()
+
+    def evaluate(script, timeout=10.0):
+        result = []
+        view.page().runJavaScript(script, result.append)
+        deadline = time.monotonic() + timeout
+        while not result and time.monotonic() < deadline:
+            app.processEvents()
+        return result[0] if result else None
+
+    deadline = time.monotonic() + 30
+    while not loaded and time.monotonic() < deadline:
+        app.processEvents()
+    # Wait for the visible tiles to finish decoding
+    evaluate("Promise.all(Array.from(document.images).map(i => i.decode().catch(() => 0)))"
+             ".then(() => true)")
+    startup = time.perf_counter() - START
+
+    script = """
+        (function () {
+            const times = [];
+            for (let i = 0; i < %d; i++) {
+                const t = performance.now();
+                view.lat = %f + i * 0.00002;
+                view.lon = %f + i * 0.00003;
+                render();
+                document.body.getBoundingClientRect();
+                times.push(performance.now() - t);
+            }
+            return times;
+        })()
+    """ % (frames, CENTER[0], CENTER[1])
+    times = evaluate(script) or []
+    server.stop()
+    return startup, times
+
+
+def child(renderer, path, frames):
+    try:
+        runner = run_native if renderer == 'native' else run_web
+        startup, times = runner(path, frames)
+    except ImportError as e:
+        print(json.dumps({'error': f"unavailable ({e})"}))
+        return
+    times.sort()
+    print(json.dumps({
+        'startup': startup,
+        'rss_kb': tree_rss_kb(os.getpid()),
+        'frame_median': times[len(times) // 2] if times else 0.0,
+        'frame_p95': times[int(len(times) * 0.95)] if times else 0.0,
+    }))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.mbtiles')
+        print(f"{make_tiles(path)} tiles at zoom {ZOOM}, {frames} pan frames\n")
+        print(f"{'renderer':<10} {'startup':>10} {'RSS':>10} {'frame p50':>11} {'frame p95':>11}")
+        for renderer in ('native', 'web'):
+            proc = subprocess.run(
+                [sys.executable, __file__, '--child', renderer, path, str(frames)],
+                capture_output=True, text=True, timeout=120
+            )
+            lines = proc.stdout.strip().splitlines()
+            try:
+                result = json.loads(lines[-1])
+            except (IndexError, ValueError):
+                result = {'error': f"failed (exit {proc.returncode}): "
+                                   f"{proc.stderr.strip().splitlines()[-1:]}"}
+            if 'error' in result:
+                print(f"{renderer:<10} {result['error']}")
+                continue
+            print(f"{renderer:<10} {result['startup'] * 1000:>8.0f}ms "
+                  f"{result['rss_kb'] / 1024:>8.1f}MB "
+                  f"{result['frame_median']:>9.2f}ms {result['frame_p95']:>9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Measure NMEA parsing throughput of the serial GPS reader
+
+A pseudo-terminal stands in for the receiver: a writer thread pushes a
+10 Hz GGA/RMC/VTG stream as fast as the pty accepts it while
+NmeaSerialSource reads the other end through pyserial. The in-memory
+parser is also compared against a naive decode-and-split parser.
+
+Usage: python3 scripts/bench_nmea.py [epochs]
+"""
+
+import os
+import sys
+import tty
+import time
+import threading
+import operator
+from functools import reduce
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gps.nmea_reader import NmeaParser, NmeaSerialSource
+
+
+def sentence(body):
+    return f"${body}*{reduce(operator.xor, body.encode()):02X}\r\n".encode()
+
+
+def make_stream(epochs):
+    """One GGA, RMC and VTG sentence per epoch, drifting along a fairway"""
+    out = bytearray()
+    for i in range(epochs):
+        stamp = f"12{i // 600 % 60:02d}{i // 10 % 60:02d}.{i % 10}0"
+        lat = f"3546.{776 + i % 200:03d}0"
+        lon = f"07838.{292 + i % 150:03d}0"
+        out += sentence(f"GNGGA,{stamp},{lat},N,{lon},W,1,09,0.9,96.{i % 10},M,-33.1,M,,")
+        out += sentence(f"GNRMC,{stamp},A,{lat},N,{lon},W,{7 + i % 5}.4,084.4,230394,,,A")
+        out += sentence(f"GNVTG,084.4,T,,M,{7 + i % 5}.4,N,{13 + i % 9}.7,K,A")
+    return bytes(out)
+
+
+def naive_parse(data):
+    """Typical line-oriented parser: decode, split, dict of fields"""
+    fixes = 0
+    state = {}
+    for line in data.decode('ascii', 'replace').splitlines():
+        if not line.startswith('$') or '*' not in line:
+            continue
+        body, checksum = line[1:].split('*', 1)
+        if reduce(operator.xor, (ord(c) for c in body), 0) != int(checksum[:2], 16):
+            continue
+        fields = body.split(',')
+        kind = fields[0][2:]
+        if kind == 'GGA' and fields[6] != '0':
+            state['lat'] = float(fields[2][:2]) + float(fields[2][2:]) / 60
+            state['lon'] = float(fields[4][:3]) + float(fields[4][3:]) / 60
+            state['alt'] = float(fields[9])
+            fixes += 1
+        elif kind == 'RMC' and fields[2] == 'A':
+            state['lat'] = float(fields[3][:2]) + float(fields[3][2:]) / 60
+            state['lon'] = float(fields[5][:3]) + float(fields[5][3:]) / 60
+            state['speed'] = float(fields[7]) * 0.514444
+            fixes += 1
+        elif kind == 'VTG':
+            state['speed'] = float(fields[7]) / 3.6
+    return fixes
+
+
+def bench_memory(data, sentences):
+    for name, parse in (("naive split", naive_parse),
+                        ("in-place", lambda d: NmeaParser().feed(d))):
+        start = time.perf_counter()
+        fixes = parse(data)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} {sentences / elapsed:>10,.0f} sentences/s "
+              f"{elapsed / sentences * 1e6:>6.2f} us/sentence ({fixes} fixes)")
+
+
+def bench_pty(data, sentences):
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    source = NmeaSerialSource(os.ttyname(slave), 115200, read_timeout=0.05)
+    source.start()
+
+    def writer():
+        view = memoryview(data)
+        while view:
+            written = os.write(master, view[:4096])
+            view = view[written:]
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    thread.join()
+    deadline = time.monotonic() + 10
+    while source.parser.sentences < sentences and time.monotonic() < deadline:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    source.stop()
+    os.close(master)
+    os.close(slave)
+
+    parsed = source.parser.sentences
+    print(f"{'pty serial':<12} {parsed / elapsed:>10,.0f} sentences/s "
+          f"({parsed}/{sentences} sentences, {source.parser.checksum_errors} bad checksums)")
+    # A 10 Hz receiver sends ~30 sentences/s
+    print(f"headroom over a 10 Hz receiver: {parsed / elapsed / 30:,.0f}x")
+
+
+def main():
+    epochs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    data = make_stream(epochs)
+    sentences = epochs * 3
+    print(f"{sentences} sentences, {len(data) / 1024:.0f} KB\n")
+    bench_memory(data, sentences)
+    bench_pty(data, sentences)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Measure the streaming OSM importer on a county-sized synthetic extract
+
+Writes two generated courses as OSM XML inside a county of unrelated
+streets (one million nodes by default, roughly 100 MB of XML), then runs
+the importer in a fresh process and reports throughput and peak memory,
+next to loading the same file whole with ElementTree for comparison.
+
+Usage: python3 scripts/bench_osm_import.py [filler_nodes] [--skip-whole]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from synthetic_course import generate_course, write_osm_extract
+
+IMPORT = """
+import sys, time, logging
+logging.disable(logging.INFO)
+from course.osm_import import import_extract, format_stats
+courses, stats = import_extract(sys.argv[1])
+print(format_stats(stats))
+print(", ".join(f"{name}: {len(data['features'])} features" for name, data in courses))
+"""
+
+WHOLE = """
+import sys, time, resource
+import xml.etree.ElementTree as ET
+start = time.perf_counter()
+tree = ET.parse(sys.argv[1])
+elements = sum(1 for _ in tree.getroot())
+print(f"{elements} elements in {time.perf_counter() - start:.1f} s; "
+      f"peak memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+"""
+
+
+def run(script, path):
+    result = subprocess.run([sys.executable, '-c', script, path], cwd=SRC,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    filler = int(args[0]) if args else 1000000
+    courses = [generate_course(36),
+               generate_course(18, seed=5, origin=(35.95, -78.45), name="Lakeside")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'county.osm')
+        start = time.perf_counter()
+        with open(path, 'w') as f:
+            write_osm_extract(f, courses, filler_nodes=filler)
+        print(f"wrote {os.path.getsize(path) / 1e6:.0f} MB extract in "
+              f"{time.perf_counter() - start:.1f} s")
+
+        print(f"streaming import:  {run(IMPORT, path)}")
+        if '--skip-whole' not in sys.argv:
+            print(f"ET.parse whole:    {run(WHOLE, path)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Paint-time benchmark for the custom-painted widgets
+
+Repaints each widget into an offscreen pixmap with the shared render cache
+disabled (every paintEvent draws from scratch) and enabled (paintEvent
+blits a cached pixmap), alternating hover/active state the way the home
+screen does.
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_paint.py [frames]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QPixmap
+
+app = QApplication(sys.argv)
+
+from ui.render_cache import render_cache
+from ui.home_screen import RoundedFrame, ModernButton
+from ui.home_screen_clean import CleanCard, IconButton
+from carplay.mock_carplay import CarPlayApp
+
+
+def make_widgets():
+    card = CleanCard()
+    card.resize(360, 180)
+    frame = RoundedFrame(20)
+    frame.resize(400, 420)
+    return [
+        ("CarPlayApp", CarPlayApp("Maps", "🗺", "#007AFF"), None),
+        ("CleanCard", card, lambda w, on: setattr(w, '_hover', on)),
+        ("IconButton", IconButton("📍", "nav"), lambda w, on: w.set_active(on)),
+        ("RoundedFrame", frame, lambda w, on: setattr(w, 'hover', on)),
+        ("ModernButton", ModernButton("▲", "nav"), lambda w, on: w.set_active(on)),
+    ]
+
+
+def time_frames(widget, toggle, frames):
+    target = QPixmap(widget.size())
+    start = time.perf_counter()
+    for i in range(frames):
+        if toggle:
+            toggle(widget, i % 2 == 0)
+        # Paint the widget alone; its graphics effect is not part of paintEvent
+        widget.render(target)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{frames} frames per widget, platform {app.platformName()}")
+    print(f"  {'widget':14s} {'uncached':>12s} {'cached':>12s} {'speedup':>8s}")
+    for name, widget, toggle in make_widgets():
+        widget.setGraphicsEffect(None)
+        render_cache.enabled = False
+        uncached = time_frames(widget, toggle, frames)
+        render_cache.enabled = True
+        render_cache.clear()
+        cached = time_frames(widget, toggle, frames)
+        print(f"  {name:14s} {uncached:9.1f} us {cached:9.1f} us {uncached / cached:7.1f}x")
+    print(f"cache: {render_cache.hits} hits, {render_cache.misses} misses, "
+          f"{render_cache.total_bytes / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
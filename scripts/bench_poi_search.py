@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Measure offline POI search-as-you-type with tens of thousands of POIs
+
+Builds a venue of synthetic POIs (restrooms, snack bars, parking, holes,
+shelters...) spread over a few kilometers around a generated course,
+then times every keystroke of typed queries, with and without typos,
+ranked by distance from a random cart position. A frame at 60 Hz is
+16.7 ms.
+
+Usage: python3 scripts/bench_poi_search.py [pois]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from course.poi_search import Poi, PoiIndex, pois_from_course
+from synthetic_course import generate_course
+
+PLACES = [
+    ("Restroom", 'restroom', "toilets wc"),
+    ("Snack Bar", 'snack_bar', "food drinks"),
+    ("Parking Lot", 'parking', "car"),
+    ("Water Station", 'poi', "drinking water"),
+    ("Rain Shelter", 'poi', "shelter lightning"),
+    ("Ball Washer", 'poi', ""),
+    ("Practice Green", 'poi', "putting"),
+    ("Cart Barn", 'poi', "charging"),
+    ("Beverage Cart Stop", 'poi', "drinks"),
+    ("Maintenance Shed", 'poi', ""),
+]
+AREAS = ["North", "South", "East", "West", "Lakeside", "Pine", "Oak", "Meadow",
+         "Ridge", "Harbor", "Creek", "Valley"]
+
+QUERIES = ["restroom", "snack bar", "hole 17", "lakeside parking", "restrom",
+           "snak bar", "pine shelter", "clubhouse", "water station 12", "parkng lot"]
+
+
+def venue_pois(course, count, rng):
+    pois = pois_from_course(course)
+    while len(pois) < count:
+        name, kind, keywords = rng.choice(PLACES)
+        full = f"{rng.choice(AREAS)} {name} {rng.randint(1, 400)}"
+        x, y = rng.uniform(-1500, 2500), rng.uniform(-1500, 3000)
+        lat, lon = course.projection.to_latlon(x, y)
+        pois.append(Poi(full, kind, lat, lon, x, y, keywords))
+    return pois
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(4)
+    course = course_from_geojson(generate_course(36))
+    pois = venue_pois(course, count, rng)
+
+    start = time.perf_counter()
+    index = PoiIndex(pois)
+    print(f"{len(index)} POIs, {len(index.words)} distinct words, "
+          f"built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    timings = []
+    worst = (0.0, '')
+    for query in QUERIES:
+        for _ in range(5):
+            x, y = rng.uniform(-200, 900), rng.uniform(-200, 2000)
+            # Every keystroke, as the box would see it
+            for end in range(1, len(query) + 1):
+                typed = query[:end]
+                start = time.perf_counter()
+                results = index.search(typed, x, y)
+                elapsed = (time.perf_counter() - start) * 1000
+                timings.append(elapsed)
+                worst = max(worst, (elapsed, typed))
+        print(f"  {query!r:20} -> {results[0].poi.name if results else '(none)'!r}"
+              f" at {results[0].distance:.0f} m" if results else f"  {query!r:20} -> (none)")
+
+    timings.sort()
+    print(f"per keystroke: median {timings[len(timings) // 2]:.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, "
+          f"worst {worst[0]:.2f} ms ({worst[1]!r})")
+    print(f"within a 16.7 ms frame: {sum(t < 16.7 for t in timings) / len(timings):.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Measure cart-path routing and rerouting on generated path networks
+
+Runs random routes on the cart paths of a generated 36-hole course and on
+a larger jittered lattice of paths, then strays off each route and times
+the incremental reroute (search until the remaining route is rejoined)
+against planning from scratch.
+
+Usage: python3 scripts/bench_routing.py [routes] [lattice_size]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from course.routing import PathGraph, Router
+from synthetic_course import generate_course
+
+
+def lattice_lines(size, spacing=60.0, keep=0.85, seed=2):
+    """Grid of paths with jittered vertices and some links missing"""
+    rng = random.Random(seed)
+    points = {(i, j): (i * spacing + rng.uniform(-12, 12), j * spacing + rng.uniform(-12, 12))
+              for i in range(size) for j in range(size)}
+    lines = []
+    for i in range(size):
+        for j in range(size):
+            for di, dj in ((1, 0), (0, 1)):
+                other = (i + di, j + dj)
+                # Keep the outer ring so the network stays connected
+                border = i in (0, size - 1) or j in (0, size - 1)
+                if other in points and (border or rng.random() < keep):
+                    lines.append([points[(i, j)], points[other]])
+    return lines
+
+
+def bench(label, graph, routes, seed=3):
+    rng = random.Random(seed)
+    xs = [x for x, _ in graph.nodes]
+    ys = [y for _, y in graph.nodes]
+
+    def random_point():
+        return (rng.uniform(min(xs), max(xs)), rng.uniform(min(ys), max(ys)))
+
+    plan_times, reroute_times, scratch_times, lengths = [], [], [], []
+    for _ in range(routes):
+        start, goal = random_point(), random_point()
+        router = Router(graph, off_route_distance=25.0)
+        t = time.perf_counter()
+        route = router.set_destination(start, goal)
+        plan_times.append(time.perf_counter() - t)
+        if route is None:
+            continue
+        lengths.append(route.length)
+
+        # Wander off the route, 60 m from a point a third of the way along
+        x, y = route.points[len(route.points) // 3]
+        stray = (x + 60, y + 60)
+        t = time.perf_counter()
+        router.update(*stray)
+        reroute_times.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        graph.route(stray, goal)
+        scratch_times.append(time.perf_counter() - t)
+
+    def ms(values):
+        values = sorted(values)
+        return f"{sum(values) / len(values) * 1000:6.2f} ms (p95 {values[int(len(values) * 0.95)] * 1000:.2f})"
+
+    print(f"{label}: {len(graph.nodes)} nodes, {len(graph.edges)} edges, "
+          f"mean route {sum(lengths) / len(lengths):.0f} m")
+    print(f"  plan route            {ms(plan_times)}")
+    print(f"  reroute (incremental) {ms(reroute_times)}")
+    print(f"  reroute (from scratch){ms(scratch_times)}\n")
+
+
+def main():
+    routes = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+
+    course = course_from_geojson(generate_course(36))
+    bench("36-hole course", PathGraph.from_course(course), routes)
+
+    start = time.perf_counter()
+    graph = PathGraph(lattice_lines(size))
+    print(f"lattice built in {(time.perf_counter() - start) * 1000:.0f} ms")
+    bench(f"{size}x{size} lattice", graph, routes)
+
+
+if __name__ == '__main__':
+    main()
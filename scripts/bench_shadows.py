@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Frame-time benchmark: QGraphicsDropShadowEffect vs. cached nine-patch shadows
+
+Renders a home-screen-like panel of three cards, toggling hover on one
+card every frame. "before" uses the previous card implementation (a
+QGraphicsDropShadowEffect per card, blurred on every repaint); "after"
+uses CleanCard, which paints a cached nine-patch shadow itself, with and
+without the shared render cache.
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_shadows.py [frames]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication, QWidget, QFrame, QGraphicsDropShadowEffect
+from PyQt5.QtGui import QPainter, QPainterPath, QBrush, QColor, QPixmap
+
+app = QApplication(sys.argv)
+
+from ui.render_cache import render_cache
+from ui.home_screen_clean import CleanCard
+
+CARD_RECTS = [(24, 24, 360, 120), (24, 164, 360, 180), (404, 24, 372, 320)]
+
+
+class EffectCard(QFrame):
+    """CleanCard as it was before nine-patch shadows"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hover = False
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(20)
+        shadow.setOffset(0, 2)
+        shadow.setColor(QColor(0, 0, 0, 30))
+        self.setGraphicsEffect(shadow)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(0, 0, self.width(), self.height(), 16, 16)
+        color = QColor("#2a3447")
+        if self._hover:
+            color = color.lighter(110)
+        painter.fillPath(path, QBrush(color))
+
+
+def build_panel(card_class):
+    panel = QWidget()
+    panel.setStyleSheet("background-color: #1e2537;")
+    panel.resize(800, 380)
+    cards = []
+    for x, y, w, h in CARD_RECTS:
+        card = card_class(panel)
+        # CARD_RECTS are card bodies; CleanCard reaches past its body to its shadow
+        left, top, right, bottom = card.shadow_margins() if card_class is CleanCard else (0,) * 4
+        card.setGeometry(x - left, y - top, w + left + right, h + top + bottom)
+        cards.append(card)
+    return panel, cards
+
+
+def frame_time(card_class, frames):
+    panel, cards = build_panel(card_class)
+    target = QPixmap(panel.size())
+    panel.render(target)  # warm up
+    start = time.perf_counter()
+    for i in range(frames):
+        cards[0]._hover = i % 2 == 0
+        panel.render(target)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    before = frame_time(EffectCard, frames)
+    render_cache.enabled = False
+    after_uncached = frame_time(CleanCard, frames)
+    render_cache.enabled = True
+    after = frame_time(CleanCard, frames)
+
+    print(f"{frames} frames, 3 cards, platform {app.platformName()}")
+    print(f"  before (QGraphicsDropShadowEffect) {before:7.3f} ms/frame")
+    print(f"  after  (nine-patch, no cache)      {after_uncached:7.3f} ms/frame  "
+          f"({before / after_uncached:.1f}x)")
+    print(f"  after  (nine-patch + render cache) {after:7.3f} ms/frame  "
+          f"({before / after:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Measure how often the map finds its tiles already stored during a round
+
+Drives a cart along a generated course (tee to green on each hole, then
+on to the next tee) against a local tile server holding the course's
+tiles, with simulated network latency and time running SPEEDUP times
+faster than real. Each tile the map shows is counted once, when it first
+comes into view after the first fix: a hit if it was already in the cart's tile file, a blank
+tile otherwise. Compares fetching on demand with prefetching along the
+heading only and along the heading plus the current and next hole.
+
+Usage: python3 scripts/bench_tile_prefetch.py [holes] [latency_ms] [kbps]
+"""
+
+import os
+import sys
+import math
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from synthetic_course import generate_course
+from maps.seed_tiles import TileFetcher
+from maps.tile_prefetcher import TilePrefetcher, plan_tiles, view_radius
+from maps.tile_server import TileServer
+from maps.tile_store import MBTilesStore
+from maps.tiles import TILE_SIZE, deg_to_tile, tiles_in_bbox
+
+SPEEDUP = 50
+CART_MPS = 5.0
+MAP_ZOOM = 18
+ZOOMS = [MAP_ZOOM, 17, 19]
+VIEW = (800, 400)
+TILE_BYTES = 12 * 1024
+
+
+class SlowFetcher(TileFetcher):
+    """Tile fetcher with the round trip of a cellular link"""
+
+    def __init__(self, url_template, latency):
+        super().__init__(url_template)
+        self.latency = latency
+
+    def fetch(self, z, x, y):
+        time.sleep(self.latency)
+        return super().fetch(z, x, y)
+
+
+def drive(course, holes):
+    """(lat, lon, heading, hole) once per simulated second"""
+    waypoints = []
+    for hole in course.holes[:holes]:
+        features = course.features_for_hole(hole)
+        tee = next(f for f in features if f.kind == 'tee')
+        green = next(f for f in features if f.kind == 'green_middle')
+        waypoints += [(tee.coords[0], hole), (green.coords[0], hole)]
+
+    for (start, hole), (end, _) in zip(waypoints, waypoints[1:]):
+        north = (end[0] - start[0]) * 111320.0
+        east = (end[1] - start[1]) * 111320.0 * math.cos(math.radians(start[0]))
+        heading = math.degrees(math.atan2(east, north)) % 360.0
+        steps = max(1, int(math.hypot(north, east) / CART_MPS))
+        for i in range(steps):
+            f = i / steps
+            yield (start[0] + f * (end[0] - start[0]), start[1] + f * (end[1] - start[1]),
+                   heading, hole)
+
+
+def visible_tiles(lat, lon):
+    x, y = deg_to_tile(lat, lon, MAP_ZOOM)
+    x0 = int((x * TILE_SIZE - VIEW[0] / 2) // TILE_SIZE)
+    y0 = int((y * TILE_SIZE - VIEW[1] / 2) // TILE_SIZE)
+    x1 = int((x * TILE_SIZE + VIEW[0] / 2) // TILE_SIZE)
+    y1 = int((y * TILE_SIZE + VIEW[1] / 2) // TILE_SIZE)
+    return [(MAP_ZOOM, tx, ty) for tx in range(x0, x1 + 1) for ty in range(y0, y1 + 1)]
+
+
+def run(mode, course, holes, base_url, tmp, latency, kbps):
+    store = MBTilesStore(os.path.join(tmp, f"{mode}.mbtiles"))
+    fetcher = SlowFetcher(base_url + "/tiles/{z}/{x}/{y}.png", latency / SPEEDUP)
+    prefetcher = TilePrefetcher(store, fetcher, kbps * 1024 * SPEEDUP).start()
+    seen = set()
+    hits = views = 0
+    last_hole = None
+    try:
+        for second, (lat, lon, heading, hole) in enumerate(drive(course, holes)):
+            started = time.perf_counter()
+            for tile in visible_tiles(lat, lon):
+                if tile in seen:
+                    continue
+                seen.add(tile)
+                # The screen at power-on can only come from seeding
+                if second > 0:
+                    views += 1
+                    hits += store.get_tile(*tile) is not None
+
+            if mode == 'on demand':
+                plan = [(0.0, tile) for tile in visible_tiles(lat, lon)]
+            else:
+                areas = []
+                if mode == 'heading + holes':
+                    index = course.holes.index(hole)
+                    for h in course.holes[index:index + 2]:
+                        areas.append([c for f in course.features_for_hole(h) for c in f.coords])
+                plan = plan_tiles(lat, lon, heading, CART_MPS, ZOOMS, areas,
+                                  view_radius(lat, MAP_ZOOM, *VIEW))
+            # Re-planned as often as the navigation screen does
+            if mode == 'on demand' or hole != last_hole or second % 5 == 0:
+                prefetcher.request(plan)
+            last_hole = hole
+            time.sleep(max(0.0, 1.0 / SPEEDUP - (time.perf_counter() - started)))
+    finally:
+        prefetcher.stop()
+    stats = prefetcher.stats()
+    store.close()
+    return hits, views, stats
+
+
+def main():
+    holes = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.15
+    kbps = float(sys.argv[3]) if len(sys.argv) > 3 else 128
+
+    course = course_from_geojson(generate_course(max(holes, 2)))
+    lats = [c[0] for f in course.features for c in f.coords]
+    lons = [c[1] for f in course.features for c in f.coords]
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = MBTilesStore(os.path.join(tmp, "server.mbtiles"))
+        blob = bytes(TILE_BYTES)
+        for zoom in ZOOMS:
+            for z, x, y in tiles_in_bbox(min(lats) - 0.03, min(lons) - 0.03,
+                                         max(lats) + 0.03, max(lons) + 0.03, zoom):
+                remote.put_tile(z, x, y, blob, commit=False)
+        remote.commit()
+        server = TileServer(remote).start()
+        print(f"{holes} holes at {CART_MPS * 2.237:.0f} mph, {latency * 1000:.0f} ms per tile, "
+              f"{kbps:.0f} KB/s budget, {TILE_BYTES // 1024} KB tiles "
+              f"(simulated {SPEEDUP}x faster than real time)")
+        try:
+            for mode in ('on demand', 'heading only', 'heading + holes'):
+                hits, views, stats = run(mode, course, holes, server.base_url, tmp,
+                                         latency, kbps)
+                print(f"  {mode:<16} hit rate {hits / views:6.1%} of {views} tiles on first view, "
+                      f"{views - hits} blank, downloaded {stats.fetched} tiles "
+                      f"({stats.bytes / 1024 / 1024:.1f} MB)")
+        finally:
+            server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Measure the GPS track recorder: cost per fix, range reads and export
+
+Fills a ring file past its capacity (so it wraps), then times reading a
+one-hour window and the whole ring into NumPy arrays and exporting GPX.
+
+Usage: python3 scripts/bench_track_recorder.py [capacity] [fixes]
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gps.fix import GpsFix
+from gps.track_recorder import TrackRecorder, export_gpx
+
+
+def main():
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 600000
+    t0 = 1714800000.0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cart.trk")
+        recorder = TrackRecorder(path, capacity, min_interval=0.0)
+        fixes = [GpsFix(0.0, 35.78 + i * 1e-7, -78.638, 4.2, 90.0, 80.0, 3, 9, 0.8)
+                 for i in range(1000)]
+
+        start = time.perf_counter()
+        for i in range(count):
+            recorder.record(fixes[i % 1000], when=t0 + i)
+        per_fix = (time.perf_counter() - start) / count * 1e6
+        print(f"record: {per_fix:.2f} us/fix, file {os.path.getsize(path) / 1e6:.1f} MB "
+              f"for {capacity} fixes ({capacity / 3600:.0f} h at 1 Hz)")
+
+        last = t0 + count
+        for label, begin in (("last hour", last - 3600), ("whole ring", None)):
+            start = time.perf_counter()
+            track = recorder.read_range(begin, last)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"read_range {label:<10}: {len(track.time):>7} fixes in {elapsed:.1f} ms")
+
+        track = recorder.read_range(last - 3600, last)
+        start = time.perf_counter()
+        out = io.StringIO()
+        export_gpx(track, out)
+        print(f"export_gpx last hour   : {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{len(out.getvalue()) / 1e6:.1f} MB")
+        recorder.close()
+
+
+if __name__ == '__main__':
+    main()
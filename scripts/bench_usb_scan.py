@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: sysfs USB scanner vs. the lsusb subprocess path
+
+Builds a fake /sys/bus/usb/devices tree in a temp directory and times
+one detection pass with each approach. When lsusb is not installed the
+subprocess path is emulated with `cat` over equivalent lsusb output, which
+has the same fork+exec+pipe+parse cost.
+
+Usage: python3 scripts/bench_usb_scan.py [iterations]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from carplay.usb_scanner import SysfsUsbScanner
+
+# (bus path, vendor, product, serial, name)
+FAKE_DEVICES = [
+    ("usb1", "1d6b", "0002", "0000:01:00.0", "Linux Foundation 2.0 root hub"),
+    ("usb2", "1d6b", "0003", "0000:01:00.0", "Linux Foundation 3.0 root hub"),
+    ("1-1", "2109", "3431", "", "VIA Labs, Inc. Hub"),
+    ("1-1.1", "0424", "2514", "", "Microchip USB 2.0 Hub"),
+    ("1-1.2", "05ac", "12a8", "00008030001A2D3E0C", "Apple, Inc. iPhone"),
+    ("1-1.3", "0d8c", "0014", "", "C-Media Audio Adapter"),
+    ("1-1.4", "1546", "01a7", "", "u-blox GPS receiver"),
+    ("1-1.1.1", "0eef", "0005", "", "D-WAV Touchscreen"),
+    ("1-1.1.2", "046d", "c31c", "", "Logitech Keyboard"),
+]
+
+
+def build_fake_sysfs(root):
+    for bus_path, vendor, product, serial, _ in FAKE_DEVICES:
+        device = os.path.join(root, bus_path)
+        os.makedirs(device)
+        for name, value in (("idVendor", vendor), ("idProduct", product), ("serial", serial)):
+            with open(os.path.join(device, name), "w") as f:
+                f.write(value + "\n")
+        # Interface directories sit alongside devices in the real tree
+        os.makedirs(os.path.join(root, bus_path + ":1.0"))
+
+
+def lsusb_command(root):
+    if shutil.which("lsusb"):
+        return ["lsusb"]
+    listing = os.path.join(root, "lsusb.txt")
+    with open(listing, "w") as f:
+        for i, (_, vendor, product, _, name) in enumerate(FAKE_DEVICES):
+            f.write(f"Bus 001 Device {i + 1:03d}: ID {vendor}:{product} {name}\n")
+    return ["cat", listing]
+
+
+def time_per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    root = tempfile.mkdtemp(prefix="fake-sysfs-")
+    try:
+        sysfs = os.path.join(root, "devices")
+        build_fake_sysfs(sysfs)
+        command = lsusb_command(root)
+
+        def lsusb_path():
+            result = subprocess.run(command, capture_output=True, text=True)
+            return '05ac:' in result.stdout
+
+        def cold_scan():
+            scanner = SysfsUsbScanner(sysfs)
+            scanner.scan()
+            return scanner.apple_devices
+
+        scanner = SysfsUsbScanner(sysfs)
+        connected, _ = scanner.scan()
+        assert connected == {"1-1.2"}, connected
+
+        def warm_scan():
+            scanner.scan()
+            return scanner.apple_devices
+
+        results = [
+            (command[0] if command[0] == "lsusb" else "lsusb (emulated with cat)",
+             time_per_call(lsusb_path, iterations)),
+            ("sysfs scan (cold inventory)", time_per_call(cold_scan, iterations)),
+            ("sysfs scan (cached inventory)", time_per_call(warm_scan, iterations)),
+        ]
+
+        print(f"{len(FAKE_DEVICES)} fake devices, {iterations} iterations")
+        baseline = results[0][1]
+        for label, micros in results:
+            print(f"  {label:32s} {micros:10.1f} us/poll  ({baseline / micros:5.1f}x)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
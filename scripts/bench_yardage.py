@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare the NumPy yardage engine with per-target scalar haversine calls
+
+Times distances from the cart to every target on one hole and on the
+whole course using GPSNavigation.calculate_distance in a loop versus one
+batched YardageEngine call, and reports the planar approximation error.
+
+Usage: QT_QPA_PLATFORM=offscreen python3 scripts/bench_yardage.py [fixes] [holes]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from course.course_data import course_from_geojson
+from synthetic_course import generate_course
+from course.yardage import YardageEngine
+from ui.gps_navigation import GPSNavigation
+
+METERS_PER_MILE = 1609.344
+
+
+def timed(function, fixes):
+    start = time.perf_counter()
+    for lat, lon in fixes:
+        function(lat, lon)
+    return (time.perf_counter() - start) / len(fixes) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    holes = int(sys.argv[2]) if len(sys.argv) > 2 else 36
+
+    course = course_from_geojson(generate_course(holes))
+    engine = YardageEngine(course)
+    scalar = GPSNavigation.calculate_distance
+
+    hole = 5
+    tee = course.features_for_hole(hole, 'tee')[0].coords[0]
+    green = course.features_for_hole(hole, 'green_middle')[0].coords[0]
+    fixes = [(tee[0] + (green[0] - tee[0]) * i / count, tee[1] + (green[1] - tee[1]) * i / count)
+             for i in range(count)]
+
+    for label, targets, points in (
+            (f"hole {hole}", *engine.holes[hole]),
+            ("whole course", engine.all_targets, engine.all_points)):
+        coords = [course.projection.to_latlon(x, y) for x, y in points]
+        scalar_us = timed(lambda lat, lon: [scalar(None, (lat, lon), c) for c in coords], fixes)
+        if label == "whole course":
+            batched_us = timed(engine.measure_all, fixes)
+        else:
+            batched_us = timed(lambda lat, lon: engine.measure(lat, lon, hole), fixes)
+        print(f"{label:<13} {len(targets):>4} targets: scalar {scalar_us:>8.1f} us  "
+              f"numpy {batched_us:>6.1f} us  ({scalar_us / batched_us:.1f}x)")
+
+    # Planar (local tangent plane) vs haversine distances
+    worst = 0.0
+    for lat, lon in fixes[::50]:
+        result = engine.measure_all(lat, lon)
+        for (x, y), meters in zip(engine.all_points, result.meters):
+            exact = scalar(None, (lat, lon), course.projection.to_latlon(x, y)) * METERS_PER_MILE
+            worst = max(worst, abs(meters - exact))
+    print(f"\nmax planar error vs haversine: {worst:.2f} m")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+Synthetic Course - Generates realistic course GeoJSON for tests and benchmarks
+"""
+
+import math
+import random
+from xml.sax.saxutils import quoteattr
+
+from course.geo import LocalProjection
+
+HOLES_PER_ROW = 6
+HOLE_SPACING = 130.0
+ROW_SPACING = 620.0
+PATH_OFFSET = 40.0
+
+
+def circle(cx, cy, radius, sides=12):
+    return [(cx + radius * math.cos(2 * math.pi * i / sides),
+             cy + radius * math.sin(2 * math.pi * i / sides)) for i in range(sides)]
+
+
+def rectangle(ax, ay, bx, by, half_width):
+    """Polygon around segment AB"""
+    length = math.hypot(bx - ax, by - ay)
+    nx, ny = -(by - ay) / length * half_width, (bx - ax) / length * half_width
+    return [(ax + nx, ay + ny), (bx + nx, by + ny), (bx - nx, by - ny), (ax - nx, ay - ny)]
+
+
+def generate_course(holes=18, seed=0, origin=(35.7796, -78.6382), name="Synthetic Links"):
+    """GeoJSON FeatureCollection with tees, greens, hazards, outlines and cart paths
+
+    Holes snake back and forth in rows of six. A cart path runs beside each
+    hole and connects each green to the next tee, with crossovers between
+    rows and spurs to the clubhouse and parking, so the paths form one
+    connected network.
+    """
+    rng = random.Random(seed)
+    projection = LocalProjection(*origin)
+    features = []
+
+    def lonlat(x, y):
+        lat, lon = projection.to_latlon(x, y)
+        return [round(lon, 7), round(lat, 7)]
+
+    def add(kind, geometry, points, **props):
+        if geometry == 'Point':
+            coordinates = lonlat(*points[0])
+        elif geometry == 'LineString':
+            coordinates = [lonlat(*p) for p in points]
+        else:
+            coordinates = [[lonlat(*p) for p in points + points[:1]]]
+        props['kind'] = kind
+        features.append({
+            'type': 'Feature',
+            'properties': props,
+            'geometry': {'type': geometry, 'coordinates': coordinates},
+        })
+
+    clubhouse = (-120.0, -80.0)
+    add('clubhouse', 'Point', [clubhouse], name="Clubhouse", destination=True)
+    add('pro_shop', 'Point', [(clubhouse[0] + 15, clubhouse[1] + 5)], name="Pro Shop",
+        destination=True)
+    add('parking', 'Point', [(clubhouse[0] - 40, clubhouse[1] - 30)], name="Parking",
+        destination=True)
+    add('driving_range', 'Point', [(clubhouse[0] - 60, clubhouse[1] + 150)],
+        name="Driving Range", destination=True)
+    add('snack_bar', 'Point', [(clubhouse[0] + 10, clubhouse[1] - 15)], name="Snack Bar",
+        amenity="food drinks")
+
+    path_junctions = []
+    previous_end = clubhouse
+    for hole in range(1, holes + 1):
+        row, col = divmod(hole - 1, HOLES_PER_ROW)
+        if row % 2:
+            col = HOLES_PER_ROW - 1 - col
+        base_x = col * HOLE_SPACING
+        base_y = row * ROW_SPACING
+        length = rng.choice((150, 330, 370, 400, 440, 500))
+        northbound = (hole % 2) == 1
+        drift = rng.uniform(-30, 30)
+        if northbound:
+            tee = (base_x, base_y)
+            green = (base_x + drift, base_y + length)
+        else:
+            tee = (base_x, base_y + 520)
+            green = (base_x + drift, base_y + 520 - length)
+
+        dx, dy = green[0] - tee[0], green[1] - tee[1]
+        unit = (dx / length, dy / length)
+        par = 3 if length < 200 else 4 if length < 460 else 5
+        label = f"Hole {hole}"
+
+        add('hole', 'Polygon', rectangle(tee[0] - unit[0] * 10, tee[1] - unit[1] * 10,
+                                         green[0] + unit[0] * 25, green[1] + unit[1] * 25,
+                                         HOLE_SPACING / 2 - 5),
+            name=label, hole=hole, par=par)
+        for i, color in enumerate(("Blue", "White", "Red")):
+            add('tee', 'Point', [(tee[0] + unit[0] * 15 * i, tee[1] + unit[1] * 15 * i)],
+                name=f"{label} Tee ({color})" if i else label, hole=hole,
+                destination=(i == 0 and hole in (1, 10)))
+        if par > 3:
+            add('fairway', 'Polygon',
+                rectangle(tee[0] + unit[0] * 90, tee[1] + unit[1] * 90,
+                          green[0] - unit[0] * 30, green[1] - unit[1] * 30, 18),
+                name=f"{label} Fairway", hole=hole)
+        add('green', 'Polygon', circle(*green, 15), name=f"{label} Green", hole=hole)
+        if hole % 9 == 4:
+            # Beside the cart path at the tee
+            path_side = PATH_OFFSET if northbound else -PATH_OFFSET
+            add('restroom', 'Point', [(tee[0] + path_side * 1.3, tee[1])],
+                name=f"Restroom ({label})", amenity="toilets")
+        for offset, position in ((-12, 'front'), (0, 'middle'), (12, 'back')):
+            add(f'green_{position}', 'Point',
+                [(green[0] + unit[0] * offset, green[1] + unit[1] * offset)],
+                name=f"{label} Green ({position.title()})", hole=hole)
+
+        for h in range(rng.randint(2, 4)):
+            along = rng.uniform(0.35, 0.95) * length
+            side = rng.choice((-1, 1)) * rng.uniform(10, 30)
+            hx = tee[0] + unit[0] * along - unit[1] * side
+            hy = tee[1] + unit[1] * along + unit[0] * side
+            kind_name = "Water" if h == 0 and par > 3 else "Bunker"
+            add('hazard', 'Polygon', circle(hx, hy, rng.uniform(6, 14), 8),
+                name=f"{label} {kind_name} {h + 1}", hole=hole, hazard=kind_name.lower())
+
+        # Cart path: from the previous green to this tee, then along the hole
+        side = PATH_OFFSET if northbound else -PATH_OFFSET
+        path_start = (tee[0] + side, tee[1] - unit[1] * 5)
+        path_points = [path_start]
+        for step in range(1, 6):
+            t = step / 5
+            path_points.append((tee[0] + side + dx * t + rng.uniform(-4, 4),
+                                tee[1] + dy * t))
+        add('cart_path', 'LineString', [previous_end, path_start],
+            name=f"Path to {label}")
+        add('cart_path', 'LineString', path_points, name=f"{label} Path", hole=hole)
+        path_junctions.append(path_points[2])
+        previous_end = path_points[-1]
+
+    add('cart_path', 'LineString', [previous_end, clubhouse], name="Path to Clubhouse")
+    add('cart_path', 'LineString', [clubhouse, (clubhouse[0] - 40, clubhouse[1] - 30)],
+        name="Parking Path")
+
+    # Crossovers between neighbouring holes make the network more than a loop
+    for a, b in zip(path_junctions[::3], path_junctions[1::3]):
+        add('cart_path', 'LineString', [a, b], name="Crossover")
+
+    return {'type': 'FeatureCollection', 'name': name, 'features': features}
+
+
+# Course kinds written as tagged OSM nodes
+OSM_POINT_TAGS = {
+    'clubhouse': {'golf': 'clubhouse'},
+    'tee': {'golf': 'tee'},
+    'parking': {'amenity': 'parking'},
+    'driving_range': {'golf': 'driving_range'},
+    'restroom': {'amenity': 'toilets'},
+    'snack_bar': {'amenity': 'fast_food'},
+}
+
+
+def write_osm_extract(out, courses, filler_nodes=0, seed=0):
+    """Write generated courses as OSM XML, tagged the way OpenStreetMap maps
+    golf courses, padded with unrelated streets like a county extract
+
+    Holes become golf=hole lines, water hazards multipolygon relations of two member ways, and
+    each course gets a leisure=golf_course outline.
+    """
+    rng = random.Random(seed)
+    nodes = []
+    ways = []
+    relations = []
+
+    def node(lat, lon, tags=None):
+        nodes.append((len(nodes) + 1, lat, lon, tags or {}))
+        return len(nodes)
+
+    def way(coords, tags, closed=False):
+        refs = [node(lat, lon) for lat, lon in coords]
+        if closed:
+            refs.append(refs[0])
+        ways.append((len(ways) + 1, refs, tags))
+        return len(ways)
+
+    for data in courses:
+        # Hole lines run from the first tee to the middle of the green
+        starts = {}
+        ends = {}
+        for feature in data['features']:
+            props = feature['properties']
+            if props['kind'] == 'tee':
+                lon, lat = feature['geometry']['coordinates']
+                starts.setdefault(props['hole'], (lat, lon))
+            elif props['kind'] == 'green_middle':
+                lon, lat = feature['geometry']['coordinates']
+                ends[props['hole']] = (lat, lon)
+
+        lats, lons = [], []
+        for feature in data['features']:
+            props = feature['properties']
+            kind = props['kind']
+            geometry = feature['geometry']
+            if geometry['type'] == 'Point':
+                coords = [tuple(reversed(geometry['coordinates']))]
+            elif geometry['type'] == 'LineString':
+                coords = [(lat, lon) for lon, lat in geometry['coordinates']]
+            else:
+                coords = [(lat, lon) for lon, lat in geometry['coordinates'][0][:-1]]
+            lats.extend(c[0] for c in coords)
+            lons.extend(c[1] for c in coords)
+
+            if kind in OSM_POINT_TAGS:
+                tags = dict(OSM_POINT_TAGS[kind])
+                if kind in ('clubhouse', 'snack_bar'):
+                    tags['name'] = props['name']
+                node(*coords[0], tags)
+            elif kind in ('green', 'fairway'):
+                way(coords, {'golf': kind}, closed=True)
+            elif kind == 'hazard' and props.get('hazard') == 'water':
+                half = len(coords) // 2
+                first = way(coords[:half + 1], {})
+                # The second member way shares both end nodes with the first
+                refs = [ways[first - 1][1][-1]] + [node(*c) for c in coords[half + 1:]]
+                refs.append(ways[first - 1][1][0])
+                ways.append((len(ways) + 1, refs, {}))
+                relations.append((len(relations) + 1, [first, len(ways)],
+                                  {'type': 'multipolygon', 'golf': 'water_hazard'}))
+            elif kind == 'hazard':
+                way(coords, {'golf': 'bunker'}, closed=True)
+            elif kind == 'cart_path':
+                way(coords, {'golf': 'cartpath'})
+            elif kind == 'hole':
+                hole = props['hole']
+                way([starts[hole], ends[hole]],
+                    {'golf': 'hole', 'ref': str(hole), 'par': str(props.get('par', 4))})
+
+        margin = 0.0008
+        outline = [(min(lats) - margin, min(lons) - margin), (min(lats) - margin, max(lons) + margin),
+                   (max(lats) + margin, max(lons) + margin), (max(lats) + margin, min(lons) - margin)]
+        way(outline, {'leisure': 'golf_course', 'name': data['name']}, closed=True)
+
+    # The county around the courses: streets of ten nodes each
+    all_lats = [n[1] for n in nodes]
+    all_lons = [n[2] for n in nodes]
+    south, north = min(all_lats) - 0.2, max(all_lats) + 0.2
+    west, east = min(all_lons) - 0.2, max(all_lons) + 0.2
+    first_filler = len(nodes) + 1
+
+    def attrs(tags):
+        return ''.join(f'<tag k={quoteattr(k)} v={quoteattr(str(v))}/>' for k, v in tags.items())
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6" generator="synthetic">\n')
+    for node_id, lat, lon, tags in nodes:
+        body = f'>{attrs(tags)}</node>' if tags else '/>'
+        out.write(f' <node id="{node_id}" lat="{lat:.7f}" lon="{lon:.7f}"{body}\n')
+    for i in range(filler_nodes):
+        lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+        if i % 500 == 0:
+            tags = {'amenity': rng.choice(('bench', 'parking', 'toilets'))}
+            out.write(f' <node id="{first_filler + i}" lat="{lat:.7f}" lon="{lon:.7f}">'
+                      f'{attrs(tags)}</node>\n')
+        else:
+            out.write(f' <node id="{first_filler + i}" lat="{lat:.7f}" lon="{lon:.7f}" '
+                      f'version="3" timestamp="2024-05-01T12:00:00Z"/>\n')
+    for way_id, refs, tags in ways:
+        nds = ''.join(f'<nd ref="{r}"/>' for r in refs)
+        out.write(f' <way id="{way_id}">{nds}{attrs(tags)}</way>\n')
+    street_id = len(ways) + 1
+    for start in range(0, filler_nodes - 9, 10):
+        nds = ''.join(f'<nd ref="{first_filler + start + k}"/>' for k in range(10))
+        tags = {'highway': 'residential', 'name': f"Street {street_id}"}
+        out.write(f' <way id="{street_id}">{nds}{attrs(tags)}</way>\n')
+        street_id += 1
+    for relation_id, members, tags in relations:
+        body = ''.join(f'<member type="way" ref="{m}" role="outer"/>' for m in members)
+        out.write(f' <relation id="{relation_id}">{body}{attrs(tags)}</relation>\n')
+    out.write('</osm>\n')
@@ -3,12 +3,16 @@ CarPlay Manager - Handles Apple CarPlay integration
 """
 
 import os
-import subprocess
+import time
 import logging
-from PyQt5.QtCore import QObject, QTimer, pyqtSignal, QProcess
+from PyQt5.QtCore import QObject, QTimer, QThread, pyqtSignal
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt5.QtGui import QWindow
 from PyQt5.QtCore import Qt
+from .usb_hotplug import UsbHotplugMonitor
+from .usb_scanner import SysfsUsbScanner
+from .device_monitor import DeviceMonitorWorker
+from .openauto_supervisor import OpenAutoSupervisor, DEFAULT_FIRST_FRAME_PATTERN
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +21,27 @@ class CarPlayManager(QObject):
     
     device_connected = pyqtSignal()
     device_disconnected = pyqtSignal()
+    stop_worker = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
-        self.carplay_process = None
         self.monitoring = False
         self.connected = False
         
+        # Read USB devices straight from sysfs where available (Linux)
+        self.usb_scanner = SysfsUsbScanner() if SysfsUsbScanner.available() else None
+        
         # Check for OpenAuto Pro installation
         self.openauto_path = self.find_openauto()
+        self.openauto_supervisor = None
+        if self.openauto_path:
+            self.openauto_supervisor = self.create_openauto_supervisor()
+            
+        # Custom CarPlay surface, built once and reused between connections
+        self.carplay_widget = None
+        self.launch_started = None
+        self.launch_timings = []
         
     def find_openauto(self):
         """Find OpenAuto Pro installation"""
@@ -49,54 +64,85 @@ class CarPlayManager(QObject):
         """Start monitoring for iPhone connections"""
         self.monitoring = True
         
-        # Setup USB monitoring timer
-        self.monitor_timer = QTimer()
-        self.monitor_timer.timeout.connect(self.check_usb_devices)
-        self.monitor_timer.start(2000)  # Check every 2 seconds
+        # Keep OpenAuto pre-spawned so connecting a phone is a warm start
+        if self.openauto_supervisor and self.openauto_supervisor.standby:
+            self.openauto_supervisor.start_standby()
+        elif not self.openauto_path:
+            # Build the fallback CarPlay surface once the event loop is idle
+            QTimer.singleShot(0, self.prebuild_carplay_widget)
+        
+        carplay_settings = getattr(self.parent, 'settings', {}).get('carplay', {})
+        
+        # Hysteresis so a flapping cable does not hide/show the main window
+        self.connect_debounce_ms = carplay_settings.get('connect_debounce_ms', 300)
+        self.disconnect_debounce_ms = carplay_settings.get('disconnect_debounce_ms', 1500)
+        self.pending_presence = self.connected
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(lambda: self.set_connected(self.pending_presence))
+        
+        # Prefer kernel hotplug events; fall back to polling where unavailable
+        self.hotplug_monitor = UsbHotplugMonitor.create(self)
+        if self.hotplug_monitor:
+            self.hotplug_monitor.device_connected.connect(lambda: self.on_device_presence(True))
+            self.hotplug_monitor.device_disconnected.connect(lambda: self.on_device_presence(False))
+            self.set_connected(self.hotplug_monitor.is_device_present())
+            logger.info("Started CarPlay device monitoring (USB hotplug events)")
+            return
         
-        logger.info("Started CarPlay device monitoring")
+        # Poll on a worker thread so a slow USB bus cannot block the UI
+        self.monitor_thread = QThread(self)
+        self.monitor_worker = DeviceMonitorWorker(
+            self.usb_scanner,
+            interval_ms=2000,  # Check every 2 seconds
+            poll_timeout=carplay_settings.get('poll_timeout', 5)
+        )
+        self.monitor_worker.moveToThread(self.monitor_thread)
+        self.monitor_worker.device_present.connect(self.on_device_presence)
+        self.monitor_thread.started.connect(self.monitor_worker.start)
+        self.monitor_thread.finished.connect(self.monitor_worker.deleteLater)
+        self.stop_worker.connect(self.monitor_worker.stop)
+        self.monitor_thread.start()
+        
+        logger.info("Started CarPlay device monitoring (polling)")
         
     def stop_monitoring(self):
         """Stop monitoring for devices"""
         self.monitoring = False
-        if hasattr(self, 'monitor_timer'):
-            self.monitor_timer.stop()
+        if getattr(self, 'hotplug_monitor', None):
+            self.hotplug_monitor.stop()
+            self.hotplug_monitor = None
+        if getattr(self, 'monitor_thread', None):
+            self.stop_worker.emit()
+            # Allow an in-flight poll to hit its timeout before giving up
+            timeout = self.monitor_worker.poll_timeout
+            if not self.monitor_thread.wait(int(timeout * 1000) + 500):
+                logger.warning("Device monitor thread did not stop in time")
+            self.monitor_thread = None
+        if hasattr(self, 'debounce_timer'):
+            self.debounce_timer.stop()
             
-    def check_usb_devices(self):
-        """Check for connected Apple devices"""
-        try:
-            # Check platform
-            import platform
-            if platform.system() == 'Darwin':  # macOS
-                # Use system_profiler on Mac
-                result = subprocess.run(
-                    ['system_profiler', 'SPUSBDataType'], 
-                    capture_output=True, 
-                    text=True
-                )
-                apple_device_found = 'iPhone' in result.stdout or 'iPad' in result.stdout
-            else:
-                # Use lsusb on Linux/Raspberry Pi
-                result = subprocess.run(
-                    ['lsusb'], 
-                    capture_output=True, 
-                    text=True
-                )
-                # Apple vendor ID is 05ac
-                apple_device_found = '05ac:' in result.stdout
-            
-            if apple_device_found and not self.connected:
-                self.connected = True
-                self.device_connected.emit()
-                logger.info("Apple device connected")
-                
-            elif not apple_device_found and self.connected:
-                self.connected = False
-                self.device_disconnected.emit()
-                logger.info("Apple device disconnected")
-                
-        except Exception as e:
-            logger.error(f"Error checking USB devices: {e}")
+    def on_device_presence(self, present):
+        """Debounce raw presence reports before changing connection state"""
+        self.pending_presence = present
+        if present == self.connected:
+            # Flapped back within the window - nothing to do
+            self.debounce_timer.stop()
+        elif not self.debounce_timer.isActive():
+            delay = self.connect_debounce_ms if present else self.disconnect_debounce_ms
+            self.debounce_timer.start(delay)
+            
+    def set_connected(self, apple_device_found):
+        """Emit connect/disconnect when the device presence changes"""
+        if apple_device_found and not self.connected:
+            self.connected = True
+            self.device_connected.emit()
+            logger.info("Apple device connected")
+            
+        elif not apple_device_found and self.connected:
+            self.connected = False
+            self.device_disconnected.emit()
+            logger.info("Apple device disconnected")
             
     def launch_carplay(self):
         """Launch CarPlay interface"""
@@ -111,47 +157,72 @@ class CarPlayManager(QObject):
             import traceback
             traceback.print_exc()
             
+    def create_openauto_supervisor(self):
+        """Create the supervisor that owns the OpenAuto process"""
+        carplay_settings = getattr(self.parent, 'settings', {}).get('carplay', {})
+        
+        # Launch OpenAuto with appropriate parameters
+        args = [
+            '--fullscreen',
+            '--audio-channels', '2',
+            '--fps', '30',
+            '--resolution', '800x480',
+            '--dpi', '150'
+        ]
+        
+        supervisor = OpenAutoSupervisor(
+            self.openauto_path,
+            args,
+            first_frame_pattern=carplay_settings.get(
+                'openauto_first_frame_pattern', DEFAULT_FIRST_FRAME_PATTERN),
+            standby=carplay_settings.get('openauto_standby', True),
+            raise_command=carplay_settings.get('openauto_raise_command'),
+            parent=self
+        )
+        supervisor.exited.connect(self.on_carplay_closed)
+        return supervisor
+        
     def launch_openauto(self):
         """Launch OpenAuto Pro"""
         try:
-            if self.carplay_process and self.carplay_process.state() == QProcess.Running:
-                logger.info("OpenAuto already running")
-                return
-                
-            self.carplay_process = QProcess()
-            self.carplay_process.finished.connect(self.on_carplay_closed)
-            
-            # Launch OpenAuto with appropriate parameters
-            args = [
-                '--fullscreen',
-                '--audio-channels', '2',
-                '--fps', '30',
-                '--resolution', '800x480',
-                '--dpi', '150'
-            ]
-            
-            self.carplay_process.start(self.openauto_path, args)
-            logger.info("Launched OpenAuto Pro")
-            
+            self.openauto_supervisor.activate()
         except Exception as e:
             logger.error(f"Error launching OpenAuto: {e}")
             
-    def launch_custom_carplay(self):
-        """Launch custom CarPlay interface (fallback)"""
-        try:
+    def get_carplay_widget(self):
+        """Return the CarPlay surface, building it on first use"""
+        if self.carplay_widget is None:
             # Import mock CarPlay
             from .mock_carplay import MockCarPlay
             
+            start = time.perf_counter()
             # Create CarPlay widget (don't pass parent to avoid issues)
             self.carplay_widget = MockCarPlay()
             self.carplay_widget.closed.connect(self.on_carplay_closed)
+            self.carplay_widget.shown.connect(self.on_carplay_visible)
+            logger.info(f"Built mock CarPlay interface in "
+                        f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        return self.carplay_widget
+        
+    def prebuild_carplay_widget(self):
+        """Build the CarPlay surface ahead of the first connection"""
+        try:
+            self.get_carplay_widget()
+        except Exception as e:
+            logger.error(f"Error building CarPlay interface: {e}")
+            
+    def launch_custom_carplay(self):
+        """Launch custom CarPlay interface (fallback)"""
+        try:
+            self.launch_started = time.perf_counter()
+            carplay_widget = self.get_carplay_widget()
             
             # Hide main window after creating CarPlay
             if self.parent:
                 self.parent.hide()
                 
             # Show CarPlay widget
-            self.carplay_widget.show()
+            carplay_widget.show()
             logger.info("Launched mock CarPlay interface")
             
         except Exception as e:
@@ -161,22 +232,37 @@ class CarPlayManager(QObject):
             # Show parent again if launch failed
             if self.parent:
                 self.parent.show()
+                
+    def on_carplay_visible(self):
+        """Record launch-to-visible time for the CarPlay surface"""
+        if self.launch_started is None:
+            return
+        elapsed_ms = (time.perf_counter() - self.launch_started) * 1000
+        self.launch_started = None
+        first_launch = not self.launch_timings
+        self.launch_timings.append(elapsed_ms)
+        logger.info(f"CarPlay visible {elapsed_ms:.1f} ms after launch "
+                    f"({'first' if first_launch else 'repeat'} launch)")
+        
+    def hide_carplay(self):
+        """Hide the CarPlay surface and return to the main window"""
+        if self.carplay_widget is not None and self.carplay_widget.isVisible():
+            self.carplay_widget.hide()
+        if self.parent and self.parent.isHidden():
+            self.parent.show()
         
     def on_carplay_closed(self):
         """Handle CarPlay process closure"""
         logger.info("CarPlay process closed")
         if self.parent and self.parent.isHidden():
             self.parent.show()
-        # Clean up widget reference
-        if hasattr(self, 'carplay_widget'):
-            self.carplay_widget = None
             
     def stop_carplay(self):
         """Stop CarPlay interface"""
-        if self.carplay_process and self.carplay_process.state() == QProcess.Running:
-            self.carplay_process.terminate()
+        if self.openauto_supervisor:
+            self.openauto_supervisor.stop()
             
-        if hasattr(self, 'carplay_widget'):
+        if self.carplay_widget is not None:
             self.carplay_widget.close()
             
             
@@ -0,0 +1,80 @@
+"""
+Device Monitor - Polls for Apple devices on a worker thread
+"""
+
+import platform
+import subprocess
+import logging
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+
+def detect_apple_device(usb_scanner=None, timeout=5.0):
+    """Check for a connected Apple device (None if the check did not complete)"""
+    try:
+        if platform.system() == 'Darwin':  # macOS
+            # Use system_profiler on Mac
+            result = subprocess.run(
+                ['system_profiler', 'SPUSBDataType'],
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+            return 'iPhone' in result.stdout or 'iPad' in result.stdout
+
+        if usb_scanner:
+            # Read sysfs on Linux/Raspberry Pi - no subprocess needed
+            usb_scanner.scan()
+            return bool(usb_scanner.apple_devices)
+
+        # Fall back to lsusb when sysfs is not mounted
+        result = subprocess.run(
+            ['lsusb'],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        # Apple vendor ID is 05ac
+        return '05ac:' in result.stdout
+
+    except subprocess.TimeoutExpired:
+        logger.warning(f"USB device check timed out after {timeout}s")
+    except Exception as e:
+        logger.error(f"Error checking USB devices: {e}")
+    return None
+
+
+class DeviceMonitorWorker(QObject):
+    """Runs detect_apple_device on a timer inside its own QThread"""
+
+    # Emitted after every completed poll; delivered queued to the GUI thread
+    device_present = pyqtSignal(bool)
+
+    def __init__(self, usb_scanner=None, interval_ms=2000, poll_timeout=5.0):
+        super().__init__()
+        self.usb_scanner = usb_scanner
+        self.interval_ms = interval_ms
+        self.poll_timeout = poll_timeout
+        self.timer = None
+
+    @pyqtSlot()
+    def start(self):
+        """Start polling (runs in the worker thread)"""
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.timer.start(self.interval_ms)
+        self.poll()
+
+    @pyqtSlot()
+    def poll(self):
+        present = detect_apple_device(self.usb_scanner, self.poll_timeout)
+        if present is not None:
+            self.device_present.emit(present)
+
+    @pyqtSlot()
+    def stop(self):
+        """Stop polling and end the worker thread's event loop"""
+        if self.timer:
+            self.timer.stop()
+        QThread.currentThread().quit()
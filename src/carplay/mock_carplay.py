@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                              QPushButton, QLabel, QFrame, QGraphicsDropShadowEffect)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QPainter, QColor, QFont, QLinearGradient, QBrush, QPainterPath
+from ui.render_cache import render_cache
 
 class CarPlayApp(QPushButton):
     def __init__(self, name, icon, color, parent=None):
@@ -36,7 +37,10 @@ class CarPlayApp(QPushButton):
         self.animation.start()
         
     def paintEvent(self, event):
-        painter = QPainter(self)
+        state = (self.name, self.icon, self.color.rgba())
+        render_cache.paint(self, 'carplay_app', state, self.draw)
+        
+    def draw(self, painter, width, height):
         painter.setRenderHint(QPainter.Antialiasing)
         
         # Draw rounded rectangle background
@@ -63,11 +67,32 @@ class CarPlayApp(QPushButton):
 
 class MockCarPlay(QWidget):
     closed = pyqtSignal()
+    # Emitted on the first paint after each show
+    shown = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.awaiting_paint = False
         self.init_ui()
         
+    def showEvent(self, event):
+        # Resume the clock while visible
+        self.awaiting_paint = True
+        self.update_time()
+        self.timer.start(1000)
+        super().showEvent(event)
+        
+    def hideEvent(self, event):
+        # Nothing to update while hidden
+        self.timer.stop()
+        super().hideEvent(event)
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.awaiting_paint:
+            self.awaiting_paint = False
+            self.shown.emit()
+        
     def init_ui(self):
         self.setWindowTitle("CarPlay")
         self.setFixedSize(800, 480)
@@ -123,11 +148,9 @@ class MockCarPlay(QWidget):
         self.time_label.setStyleSheet("color: white; font-size: 16px;")
         layout.addWidget(self.time_label)
         
-        # Update time
-        self.timer = QTimer()
+        # Update time (started in showEvent, paused while hidden)
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
-        self.update_time()
         
         status.setLayout(layout)
         return status
@@ -0,0 +1,171 @@
+"""
+OpenAuto Supervisor - Keeps OpenAuto Pro warm, restarts it after crashes
+and records launch metrics
+"""
+
+import re
+import time
+import logging
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# OpenAuto logs when its video channel comes up; override via settings
+DEFAULT_FIRST_FRAME_PATTERN = r"VideoService.*(start|setup)|first frame"
+
+
+class OpenAutoSupervisor(QObject):
+    """Supervises a single OpenAuto process
+
+    The standby instance runs with standby_args (args without --fullscreen
+    unless given) so it does not cover the home screen while no phone is
+    connected; activate() brings it forward with raise_command, e.g. a
+    wmctrl call. After a clean exit OpenAuto stays down until the next
+    connection.
+    """
+
+    # Emitted with the connect-to-first-frame latency in milliseconds
+    first_frame = pyqtSignal(float)
+    # Emitted when the process exits and will not be restarted for a crash
+    exited = pyqtSignal()
+
+    def __init__(self, program, args=None, first_frame_pattern=DEFAULT_FIRST_FRAME_PATTERN,
+                 standby=True, backoff_initial=1.0, backoff_max=60.0, stable_after=30.0,
+                 standby_args=None, raise_command=None, parent=None):
+        super().__init__(parent)
+        self.program = program
+        self.args = list(args or [])
+        if standby_args is None:
+            standby_args = [arg for arg in self.args if arg != '--fullscreen']
+        self.standby_args = list(standby_args)
+        self.raise_command = list(raise_command or [])
+        self.first_frame_re = re.compile(first_frame_pattern)
+        self.standby = standby
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+
+        self.process = None
+        self.stopping = False
+        # A phone session is running (as opposed to waiting in standby)
+        self.live = False
+        self.started_at = None
+        self.connect_time = None
+        self.consecutive_failures = 0
+
+        # Metrics
+        self.restart_count = 0
+        self.launch_latencies = []
+
+        self.restart_timer = QTimer(self)
+        self.restart_timer.setSingleShot(True)
+        self.restart_timer.timeout.connect(self.spawn)
+
+    def is_running(self):
+        return self.process is not None and self.process.state() != QProcess.NotRunning
+
+    def start_standby(self):
+        """Pre-spawn OpenAuto so it is already waiting when a phone connects"""
+        self.stopping = False
+        if not self.is_running():
+            self.spawn()
+
+    def activate(self):
+        """Mark a phone connection and make sure OpenAuto is running"""
+        self.stopping = False
+        self.live = True
+        self.connect_time = time.monotonic()
+        if self.is_running():
+            logger.info("OpenAuto already running (warm start)")
+            self.raise_window()
+        else:
+            self.restart_timer.stop()
+            self.spawn()
+
+    def stop(self, timeout_ms=3000):
+        """Stop OpenAuto without restarting it"""
+        self.stopping = True
+        self.live = False
+        self.restart_timer.stop()
+        if self.is_running():
+            # on_finished lets go of self.process while waiting
+            process = self.process
+            process.terminate()
+            if not process.waitForFinished(timeout_ms):
+                process.kill()
+                process.waitForFinished(timeout_ms)
+
+    def spawn(self):
+        """Start a new OpenAuto process"""
+        if self.process is not None:
+            # Never started (no finished signal), e.g. the binary went missing
+            self.release(self.process)
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.process.readyReadStandardOutput.connect(self.on_output)
+        self.process.finished.connect(self.on_finished)
+        self.process.start(self.program, self.args if self.live else self.standby_args)
+        self.started_at = time.monotonic()
+        logger.info(f"Launched OpenAuto Pro {'' if self.live else 'in standby '}"
+                    f"(restarts so far: {self.restart_count})")
+
+    def raise_window(self):
+        """Bring the standby instance in front of the home screen"""
+        if self.raise_command and not QProcess.startDetached(self.raise_command[0],
+                                                             self.raise_command[1:]):
+            logger.warning(f"Could not run {self.raise_command[0]} to raise OpenAuto")
+
+    def on_output(self):
+        """Scan OpenAuto's log output for the first rendered frame"""
+        while self.process.canReadLine():
+            line = bytes(self.process.readLine()).decode('utf-8', 'replace').rstrip()
+            logger.debug(f"openauto: {line}")
+            if self.connect_time is not None and self.first_frame_re.search(line):
+                latency_ms = (time.monotonic() - self.connect_time) * 1000
+                self.connect_time = None
+                self.launch_latencies.append(latency_ms)
+                logger.info(f"OpenAuto first frame {latency_ms:.0f} ms after connect")
+                self.first_frame.emit(latency_ms)
+
+    def release(self, process):
+        """Disconnect and delete a finished process"""
+        process.readyReadStandardOutput.disconnect(self.on_output)
+        process.finished.disconnect(self.on_finished)
+        process.deleteLater()
+        if process is self.process:
+            self.process = None
+
+    def on_finished(self, exit_code, exit_status):
+        """Restart after a crash with exponential backoff"""
+        self.release(self.sender())
+        uptime = time.monotonic() - self.started_at if self.started_at else 0
+        if self.stopping:
+            self.exited.emit()
+            return
+
+        crashed = exit_status == QProcess.CrashExit or exit_code != 0
+        if not crashed:
+            # The user closed it; don't pop it back over the home screen
+            logger.info("OpenAuto exited")
+            self.consecutive_failures = 0
+            self.live = False
+            self.exited.emit()
+            return
+
+        if uptime >= self.stable_after:
+            self.consecutive_failures = 0
+        delay = min(self.backoff_initial * (2 ** self.consecutive_failures), self.backoff_max)
+        self.consecutive_failures += 1
+        self.restart_count += 1
+        logger.warning(f"OpenAuto crashed (exit code {exit_code}); restarting in {delay:.1f}s")
+        self.restart_timer.start(int(delay * 1000))
+
+    def metrics(self):
+        """Launch latency and restart statistics"""
+        latencies = self.launch_latencies
+        return {
+            'restart_count': self.restart_count,
+            'launches': len(latencies),
+            'last_latency_ms': latencies[-1] if latencies else None,
+            'mean_latency_ms': sum(latencies) / len(latencies) if latencies else None,
+        }
@@ -0,0 +1,153 @@
+"""
+USB Hotplug Monitor - Event-driven Apple device detection via kernel uevents
+"""
+
+import socket
+import logging
+from PyQt5.QtCore import QObject, QSocketNotifier, pyqtSignal
+from .usb_scanner import SysfsUsbScanner, SYSFS_USB_DEVICES
+
+logger = logging.getLogger(__name__)
+
+# Apple's USB vendor ID
+APPLE_VENDOR_ID = 0x05ac
+
+# Netlink protocol and multicast group used by the kernel for uevents
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_UEVENT_GROUP = 1
+
+
+def parse_uevent(data):
+    """Parse a raw kernel uevent datagram into a dict (None if not a uevent)"""
+    # Kernel messages look like: b"add@/devices/...\0ACTION=add\0KEY=value\0..."
+    # udev rebroadcasts start with b"libudev\0" and a binary header - skip those
+    if not data or data.startswith(b"libudev"):
+        return None
+
+    parts = data.split(b"\0")
+    if b"@" not in parts[0]:
+        return None
+
+    event = {}
+    for part in parts[1:]:
+        key, sep, value = part.partition(b"=")
+        if sep:
+            event[key.decode("ascii", "replace")] = value.decode("utf-8", "replace")
+
+    if "ACTION" not in event or "DEVPATH" not in event:
+        return None
+    return event
+
+
+def uevent_vendor_id(event):
+    """Return the USB vendor ID from a uevent's PRODUCT key, or None"""
+    # PRODUCT is "vendor/product/bcdDevice" in unpadded hex, e.g. "5ac/12a8/1102"
+    product = event.get("PRODUCT")
+    if not product:
+        return None
+    try:
+        return int(product.split("/")[0], 16)
+    except ValueError:
+        return None
+
+
+class NetlinkUeventSource:
+    """Non-blocking kernel uevent socket"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM,
+                                  NETLINK_KOBJECT_UEVENT)
+        try:
+            self.sock.bind((0, KERNEL_UEVENT_GROUP))
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read_events(self):
+        """Drain all pending uevents from the socket"""
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            event = parse_uevent(data)
+            if event:
+                events.append(event)
+        return events
+
+    def close(self):
+        self.sock.close()
+
+
+def find_present_apple_devices(sysfs_root=SYSFS_USB_DEVICES):
+    """Return devpaths of Apple devices already attached when monitoring starts"""
+    scanner = SysfsUsbScanner(sysfs_root)
+    scanner.scan()
+    return {scanner.devpath(bus_path) for bus_path in scanner.apple_devices}
+
+
+class UsbHotplugMonitor(QObject):
+    """Emits connect/disconnect as soon as the kernel reports an Apple device"""
+
+    device_connected = pyqtSignal()
+    device_disconnected = pyqtSignal()
+
+    def __init__(self, source=None, present_devices=None, parent=None):
+        super().__init__(parent)
+        self.source = source if source is not None else NetlinkUeventSource()
+        self.apple_devices = set(present_devices or ())
+
+        self.notifier = QSocketNotifier(self.source.fileno(), QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.on_readable)
+
+    @classmethod
+    def create(cls, parent=None):
+        """Create a monitor on the kernel uevent socket, or None if unsupported"""
+        if not hasattr(socket, "AF_NETLINK"):
+            return None
+        try:
+            source = NetlinkUeventSource()
+        except OSError as e:
+            logger.warning(f"USB hotplug events unavailable: {e}")
+            return None
+        return cls(source, find_present_apple_devices(), parent)
+
+    def is_device_present(self):
+        return bool(self.apple_devices)
+
+    def on_readable(self):
+        """Handle pending uevents on the socket"""
+        for event in self.source.read_events():
+            self.handle_event(event)
+
+    def handle_event(self, event):
+        """Track Apple USB devices and emit on presence changes"""
+        if event.get("SUBSYSTEM") != "usb" or event.get("DEVTYPE") != "usb_device":
+            return
+
+        action = event["ACTION"]
+        devpath = event["DEVPATH"]
+        was_present = bool(self.apple_devices)
+
+        if action == "add" and uevent_vendor_id(event) == APPLE_VENDOR_ID:
+            self.apple_devices.add(devpath)
+            logger.debug(f"Apple USB device added: {devpath}")
+        elif action == "remove":
+            self.apple_devices.discard(devpath)
+        else:
+            return
+
+        if self.apple_devices and not was_present:
+            self.device_connected.emit()
+        elif not self.apple_devices and was_present:
+            self.device_disconnected.emit()
+
+    def stop(self):
+        """Stop listening for uevents"""
+        self.notifier.setEnabled(False)
+        self.source.close()
@@ -0,0 +1,93 @@
+"""
+USB Scanner - Subprocess-free USB device inventory read from sysfs
+"""
+
+import os
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+SYSFS_USB_DEVICES = "/sys/bus/usb/devices"
+
+# Apple's USB vendor ID as written in sysfs idVendor files
+APPLE_VENDOR = "05ac"
+
+UsbDevice = namedtuple('UsbDevice', ['vendor_id', 'product_id', 'serial'])
+
+
+def read_attribute(entry, name):
+    """Read a single sysfs attribute, returning '' if it is missing"""
+    try:
+        with open(os.path.join(entry, name)) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+class SysfsUsbScanner:
+    """Keeps an inventory of USB devices keyed by bus path (e.g. '1-1.2')"""
+
+    def __init__(self, sysfs_root=SYSFS_USB_DEVICES):
+        self.sysfs_root = sysfs_root
+        self.inventory = {}
+        self.apple_devices = set()
+        # Bus path -> (inode, mtime) of the device directory when last read
+        self._stamps = {}
+
+    @staticmethod
+    def available(sysfs_root=SYSFS_USB_DEVICES):
+        """Whether the sysfs USB tree exists on this system"""
+        return os.path.isdir(sysfs_root)
+
+    def scan(self):
+        """Refresh the inventory and return (connected, disconnected) Apple bus paths"""
+        seen = set()
+        try:
+            with os.scandir(self.sysfs_root) as entries:
+                for entry in entries:
+                    # Interfaces ("1-1.2:1.0") share the parent device's IDs
+                    if ':' not in entry.name and self.refresh_entry(entry):
+                        seen.add(entry.name)
+        except OSError as e:
+            logger.error(f"Error reading {self.sysfs_root}: {e}")
+
+        for bus_path in set(self.inventory) - seen:
+            del self.inventory[bus_path]
+            del self._stamps[bus_path]
+
+        apple_devices = {bus_path for bus_path, device in self.inventory.items()
+                         if device.vendor_id == APPLE_VENDOR}
+        connected = apple_devices - self.apple_devices
+        disconnected = self.apple_devices - apple_devices
+        self.apple_devices = apple_devices
+        return connected, disconnected
+
+    def refresh_entry(self, entry):
+        """Re-read an entry only if its directory changed; False if not a device"""
+        try:
+            st = entry.stat()  # follows the symlink to the device directory
+        except OSError:
+            return False
+
+        bus_path = entry.name
+        stamp = (st.st_ino, st.st_mtime_ns)
+        if self._stamps.get(bus_path) == stamp:
+            return True
+
+        # New or re-enumerated device - (re)read its attributes
+        vendor_id = read_attribute(entry.path, 'idVendor')
+        if not vendor_id:
+            return False
+        self._stamps[bus_path] = stamp
+        self.inventory[bus_path] = UsbDevice(
+            vendor_id,
+            read_attribute(entry.path, 'idProduct'),
+            read_attribute(entry.path, 'serial')
+        )
+        return True
+
+    def devpath(self, bus_path):
+        """Kernel DEVPATH (as used in uevents) for a bus path"""
+        real = os.path.realpath(os.path.join(self.sysfs_root, bus_path))
+        return real[len("/sys"):] if real.startswith("/sys/") else real
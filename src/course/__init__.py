@@ -0,0 +1 @@
+# Course Module Initialization
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Course Data - Loads course geometry (tees, greens, hazards, cart paths) from GeoJSON
+"""
+
+import json
+import logging
+from collections import namedtuple, OrderedDict
+
+from .geo import LocalProjection, polyline_distance, polygon_distance
+
+logger = logging.getLogger(__name__)
+
+# Feature "kind" values understood by the app; anything else is kept as a
+# generic point of interest
+KINDS = {
+    'tee', 'green', 'green_front', 'green_middle', 'green_back', 'fairway',
+    'hazard', 'cart_path', 'hole', 'clubhouse', 'parking', 'pro_shop',
+    'driving_range', 'restroom', 'snack_bar', 'poi', 'no_cart', 'restricted',
+}
+
+
+class Feature(namedtuple('Feature', [
+        'index', 'kind', 'name', 'hole', 'geometry', 'coords', 'points', 'properties'])):
+    """One course feature; coords are (lat, lon), points the same in local meters"""
+
+    __slots__ = ()
+
+    def distance(self, x, y):
+        """Meters from a local point to the feature (0 inside polygons)"""
+        if self.geometry == 'Polygon':
+            return polygon_distance(x, y, self.points)
+        return polyline_distance(x, y, self.points)
+
+    def bounds(self):
+        xs = [p[0] for p in self.points]
+        ys = [p[1] for p in self.points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @property
+    def anchor(self):
+        """(lat, lon) used to navigate to the feature"""
+        if self.geometry == 'Point' or not self.coords:
+            return self.coords[0]
+        if self.geometry == 'LineString':
+            return self.coords[len(self.coords) // 2]
+        return (sum(c[0] for c in self.coords) / len(self.coords),
+                sum(c[1] for c in self.coords) / len(self.coords))
+
+
+def ring_coords(ring):
+    """(lat, lon) list from a GeoJSON [lon, lat] ring, without the closing point"""
+    coords = [(pt[1], pt[0]) for pt in ring]
+    if len(coords) > 1 and coords[0] == coords[-1]:
+        coords.pop()
+    return coords
+
+
+def geometry_coords(geometry):
+    kind = geometry.get('type')
+    raw = geometry.get('coordinates')
+    if kind == 'Point':
+        return [(raw[1], raw[0])]
+    if kind == 'LineString':
+        return [(pt[1], pt[0]) for pt in raw]
+    if kind == 'Polygon':
+        return ring_coords(raw[0])
+    return None
+
+
+class Course:
+    """All features of one course, projected into a shared local plane"""
+
+    def __init__(self, name, features, projection):
+        self.name = name
+        self.features = features
+        self.projection = projection
+        self.holes = sorted({f.hole for f in features if f.hole is not None})
+
+    def to_local(self, lat, lon):
+        return self.projection.to_local(lat, lon)
+
+    def features_for_hole(self, hole, kind=None):
+        return [f for f in self.features
+                if f.hole == hole and (kind is None or f.kind == kind)]
+
+    def destinations(self):
+        """Quick destinations: name -> (lat, lon), in file order"""
+        return OrderedDict(
+            (f.name, f.anchor) for f in self.features
+            if f.properties.get('destination') and f.name
+        )
+
+
+def course_from_geojson(data):
+    """Build a Course from a parsed GeoJSON FeatureCollection"""
+    raw_features = []
+    for item in data.get('features', []):
+        props = item.get('properties') or {}
+        geometry = item.get('geometry') or {}
+        coords = geometry_coords(geometry)
+        if not coords:
+            logger.warning(f"Skipping unsupported {geometry.get('type')} feature "
+                           f"'{props.get('name', '')}'")
+            continue
+        kind = props.get('kind', 'poi')
+        if kind not in KINDS:
+            kind = 'poi'
+        hole = props.get('hole')
+        raw_features.append((kind, props.get('name', ''),
+                             int(hole) if hole is not None else None,
+                             geometry['type'], coords, props))
+
+    if not raw_features:
+        raise ValueError("Course has no usable features")
+
+    lats = [c[0] for f in raw_features for c in f[4]]
+    lons = [c[1] for f in raw_features for c in f[4]]
+    projection = LocalProjection((min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2)
+
+    features = []
+    for kind, name, hole, geometry, coords, props in raw_features:
+        points = [projection.to_local(lat, lon) for lat, lon in coords]
+        features.append(Feature(len(features), kind, name, hole, geometry,
+                                coords, points, props))
+
+    add_hole_centerlines(features, projection)
+    name = data.get('name') or (data.get('properties') or {}).get('name', 'Course')
+    return Course(name, features, projection)
+
+
+def add_hole_centerlines(features, projection):
+    """Give holes without an outline polygon a tee-to-green line to locate them by"""
+    outlined = {f.hole for f in features if f.kind == 'hole'}
+    by_hole = {}
+    for f in features:
+        if f.hole is not None and f.hole not in outlined:
+            by_hole.setdefault(f.hole, {}).setdefault(f.kind, f)
+
+    for hole, kinds in sorted(by_hole.items()):
+        tee = kinds.get('tee')
+        green = kinds.get('green_middle') or kinds.get('green')
+        if tee is None or green is None:
+            continue
+        coords = [tee.anchor, green.anchor]
+        points = [projection.to_local(lat, lon) for lat, lon in coords]
+        features.append(Feature(len(features), 'hole', f"Hole {hole}", hole,
+                                'LineString', coords, points, {'derived': True}))
+
+
+def load_course(path):
+    """Load a course GeoJSON file"""
+    with open(path, 'r') as f:
+        course = course_from_geojson(json.load(f))
+    logger.info(f"Loaded course '{course.name}' with {len(course.features)} features "
+                f"and {len(course.holes)} holes")
+    return course
@@ -0,0 +1,404 @@
+"""
+Course Pack - One compressed, indexed file per course, memory-mapped and loaded hole by hole
+
+Build a pack from course GeoJSON and check one, from src:
+
+    python3 -m course.course_pack build ../config/course.geojson \\
+        --out ../data/courses/demo.cpk --mbtiles course.mbtiles
+    python3 -m course.course_pack validate ../data/courses/*.cpk
+    python3 -m course.course_pack info ../data/courses/demo.cpk
+"""
+
+import os
+import sys
+import glob
+import json
+import mmap
+import zlib
+import struct
+import argparse
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from .geo import LocalProjection, haversine_m
+from .course_data import Course, Feature, load_course
+from .routing import PathGraph
+from .poi_search import Poi, pois_from_course
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CPAK"
+VERSION = 1
+# magic, version, flags, index offset, index length
+HEADER = struct.Struct("<4sHHQI")
+# node count, edge count; then float64 (x, y) nodes and int32 (a, b) edges
+GRAPH_HEADER = struct.Struct("<II")
+
+PACK_EXTENSION = '.cpk'
+
+# Needed for the whole course at once (which hole am I on, geofences);
+# everything else with a hole number lives in that hole's section
+COURSE_WIDE_KINDS = {'hole', 'green', 'no_cart', 'restricted'}
+
+
+def hole_section(hole):
+    return f"hole/{hole}"
+
+
+def feature_record(feature):
+    return [feature.index, feature.kind, feature.name, feature.hole, feature.geometry,
+            [[round(lat, 7), round(lon, 7)] for lat, lon in feature.coords],
+            feature.properties]
+
+
+def feature_from_record(record, projection):
+    index, kind, name, hole, geometry, coords, properties = record
+    coords = [tuple(c) for c in coords]
+    points = [projection.to_local(lat, lon) for lat, lon in coords]
+    return Feature(index, kind, name, hole, geometry, coords, points, properties)
+
+
+def graph_bytes(graph):
+    nodes = np.array(graph.nodes, dtype='<f8').reshape(-1, 2)
+    edges = np.array([(a, b) for a, b, _ in graph.edges], dtype='<i4').reshape(-1, 2)
+    return GRAPH_HEADER.pack(len(nodes), len(edges)) + nodes.tobytes() + edges.tobytes()
+
+
+def json_bytes(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def pack_sections(course, tiles=None):
+    """OrderedDict of section name -> uncompressed bytes for a course"""
+    common = []
+    by_hole = {}
+    for feature in course.features:
+        if feature.hole is None or feature.kind in COURSE_WIDE_KINDS:
+            common.append(feature_record(feature))
+        else:
+            by_hole.setdefault(feature.hole, []).append(feature_record(feature))
+
+    holes = []
+    for hole in course.holes:
+        outline = course.features_for_hole(hole, 'hole')
+        xs = [x for f in course.features_for_hole(hole) for x, _ in f.points]
+        ys = [y for f in course.features_for_hole(hole) for _, y in f.points]
+        holes.append({
+            'hole': hole,
+            'name': outline[0].name if outline else f"Hole {hole}",
+            'par': outline[0].properties.get('par') if outline else None,
+            'features': len(course.features_for_hole(hole)),
+            'bounds': [round(min(xs), 1), round(min(ys), 1), round(max(xs), 1), round(max(ys), 1)],
+        })
+
+    lats = [lat for f in course.features for lat, _ in f.coords]
+    lons = [lon for f in course.features for _, lon in f.coords]
+    meta = {
+        'name': course.name,
+        'origin': [course.projection.origin_lat, course.projection.origin_lon],
+        'bounds': [min(lats), min(lons), max(lats), max(lons)],
+        'features': len(course.features),
+        'holes': holes,
+        'destinations': [[name, lat, lon] for name, (lat, lon) in course.destinations().items()],
+        'tiles': tiles,
+    }
+
+    sections = OrderedDict()
+    sections['meta'] = json_bytes(meta)
+    sections['common'] = json_bytes(common)
+    sections['graph'] = graph_bytes(PathGraph.from_course(course))
+    sections['pois'] = json_bytes([[p.name, p.kind, p.lat, p.lon, p.keywords]
+                                   for p in pois_from_course(course)])
+    for hole in sorted(by_hole):
+        sections[hole_section(hole)] = json_bytes(by_hole[hole])
+    return sections
+
+
+def write_pack(course, path, tiles=None, level=9):
+    """Write a course pack (atomically, via a temporary file)"""
+    sections = pack_sections(course, tiles)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    index = {}
+    with open(tmp, 'wb') as f:
+        f.write(b"\0" * HEADER.size)
+        for name, raw in sections.items():
+            data = zlib.compress(raw, level)
+            index[name] = [f.tell(), len(data), len(raw), zlib.crc32(raw)]
+            f.write(data)
+        index_offset = f.tell()
+        index_data = zlib.compress(json_bytes(index), level)
+        f.write(index_data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(index_data)))
+    os.replace(tmp, path)
+    logger.info(f"Wrote course pack {path} ({len(sections)} sections)")
+    return path
+
+
+class CoursePack:
+    """Read side of a pack: the file is memory-mapped and sections are only
+    decompressed when asked for, so opening a pack costs the header, the
+    index and the small meta section"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{path}: empty file")
+        try:
+            if len(self.data) < HEADER.size:
+                raise ValueError(f"{path}: truncated header")
+            magic, version, _, offset, length = HEADER.unpack_from(self.data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a version {VERSION} course pack")
+            if offset + length > len(self.data):
+                raise ValueError(f"{path}: truncated index")
+            try:
+                self.index = json.loads(zlib.decompress(self.data[offset:offset + length]))
+            except zlib.error as e:
+                raise ValueError(f"{path}: corrupt index: {e}")
+            self.meta = self.section_json('meta')
+        except ValueError:
+            self.close()
+            raise
+
+    def close(self):
+        if not self.data.closed:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def name(self):
+        return self.meta['name']
+
+    @property
+    def slug(self):
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    def section(self, name):
+        """Uncompressed bytes of one section; ValueError if missing or damaged"""
+        entry = self.index.get(name)
+        if entry is None:
+            raise ValueError(f"{self.path}: no section {name!r}")
+        offset, length, raw_length, crc = entry
+        if offset + length > len(self.data):
+            raise ValueError(f"{self.path}: section {name!r} is truncated")
+        try:
+            raw = zlib.decompress(self.data[offset:offset + length])
+        except zlib.error as e:
+            raise ValueError(f"{self.path}: section {name!r} is corrupt: {e}")
+        if len(raw) != raw_length or zlib.crc32(raw) != crc:
+            raise ValueError(f"{self.path}: section {name!r} fails its checksum")
+        return raw
+
+    def section_json(self, name):
+        return json.loads(self.section(name))
+
+    def has_hole(self, hole):
+        return hole_section(hole) in self.index
+
+    def distance_m(self, lat, lon):
+        """Meters from a position to the course's bounding box (0 inside)"""
+        min_lat, min_lon, max_lat, max_lon = self.meta['bounds']
+        return haversine_m(lat, lon, min(max(lat, min_lat), max_lat),
+                           min(max(lon, min_lon), max_lon))
+
+    def course(self):
+        return PackedCourse(self)
+
+    def path_graph(self, **kwargs):
+        raw = self.section('graph')
+        node_count, edge_count = GRAPH_HEADER.unpack_from(raw, 0)
+        nodes = np.frombuffer(raw, '<f8', node_count * 2, GRAPH_HEADER.size).reshape(-1, 2)
+        edges = np.frombuffer(raw, '<i4', edge_count * 2,
+                              GRAPH_HEADER.size + nodes.nbytes).reshape(-1, 2)
+        graph = PathGraph.from_edges(nodes.tolist(), edges.tolist(), **kwargs)
+        logger.info(f"Cart path graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
+        return graph
+
+    def pois(self, projection):
+        return [Poi(name, kind, lat, lon, *projection.to_local(lat, lon), keywords)
+                for name, kind, lat, lon, keywords in self.section_json('pois')]
+
+
+class PackedCourse(Course):
+    """Course backed by a pack: starts with the course-wide features and
+    pulls in a hole's tees, targets, hazards and paths the first time
+    anything asks for that hole"""
+
+    def __init__(self, pack):
+        meta = pack.meta
+        projection = LocalProjection(*meta['origin'])
+        features = [feature_from_record(r, projection) for r in pack.section_json('common')]
+        super().__init__(meta['name'], features, projection)
+        self.pack = pack
+        self.holes = [h['hole'] for h in meta['holes']]
+        self.loaded = set()
+
+    def load_hole(self, hole):
+        if hole in self.loaded:
+            return
+        self.loaded.add(hole)
+        if self.pack.has_hole(hole):
+            records = self.pack.section_json(hole_section(hole))
+            self.features.extend(feature_from_record(r, self.projection) for r in records)
+            logger.debug(f"Loaded {len(records)} features for hole {hole} from {self.pack.path}")
+
+    def features_for_hole(self, hole, kind=None):
+        self.load_hole(hole)
+        return super().features_for_hole(hole, kind)
+
+    def destinations(self):
+        return OrderedDict((name, (lat, lon)) for name, lat, lon in self.pack.meta['destinations'])
+
+
+def open_packs(directory):
+    """Every readable pack in a directory (unreadable ones are logged and skipped)"""
+    packs = []
+    for path in sorted(glob.glob(os.path.join(directory, '*' + PACK_EXTENSION))):
+        try:
+            packs.append(CoursePack(path))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring course pack {path}: {e}")
+    return packs
+
+
+def pack_for_position(packs, lat, lon, margin_m=500.0):
+    """The pack whose course is nearest to the position, if within margin_m"""
+    best = min(packs, key=lambda pack: pack.distance_m(lat, lon), default=None)
+    if best is None or best.distance_m(lat, lon) > margin_m:
+        return None
+    return best
+
+
+def validate_pack(path, tiles_dir=None):
+    """Problems found in a pack, as a list of messages (empty when valid)"""
+    try:
+        pack = CoursePack(path)
+    except (OSError, ValueError) as e:
+        return [str(e)]
+
+    problems = []
+    with pack:
+        for name, (offset, length, _, _) in sorted(pack.index.items()):
+            if offset < HEADER.size:
+                problems.append(f"section {name!r} overlaps the header")
+            try:
+                pack.section(name)
+            except ValueError as e:
+                problems.append(str(e))
+        if problems:
+            return problems
+
+        meta = pack.meta
+        for key in ('name', 'origin', 'bounds', 'holes', 'destinations'):
+            if key not in meta:
+                problems.append(f"meta has no {key!r}")
+        if problems:
+            return problems
+
+        min_lat, min_lon, max_lat, max_lon = meta['bounds']
+
+        def outside(lat, lon):
+            return not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon)
+
+        course = pack.course()
+        for hole in course.holes:
+            if not pack.has_hole(hole):
+                problems.append(f"hole {hole} has no section")
+            course.load_hole(hole)
+        for name in pack.index:
+            if name.startswith('hole/') and int(name[5:]) not in course.holes:
+                problems.append(f"section {name!r} is not a hole in meta")
+
+        indices = [f.index for f in course.features]
+        if len(set(indices)) != len(indices):
+            problems.append("feature indices repeat")
+        if len(course.features) != meta.get('features', len(course.features)):
+            problems.append(f"{len(course.features)} features, meta says {meta['features']}")
+        for feature in course.features:
+            if any(outside(lat, lon) for lat, lon in feature.coords):
+                problems.append(f"feature {feature.name!r} lies outside the pack bounds")
+        for hole in meta['holes']:
+            if not course.features_for_hole(hole['hole'], 'hole'):
+                problems.append(f"hole {hole['hole']} has no outline")
+
+        graph = pack.path_graph()
+        if not graph.edges:
+            problems.append("no cart paths")
+        elif len({n for a, b, _ in graph.edges for n in (a, b)}) != len(graph.nodes):
+            problems.append("path graph has nodes without edges")
+        for name, lat, lon in meta['destinations']:
+            if outside(lat, lon):
+                problems.append(f"destination {name!r} lies outside the pack bounds")
+        for poi in pack.pois(course.projection):
+            if outside(poi.lat, poi.lon):
+                problems.append(f"POI {poi.name!r} lies outside the pack bounds")
+
+        tiles = meta.get('tiles') or {}
+        if tiles.get('mbtiles') and tiles_dir is not None:
+            if not os.path.exists(os.path.join(tiles_dir, tiles['mbtiles'])):
+                problems.append(f"tiles {tiles['mbtiles']} not found in {tiles_dir}")
+    return problems
+
+
+def print_info(path):
+    with CoursePack(path) as pack:
+        meta = pack.meta
+        print(f"{path}: {meta['name']}, {len(meta['holes'])} holes, "
+              f"{meta['features']} features, {os.path.getsize(path)} bytes")
+        print(f"  bounds {meta['bounds']}  tiles {meta.get('tiles')}")
+        for name, (offset, length, raw_length, _) in pack.index.items():
+            print(f"  {name:12} {length:8} bytes ({raw_length} uncompressed) at {offset}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and check course packs")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="pack a course GeoJSON file")
+    build.add_argument('geojson')
+    build.add_argument('--out', required=True, help="pack file (.cpk)")
+    build.add_argument('--mbtiles', help="tile file name the cart should use for this course")
+    validate = commands.add_parser('validate', help="check packs for damage and inconsistencies")
+    validate.add_argument('packs', nargs='+')
+    validate.add_argument('--tiles-dir', help="check referenced tile files exist here")
+    info = commands.add_parser('info', help="show a pack's contents")
+    info.add_argument('pack')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        course = load_course(args.geojson)
+        tiles = {'mbtiles': args.mbtiles} if args.mbtiles else None
+        write_pack(course, args.out, tiles)
+        print(f"Packed {course.name} -> {args.out} ({os.path.getsize(args.out)} bytes, "
+              f"GeoJSON {os.path.getsize(args.geojson)} bytes)", file=sys.stderr)
+        return 0
+    if args.command == 'info':
+        print_info(args.pack)
+        return 0
+
+    failed = 0
+    for path in args.packs:
+        problems = validate_pack(path, args.tiles_dir)
+        print(f"{path}: {'OK' if not problems else f'{len(problems)} problem(s)'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed += bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,464 @@
+"""
+Elevation - Memory-mapped DEM heights and slope-adjusted "plays like" distances
+
+Reads uncompressed GeoTIFF (stripped or tiled, geographic coordinates),
+SRTM .hgt tiles and ESRI .bil/.flt rasters with a .hdr file. The raster is
+memory-mapped, so a lookup only pages in the few blocks it touches. Check a
+DEM from src:
+
+    python3 -m course.elevation ../data/elevation/course.tif --at 35.7796,-78.6382
+"""
+
+import os
+import re
+import sys
+import math
+import struct
+import argparse
+import logging
+
+import numpy as np
+
+from .geo import METERS_PER_YARD
+
+logger = logging.getLogger(__name__)
+
+# TIFF tags
+IMAGE_WIDTH = 256
+IMAGE_LENGTH = 257
+BITS_PER_SAMPLE = 258
+COMPRESSION = 259
+STRIP_OFFSETS = 273
+SAMPLES_PER_PIXEL = 277
+ROWS_PER_STRIP = 278
+STRIP_BYTE_COUNTS = 279
+TILE_WIDTH = 322
+TILE_LENGTH = 323
+TILE_OFFSETS = 324
+TILE_BYTE_COUNTS = 325
+SAMPLE_FORMAT = 339
+MODEL_PIXEL_SCALE = 33550
+MODEL_TIEPOINT = 33922
+GEO_KEY_DIRECTORY = 34735
+GDAL_NODATA = 42113
+
+# GeoKeys
+GT_MODEL_TYPE = 1024
+GT_RASTER_TYPE = 1025
+MODEL_TYPE_GEOGRAPHIC = 2
+RASTER_PIXEL_IS_POINT = 2
+
+# TIFF field type -> struct code
+FIELD_TYPES = {1: 'B', 2: 's', 3: 'H', 4: 'I', 5: 'II', 11: 'f', 12: 'd', 16: 'Q'}
+
+# (SampleFormat, BitsPerSample) -> numpy kind
+SAMPLE_KINDS = {(1, 8): 'u1', (1, 16): 'u2', (2, 16): 'i2', (1, 32): 'u4', (2, 32): 'i4',
+                (3, 32): 'f4', (3, 64): 'f8'}
+
+SRTM_NODATA = -32768
+SRTM_NAME = re.compile(r"([NS])(\d{2})([EW])(\d{3})", re.IGNORECASE)
+
+
+def read_tiff_tags(f):
+    """(byte order, {tag: tuple of values}) of the first image in a TIFF"""
+    head = f.read(8)
+    if head[:2] == b'II':
+        order = '<'
+    elif head[:2] == b'MM':
+        order = '>'
+    else:
+        raise ValueError("not a TIFF file")
+    magic, ifd = struct.unpack(order + 'HI', head[2:8])
+    if magic == 43:
+        raise ValueError("BigTIFF is not supported")
+    if magic != 42:
+        raise ValueError("not a TIFF file")
+
+    f.seek(ifd)
+    count, = struct.unpack(order + 'H', f.read(2))
+    entries = [struct.unpack(order + 'HHI4s', f.read(12)) for _ in range(count)]
+    tags = {}
+    for tag, kind, n, raw in entries:
+        code = FIELD_TYPES.get(kind)
+        if code is None:
+            continue
+        size = struct.calcsize(order + code) * n
+        if size > 4:
+            f.seek(struct.unpack(order + 'I', raw)[0])
+            raw = f.read(size)
+        if kind == 2:
+            tags[tag] = (raw[:n].rstrip(b'\0').decode('ascii', 'replace'),)
+        else:
+            tags[tag] = struct.unpack(order + code * n, raw[:size])
+    return order, tags
+
+
+def geo_keys(tags):
+    directory = tags.get(GEO_KEY_DIRECTORY, ())
+    keys = {}
+    for i in range(4, len(directory) - 3, 4):
+        key, location, _, value = directory[i:i + 4]
+        if location == 0:
+            keys[key] = value
+    return keys
+
+
+class Dem:
+    """Height raster on a regular latitude/longitude grid
+
+    The samples are one memory-mapped 1-D array; blocks (TIFF strips or
+    tiles, or the whole raster) are located by their element offsets, so
+    any layout is indexed without copying. x0/y0 are the longitude and
+    latitude of the center of pixel (0, 0) and dx/dy the pixel steps
+    (dy is negative for north-up rasters).
+    """
+
+    def __init__(self, path, data, width, height, x0, y0, dx, dy, nodata=None,
+                 block_starts=(0,), block_width=None, block_height=None):
+        self.path = path
+        self.data = data
+        self.width = width
+        self.height = height
+        self.x0, self.y0, self.dx, self.dy = x0, y0, dx, dy
+        self.nodata = nodata
+        self.block_starts = np.asarray(block_starts, dtype=np.int64)
+        self.block_width = block_width or width
+        self.block_height = block_height or height
+        self.blocks_across = -(-width // self.block_width)
+
+    @classmethod
+    def open(cls, path):
+        """Open a .tif/.tiff, .hgt or .bil/.flt DEM; ValueError if unreadable"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.tif', '.tiff'):
+            return cls.open_geotiff(path)
+        if extension == '.hgt':
+            return cls.open_hgt(path)
+        if extension in ('.bil', '.flt'):
+            return cls.open_bil(path)
+        raise ValueError(f"{path}: unknown DEM format")
+
+    @classmethod
+    def open_geotiff(cls, path):
+        with open(path, 'rb') as f:
+            try:
+                order, tags = read_tiff_tags(f)
+            except struct.error:
+                raise ValueError(f"{path}: truncated TIFF")
+
+        def tag(number, default=None):
+            values = tags.get(number)
+            return values[0] if values else default
+
+        if tag(COMPRESSION, 1) != 1:
+            raise ValueError(f"{path}: compressed GeoTIFF; convert it with "
+                             f"gdal_translate -co COMPRESS=NONE")
+        if tag(SAMPLES_PER_PIXEL, 1) != 1:
+            raise ValueError(f"{path}: DEM must have a single band")
+        kind = SAMPLE_KINDS.get((tag(SAMPLE_FORMAT, 1), tag(BITS_PER_SAMPLE)))
+        if kind is None:
+            raise ValueError(f"{path}: unsupported sample type")
+        if MODEL_PIXEL_SCALE not in tags or MODEL_TIEPOINT not in tags:
+            raise ValueError(f"{path}: no georeferencing")
+        keys = geo_keys(tags)
+        if keys.get(GT_MODEL_TYPE, MODEL_TYPE_GEOGRAPHIC) != MODEL_TYPE_GEOGRAPHIC:
+            raise ValueError(f"{path}: DEM must be in latitude/longitude (EPSG:4326)")
+
+        width, height = tag(IMAGE_WIDTH), tag(IMAGE_LENGTH)
+        if TILE_OFFSETS in tags:
+            offsets = tags[TILE_OFFSETS]
+            block_width, block_height = tag(TILE_WIDTH), tag(TILE_LENGTH)
+        else:
+            offsets = tags[STRIP_OFFSETS]
+            block_width, block_height = width, min(tag(ROWS_PER_STRIP, height), height)
+
+        dtype = np.dtype(order + kind)
+        if any(offset % dtype.itemsize for offset in offsets):
+            raise ValueError(f"{path}: blocks are not aligned to the sample size")
+        data = np.memmap(path, dtype=dtype, mode='r',
+                         shape=(os.path.getsize(path) // dtype.itemsize,))
+
+        scale_x, scale_y = tags[MODEL_PIXEL_SCALE][:2]
+        _, _, _, tie_x, tie_y = tags[MODEL_TIEPOINT][:5]
+        # Area pixels are tied at their corner, point pixels at their center
+        half = 0.0 if keys.get(GT_RASTER_TYPE) == RASTER_PIXEL_IS_POINT else 0.5
+        nodata = tag(GDAL_NODATA)
+        return cls(path, data, width, height,
+                   tie_x + half * scale_x, tie_y - half * scale_y, scale_x, -scale_y,
+                   float(nodata) if nodata not in (None, '') else None,
+                   [offset // dtype.itemsize for offset in offsets], block_width, block_height)
+
+    @classmethod
+    def open_hgt(cls, path):
+        """SRTM tile named after its south-west corner, e.g. N35W079.hgt"""
+        match = SRTM_NAME.search(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"{path}: .hgt name must give the tile corner (e.g. N35W079)")
+        size = int(round(math.sqrt(os.path.getsize(path) / 2)))
+        if size * size * 2 != os.path.getsize(path) or size < 2:
+            raise ValueError(f"{path}: not a square SRTM tile")
+        lat = int(match.group(2)) * (1 if match.group(1).upper() == 'N' else -1)
+        lon = int(match.group(4)) * (1 if match.group(3).upper() == 'E' else -1)
+        step = 1.0 / (size - 1)
+        data = np.memmap(path, dtype='>i2', mode='r', shape=(size * size,))
+        return cls(path, data, size, size, lon, lat + 1, step, -step, SRTM_NODATA)
+
+    @classmethod
+    def open_bil(cls, path):
+        """ESRI BIL/FLT raster described by the .hdr next to it"""
+        header_path = os.path.splitext(path)[0] + '.hdr'
+        try:
+            with open(header_path) as f:
+                header = dict(line.split(None, 1) for line in f if len(line.split()) >= 2)
+        except OSError as e:
+            raise ValueError(f"{path}: no readable .hdr ({e})")
+        header = {k.upper(): v.strip() for k, v in header.items()}
+        try:
+            width, height = int(header['NCOLS']), int(header['NROWS'])
+            dx = float(header.get('XDIM') or header['CELLSIZE'])
+            dy = float(header.get('YDIM') or header['CELLSIZE'])
+            if 'ULXMAP' in header:
+                x0, y0 = float(header['ULXMAP']), float(header['ULYMAP'])
+            else:
+                # .flt headers give the lower-left corner of the raster
+                x0 = float(header['XLLCORNER']) + dx / 2
+                y0 = float(header['YLLCORNER']) + dy * (height - 0.5)
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"{header_path}: incomplete header ({e})")
+
+        order = '>' if header.get('BYTEORDER', 'I').upper() in ('M', 'MSBFIRST') else '<'
+        if path.lower().endswith('.flt'):
+            kind = 'f4'
+        else:
+            bits = int(header.get('NBITS', 16))
+            signed = header.get('PIXELTYPE', 'SIGNEDINT').upper().startswith('SIGNED')
+            kind = {(16, True): 'i2', (16, False): 'u2', (32, True): 'i4',
+                    (32, False): 'u4', (8, False): 'u1'}.get((bits, signed))
+            if kind is None:
+                raise ValueError(f"{path}: unsupported {bits}-bit samples")
+        data = np.memmap(path, dtype=np.dtype(order + kind), mode='r', shape=(width * height,))
+        nodata = header.get('NODATA') or header.get('NODATA_VALUE')
+        return cls(path, data, width, height, x0, y0, dx, -dy,
+                   float(nodata) if nodata else None)
+
+    @property
+    def bounds(self):
+        """(south, west, north, east) of the sample centers"""
+        north, west = self.y0, self.x0
+        south = self.y0 + self.dy * (self.height - 1)
+        east = self.x0 + self.dx * (self.width - 1)
+        return min(south, north), west, max(south, north), east
+
+    def samples(self, rows, cols):
+        """Raw samples at integer pixel positions as float64, NaN for nodata"""
+        block = (rows // self.block_height) * self.blocks_across + cols // self.block_width
+        index = (self.block_starts[block] + (rows % self.block_height) * self.block_width
+                 + cols % self.block_width)
+        values = self.data[index].astype(np.float64)
+        if self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        return values
+
+    def heights(self, lats, lons):
+        """Bilinear heights (meters) at many positions; NaN off the raster"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        col = (lons - self.x0) / self.dx
+        row = (lats - self.y0) / self.dy
+        outside = (col < 0) | (row < 0) | (col > self.width - 1) | (row > self.height - 1)
+        col = np.clip(col, 0, self.width - 1)
+        row = np.clip(row, 0, self.height - 1)
+        c0 = np.minimum(col.astype(np.int64), self.width - 2)
+        r0 = np.minimum(row.astype(np.int64), self.height - 2)
+        fc = col - c0
+        fr = row - r0
+
+        top = self.samples(r0, c0) * (1 - fc) + self.samples(r0, c0 + 1) * fc
+        bottom = self.samples(r0 + 1, c0) * (1 - fc) + self.samples(r0 + 1, c0 + 1) * fc
+        result = top * (1 - fr) + bottom * fr
+        result[outside] = np.nan
+        return result
+
+    def sample(self, row, col):
+        block = (row // self.block_height) * self.blocks_across + col // self.block_width
+        value = float(self.data[int(self.block_starts[block]) + (row % self.block_height)
+                                * self.block_width + col % self.block_width])
+        return None if value == self.nodata else value
+
+    def height_at(self, lat, lon):
+        """Height at one position, or None off the raster or over nodata
+
+        Plain Python arithmetic: for a single point this is several times
+        quicker than going through the vectorised heights().
+        """
+        col = (lon - self.x0) / self.dx
+        row = (lat - self.y0) / self.dy
+        if not (0 <= col <= self.width - 1 and 0 <= row <= self.height - 1):
+            return None
+        c0 = min(int(col), self.width - 2)
+        r0 = min(int(row), self.height - 2)
+        fc = col - c0
+        fr = row - r0
+        corners = (self.sample(r0, c0), self.sample(r0, c0 + 1),
+                   self.sample(r0 + 1, c0), self.sample(r0 + 1, c0 + 1))
+        if None in corners:
+            return None
+        top = corners[0] * (1 - fc) + corners[1] * fc
+        bottom = corners[2] * (1 - fc) + corners[3] * fc
+        return top * (1 - fr) + bottom * fr
+
+
+def plays_like(meters, rise, factor=1.0):
+    """Distances adjusted for the height of the target above the player
+
+    Uphill shots play longer and downhill shorter by factor meters per
+    meter of rise; where the rise is unknown (NaN) the distance is kept.
+    """
+    rise = np.nan_to_num(np.asarray(rise, dtype=np.float64), nan=0.0)
+    return np.asarray(meters) + factor * rise
+
+
+class PlaysLikeEngine:
+    """Slope-adjusted yardages on top of a YardageEngine
+
+    Target heights are looked up once per hole in one batch and kept, so
+    each fix costs a single height lookup at the cart plus a vector add.
+    """
+
+    def __init__(self, yardage, dem, factor=1.0):
+        self.yardage = yardage
+        self.dem = dem
+        self.factor = factor
+        self.target_heights = {}
+
+    def heights_for_hole(self, hole):
+        heights = self.target_heights.get(hole)
+        if heights is None:
+            entry = self.yardage.hole_targets(hole)
+            if entry is None:
+                return None
+            points = entry[1]
+            lats, lons = self.yardage.course.projection.to_latlon(points[:, 0], points[:, 1])
+            heights = self.target_heights[hole] = self.dem.heights(lats, lons)
+        return heights
+
+    def measure(self, lat, lon, hole):
+        """(Yardages, plays-like yards) for every target on a hole, or None"""
+        result = self.yardage.measure(lat, lon, hole)
+        if result is None:
+            return None
+        here = self.dem.height_at(lat, lon)
+        if here is None:
+            return result, result.yards
+        adjusted = plays_like(result.meters, self.heights_for_hole(hole) - here, self.factor)
+        return result, adjusted / METERS_PER_YARD
+
+    def green_yards(self, lat, lon, hole):
+        """Plays-like (front, middle, back) yards, None where not mapped"""
+        measured = self.measure(lat, lon, hole)
+        yards = {}
+        if measured is not None:
+            result, adjusted = measured
+            for target, value in zip(result.targets, adjusted):
+                yards.setdefault(target.kind, float(value))
+        return tuple(yards.get(kind) for kind in ('green_front', 'green_middle', 'green_back'))
+
+
+def write_geotiff(path, heights, west, north, pixel_deg, nodata=None, tile=None):
+    """Write a float32 north-up GeoTIFF (uncompressed, in strips or tiles)
+
+    Meant for tests, benchmarks and converting other rasters with numpy.
+    """
+    heights = np.asarray(heights, dtype='<f4')
+    rows, cols = heights.shape
+    if tile:
+        blocks = []
+        for r in range(0, rows, tile):
+            for c in range(0, cols, tile):
+                block = np.zeros((tile, tile), dtype='<f4')
+                part = heights[r:r + tile, c:c + tile]
+                block[:part.shape[0], :part.shape[1]] = part
+                blocks.append(block.tobytes())
+    else:
+        blocks = [heights[r:r + 64].tobytes() for r in range(0, rows, 64)]
+
+    # Image data first, then the tag values and the directory
+    data_start = 8
+    offsets = []
+    position = data_start
+    for block in blocks:
+        offsets.append(position)
+        position += len(block)
+
+    entries = [(IMAGE_WIDTH, 4, [cols]), (IMAGE_LENGTH, 4, [rows]), (BITS_PER_SAMPLE, 3, [32]),
+               (COMPRESSION, 3, [1]), (262, 3, [1]), (SAMPLES_PER_PIXEL, 3, [1])]
+    if tile:
+        entries += [(TILE_WIDTH, 3, [tile]), (TILE_LENGTH, 3, [tile]),
+                    (TILE_OFFSETS, 4, offsets), (TILE_BYTE_COUNTS, 4, [len(b) for b in blocks])]
+    else:
+        entries += [(STRIP_OFFSETS, 4, offsets), (ROWS_PER_STRIP, 3, [64]),
+                    (STRIP_BYTE_COUNTS, 4, [len(b) for b in blocks])]
+    entries += [(SAMPLE_FORMAT, 3, [3]),
+                (MODEL_PIXEL_SCALE, 12, [pixel_deg, pixel_deg, 0.0]),
+                (MODEL_TIEPOINT, 12, [0.0, 0.0, 0.0, west, north, 0.0]),
+                (GEO_KEY_DIRECTORY, 3, [1, 1, 0, 2, GT_MODEL_TYPE, 0, 1, MODEL_TYPE_GEOGRAPHIC,
+                                        GT_RASTER_TYPE, 0, 1, 1])]
+    if nodata is not None:
+        entries.append((GDAL_NODATA, 2, f"{nodata}\0"))
+    entries.sort()
+
+    extra = b""
+    extra_start = position
+    directory = []
+    for tag, kind, values in entries:
+        if kind == 2:
+            raw = values.encode('ascii')
+            count = len(raw)
+        else:
+            raw = struct.pack('<' + FIELD_TYPES[kind] * len(values), *values)
+            count = len(values)
+        if len(raw) <= 4:
+            directory.append(struct.pack('<HHI4s', tag, kind, count, raw.ljust(4, b'\0')))
+        else:
+            if (extra_start + len(extra)) % 2:
+                extra += b'\0'
+            directory.append(struct.pack('<HHII', tag, kind, count, extra_start + len(extra)))
+            extra += raw
+    ifd_offset = extra_start + len(extra)
+    ifd_offset += ifd_offset % 2
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<2sHI', b'II', 42, ifd_offset))
+        for block in blocks:
+            f.write(block)
+        f.write(extra)
+        f.write(b'\0' * (ifd_offset - f.tell()))
+        f.write(struct.pack('<H', len(directory)))
+        f.write(b''.join(directory))
+        f.write(struct.pack('<I', 0))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show a DEM's extent and heights")
+    parser.add_argument('dem', help=".tif, .hgt or .bil/.flt file")
+    parser.add_argument('--at', action='append', default=[], metavar='LAT,LON',
+                        help="print the height here (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        dem = Dem.open(args.dem)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    south, west, north, east = dem.bounds
+    print(f"{args.dem}: {dem.width}x{dem.height}, {abs(dem.dx) * 3600:.2f}\" pixels, "
+          f"lat {south:.5f}..{north:.5f}, lon {west:.5f}..{east:.5f}")
+    for text in args.at:
+        lat, lon = (float(v) for v in text.split(','))
+        height = dem.height_at(lat, lon)
+        print(f"  {lat:.6f},{lon:.6f}: " + (f"{height:.1f} m" if height is not None else "no data"))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Course Geometry - Local tangent-plane projection and planar distance helpers
+"""
+
+import math
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_YARD = 0.9144
+
+
+class LocalProjection:
+    """Equirectangular projection around a course origin, in meters
+
+    East is +x and north is +y. Over the few kilometers of a golf course
+    the error against a geodesic is well under a meter.
+    """
+
+    def __init__(self, origin_lat, origin_lon):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+        self.meters_per_lat = math.radians(1) * EARTH_RADIUS_M
+        self.meters_per_lon = self.meters_per_lat * math.cos(math.radians(origin_lat))
+
+    def to_local(self, lat, lon):
+        return ((lon - self.origin_lon) * self.meters_per_lon,
+                (lat - self.origin_lat) * self.meters_per_lat)
+
+    def to_latlon(self, x, y):
+        return (self.origin_lat + y / self.meters_per_lat,
+                self.origin_lon + x / self.meters_per_lon)
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def segment_distance(px, py, ax, ay, bx, by):
+    """Distance from point P to segment AB"""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def polyline_distance(px, py, points):
+    if len(points) == 1:
+        return math.hypot(px - points[0][0], py - points[0][1])
+    return min(segment_distance(px, py, *points[i], *points[i + 1])
+               for i in range(len(points) - 1))
+
+
+def point_in_polygon(px, py, ring):
+    """Even-odd test against a closed or open ring of (x, y) points"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > py) != (yj > py) and px < (xj - xi) * (py - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def polygon_distance(px, py, ring):
+    """0 inside the polygon, otherwise distance to its outline"""
+    if point_in_polygon(px, py, ring):
+        return 0.0
+    return polyline_distance(px, py, list(ring) + [ring[0]])
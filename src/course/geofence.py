@@ -0,0 +1,237 @@
+"""
+Geofence - Precomputed polygon grid with enter/exit events and dwell hysteresis
+"""
+
+import math
+import logging
+from collections import namedtuple
+
+from .geo import point_in_polygon
+
+logger = logging.getLogger(__name__)
+
+# points is the polygon ring in the course's local meters, without the closing point
+Geofence = namedtuple('Geofence', ['index', 'name', 'kind', 'hole', 'points'])
+
+GeofenceEvent = namedtuple('GeofenceEvent', ['type', 'fence', 'time'])
+
+ENTER = 'enter'
+EXIT = 'exit'
+
+# Fence kinds the driver should be warned about
+WARNING_KINDS = ('no_cart', 'restricted')
+
+
+def signed_area(points):
+    return sum(ax * by - bx * ay for (ax, ay), (bx, by)
+               in zip(points, points[1:] + points[:1])) / 2
+
+
+def buffer_polygon(points, distance, max_miter=2.0):
+    """Polygon grown outwards by distance, moving each vertex along its bisector
+
+    Good for the blob-shaped greens this is used on; sharp corners are
+    limited to max_miter times the distance.
+    """
+    outward = 1.0 if signed_area(points) < 0 else -1.0
+    count = len(points)
+    grown = []
+    for i, (x, y) in enumerate(points):
+        px, py = points[i - 1]
+        nx, ny = points[(i + 1) % count]
+        normals = []
+        for dx, dy in ((x - px, y - py), (nx - x, ny - y)):
+            length = math.hypot(dx, dy) or 1.0
+            normals.append((-dy / length * outward, dx / length * outward))
+        bx, by = normals[0][0] + normals[1][0], normals[0][1] + normals[1][1]
+        length = math.hypot(bx, by)
+        if length < 1e-9:
+            bx, by, length = normals[0][0], normals[0][1], 1.0
+        bx, by = bx / length, by / length
+        # Distance along the bisector that keeps both edges `distance` away
+        cos_half = max(bx * normals[0][0] + by * normals[0][1], 1.0 / max_miter)
+        grown.append((x + bx * distance / cos_half, y + by * distance / cos_half))
+    return grown
+
+
+def fences_from_course(course, green_buffer=8.0, clubhouse_radius=40.0):
+    """Geofences for a course: drawn no-cart/restricted areas, greens plus a
+    margin (no carts), hole outlines and a circle round the clubhouse"""
+    fences = []
+
+    def add(name, kind, hole, points):
+        fences.append(Geofence(len(fences), name, kind, hole, list(points)))
+
+    for feature in course.features:
+        if feature.geometry == 'Polygon' and len(feature.points) >= 3:
+            if feature.kind in WARNING_KINDS:
+                add(feature.name, feature.kind, feature.hole, feature.points)
+            elif feature.kind == 'green':
+                add(feature.name, 'no_cart', feature.hole,
+                    buffer_polygon(feature.points, green_buffer))
+            elif feature.kind == 'hole':
+                add(feature.name, 'hole', feature.hole, feature.points)
+        elif feature.kind == 'clubhouse' and feature.geometry == 'Point':
+            x, y = feature.points[0]
+            add(feature.name, 'clubhouse', None,
+                [(x + clubhouse_radius * math.cos(2 * math.pi * i / 16),
+                  y + clubhouse_radius * math.sin(2 * math.pi * i / 16)) for i in range(16)])
+    return fences
+
+
+def segment_hits_box(ax, ay, bx, by, x0, y0, x1, y1):
+    """True if segment AB touches the axis-aligned box (Liang-Barsky clip)"""
+    t0, t1 = 0.0, 1.0
+    dx, dy = bx - ax, by - ay
+    for p, q in ((-dx, ax - x0), (dx, x1 - ax), (-dy, ay - y0), (dy, y1 - ay)):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return False
+    return True
+
+
+def crosses(px, py, qx, qy, ax, ay, bx, by):
+    """True if segment PQ crosses edge AB; each edge counts its start vertex
+    but not its end, so a crossing through a shared vertex counts once"""
+    rx, ry = qx - px, qy - py
+    sx, sy = bx - ax, by - ay
+    denominator = rx * sy - ry * sx
+    if denominator == 0:
+        return False
+    ux, uy = ax - px, ay - py
+    s = (ux * sy - uy * sx) / denominator
+    t = (ux * ry - uy * rx) / denominator
+    return 0.0 <= s <= 1.0 and 0.0 <= t < 1.0
+
+
+class GeofenceGrid:
+    """Uniform grid where every cell knows, per fence, inside/outside/boundary
+
+    Cells wholly inside a fence list it as inside; cells an edge passes
+    through keep whether their center is inside plus the edges that cross
+    the cell. A query is one dict lookup, and for boundary cells a parity
+    count of candidate edges crossed between the cell center and the point.
+    Cells no fence touches are simply absent (outside everything).
+    """
+
+    def __init__(self, fences, cell_size=10.0):
+        self.fences = list(fences)
+        self.cell_size = cell_size
+        inside = {}
+        boundary = {}
+
+        for fence in self.fences:
+            points = fence.points
+            edges = list(zip(points, points[1:] + points[:1]))
+            touched = {}
+            for edge in edges:
+                (ax, ay), (bx, by) = edge
+                cx0, cy0 = self.cell(min(ax, bx), min(ay, by))
+                cx1, cy1 = self.cell(max(ax, bx), max(ay, by))
+                for cx in range(cx0, cx1 + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        x0, y0 = cx * cell_size, cy * cell_size
+                        if segment_hits_box(ax, ay, bx, by, x0, y0, x0 + cell_size, y0 + cell_size):
+                            touched.setdefault((cx, cy), []).append(edge)
+
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            cx0, cy0 = self.cell(min(xs), min(ys))
+            cx1, cy1 = self.cell(max(xs), max(ys))
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    center = ((cx + 0.5) * cell_size, (cy + 0.5) * cell_size)
+                    center_inside = point_in_polygon(*center, points)
+                    edges_here = touched.get((cx, cy))
+                    if edges_here:
+                        boundary.setdefault((cx, cy), []).append(
+                            (fence.index, center_inside, tuple(edges_here)))
+                    elif center_inside:
+                        inside.setdefault((cx, cy), []).append(fence.index)
+
+        self.cells = {}
+        for key in set(inside) | set(boundary):
+            self.cells[key] = (tuple(inside.get(key, ())), tuple(boundary.get(key, ())))
+        self.boundary_cells = len(boundary)
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def query(self, x, y):
+        """Indices of the fences containing the local point (x, y)"""
+        key = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        entry = self.cells.get(key)
+        if entry is None:
+            return ()
+        inside, boundary = entry
+        if not boundary:
+            return inside
+        found = list(inside)
+        cx, cy = (key[0] + 0.5) * self.cell_size, (key[1] + 0.5) * self.cell_size
+        for index, center_inside, edges in boundary:
+            crossings = 0
+            for (ax, ay), (bx, by) in edges:
+                if crosses(cx, cy, x, y, ax, ay, bx, by):
+                    crossings += 1
+            if center_inside != (crossings % 2 == 1):
+                found.append(index)
+        return found
+
+
+class GeofenceMonitor:
+    """Turns per-fix containment into enter/exit events
+
+    A fence only changes state after the cart has been on the other side of
+    it for dwell seconds without interruption, so GPS jitter along an edge
+    does not produce a burst of events.
+    """
+
+    def __init__(self, grid, dwell=3.0):
+        self.grid = grid
+        self.dwell = dwell
+        self.inside = set()
+        self.pending = {}
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """Call callback(GeofenceEvent) for every enter/exit"""
+        self.subscribers.append(callback)
+
+    def update(self, x, y, now):
+        """Feed a position at time now (seconds); returns the events it caused"""
+        changed = set(self.grid.query(x, y)) ^ self.inside
+        for fence in list(self.pending):
+            if fence not in changed:
+                del self.pending[fence]
+
+        events = []
+        for fence in changed:
+            since = self.pending.setdefault(fence, now)
+            if now - since < self.dwell:
+                continue
+            del self.pending[fence]
+            if fence in self.inside:
+                self.inside.discard(fence)
+                events.append(GeofenceEvent(EXIT, self.grid.fences[fence], now))
+            else:
+                self.inside.add(fence)
+                events.append(GeofenceEvent(ENTER, self.grid.fences[fence], now))
+
+        for event in events:
+            logger.info(f"Geofence {event.type}: {event.fence.name} ({event.fence.kind})")
+            for callback in self.subscribers:
+                callback(event)
+        return events
+
+    def active(self, kinds=None):
+        """Fences the cart is currently inside"""
+        return [self.grid.fences[i] for i in sorted(self.inside)
+                if kinds is None or self.grid.fences[i].kind in kinds]
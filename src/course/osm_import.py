@@ -0,0 +1,521 @@
+"""
+OSM Import - Builds course GeoJSON from a local OpenStreetMap extract
+
+Streams .osm XML (optionally .gz/.bz2) with iterparse, clearing elements as
+it goes, in two passes: the first keeps golf ways and relations, the second
+only the coordinates of the nodes they use, so memory follows the golf
+content rather than the size of the extract. .osm.pbf files are read with
+pyosmium when it is installed. From src:
+
+    python3 -m course.osm_import ../data/county.osm.bz2 --course "Pine Hills" \\
+        --out ../config/course.geojson
+    python3 -m course.osm_import ../data/county.osm.pbf --out-dir ../data/courses --pack
+"""
+
+import os
+import re
+import bz2
+import sys
+import gzip
+import json
+import math
+import time
+import argparse
+import logging
+from collections import namedtuple
+import xml.etree.ElementTree as ET
+
+from .geo import LocalProjection, point_in_polygon, polygon_distance, polyline_distance
+
+logger = logging.getLogger(__name__)
+
+# golf=* value -> (course kind, geometry the course expects)
+GOLF_KINDS = {
+    'tee': ('tee', 'Point'),
+    'green': ('green', 'Polygon'),
+    'fairway': ('fairway', 'Polygon'),
+    'bunker': ('hazard', 'Polygon'),
+    'water_hazard': ('hazard', 'Polygon'),
+    'lateral_water_hazard': ('hazard', 'Polygon'),
+    'cartpath': ('cart_path', 'LineString'),
+    'hole': ('hole', 'LineString'),
+    'clubhouse': ('clubhouse', 'Point'),
+    'driving_range': ('driving_range', 'Point'),
+}
+# amenity=* value -> course kind, kept only inside a golf course
+AMENITY_KINDS = {'parking': 'parking', 'toilets': 'restroom', 'cafe': 'snack_bar',
+                 'fast_food': 'snack_bar'}
+HAZARDS = {'bunker': 'bunker', 'water_hazard': 'water', 'lateral_water_hazard': 'water'}
+
+# Nearest golf=hole line a feature may be from to count as part of that hole (m)
+HOLE_REACH = {'tee': 60.0, 'green': 50.0}
+DEFAULT_HOLE_REACH = 80.0
+
+# Raw OSM object: coords are (lat, lon), polygons without the closing point
+OsmFeature = namedtuple('OsmFeature', ['id', 'tags', 'geometry', 'coords'])
+
+ImportStats = namedtuple('ImportStats', ['bytes', 'elements', 'seconds', 'passes',
+                                         'peak_rss_mb'])
+
+
+def wanted(tags):
+    return (tags.get('golf') in GOLF_KINDS or tags.get('amenity') in AMENITY_KINDS
+            or tags.get('leisure') == 'golf_course')
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class CountingReader:
+    """File wrapper counting the (uncompressed) bytes the parser has read"""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.count += len(data)
+        return data
+
+
+def open_extract(path):
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def join_rings(ways):
+    """Closed rings from node-id lists, joining ways that share end nodes"""
+    pending = [list(w) for w in ways if len(w) > 1]
+    rings = []
+    while pending:
+        ring = pending.pop(0)
+        while ring[0] != ring[-1]:
+            for i, way in enumerate(pending):
+                if way[0] == ring[-1]:
+                    ring.extend(way[1:])
+                elif way[-1] == ring[-1]:
+                    ring.extend(reversed(way[:-1]))
+                elif way[-1] == ring[0]:
+                    ring[:0] = way[:-1]
+                elif way[0] == ring[0]:
+                    ring[:0] = reversed(way[1:])
+                else:
+                    continue
+                del pending[i]
+                break
+            else:
+                break  # cannot close: incomplete in this extract
+        if ring[0] == ring[-1] and len(ring) > 3:
+            rings.append(ring)
+    return rings
+
+
+class XmlReader:
+    """Streaming two-pass (three with multipolygons) reader for OSM XML"""
+
+    def __init__(self, path):
+        self.path = path
+        self.bytes = 0
+        self.elements = 0
+        self.passes = 0
+
+    def iterate(self, stop_at_ways=False):
+        """(tag, element) for each finished node/way/relation; elements are
+        cleared after the caller has seen them"""
+        self.passes += 1
+        with open_extract(self.path) as raw:
+            reader = CountingReader(raw)
+            context = ET.iterparse(reader, events=('start', 'end'))
+            _, root = next(context)
+            try:
+                for event, element in context:
+                    if event == 'start':
+                        if stop_at_ways and element.tag == 'way':
+                            return
+                        continue
+                    if element.tag in ('node', 'way', 'relation'):
+                        self.elements += 1
+                        yield element.tag, element
+                        element.clear()
+                        # Drop the parsed elements from the document tree
+                        root.clear()
+            finally:
+                self.bytes += reader.count
+
+    @staticmethod
+    def tags(element):
+        return {t.get('k'): t.get('v') for t in element.iter('tag')}
+
+    def features(self):
+        points = []
+        ways = {}       # id -> (tags, node refs) of wanted ways
+        relations = []  # (id, tags, outer member way ids)
+        for tag, element in self.iterate():
+            if tag == 'node':
+                if len(element):
+                    tags = self.tags(element)
+                    if wanted(tags):
+                        points.append(OsmFeature(
+                            int(element.get('id')), tags, 'Point',
+                            [(float(element.get('lat')), float(element.get('lon')))]))
+            elif tag == 'way':
+                tags = self.tags(element)
+                if wanted(tags):
+                    ways[int(element.get('id'))] = (
+                        tags, [int(nd.get('ref')) for nd in element.iter('nd')])
+            else:
+                tags = self.tags(element)
+                if tags.get('type') == 'multipolygon' and wanted(tags):
+                    outer = [int(m.get('ref')) for m in element.iter('member')
+                             if m.get('type') == 'way' and m.get('role') in ('outer', '')]
+                    relations.append((int(element.get('id')), tags, outer))
+
+        # Member ways of multipolygons were not known while the ways went by
+        members = {w for _, _, outer in relations for w in outer} - set(ways)
+        member_refs = {}
+        needed = {ref for _, refs in ways.values() for ref in refs}
+        if members:
+            for tag, element in self.iterate():
+                if tag == 'way' and int(element.get('id')) in members:
+                    member_refs[int(element.get('id'))] = [int(nd.get('ref'))
+                                                           for nd in element.iter('nd')]
+                elif tag == 'relation':
+                    break
+            needed.update(ref for refs in member_refs.values() for ref in refs)
+
+        locations = {}
+        for tag, element in self.iterate(stop_at_ways=True):
+            node_id = int(element.get('id'))
+            if node_id in needed:
+                locations[node_id] = (float(element.get('lat')), float(element.get('lon')))
+
+        def coords(refs):
+            return [locations[r] for r in refs if r in locations]
+
+        features = list(points)
+        for way_id, (tags, refs) in ways.items():
+            closed = len(refs) > 3 and refs[0] == refs[-1]
+            if closed and not is_line(tags):
+                features.append(OsmFeature(way_id, tags, 'Polygon', coords(refs[:-1])))
+            else:
+                features.append(OsmFeature(way_id, tags, 'LineString', coords(refs)))
+        for relation_id, tags, outer in relations:
+            rings = join_rings(ways[w][1] if w in ways else member_refs.get(w, [])
+                               for w in outer)
+            for ring in rings:
+                features.append(OsmFeature(relation_id, tags, 'Polygon', coords(ring[:-1])))
+        return [f for f in features if f.coords]
+
+
+def is_line(tags):
+    return tags.get('golf') in ('hole', 'cartpath')
+
+
+class PbfReader:
+    """Reads .osm.pbf through pyosmium, which resolves node locations and
+    assembles multipolygons itself"""
+
+    def __init__(self, path):
+        self.path = path
+        self.bytes = 0
+        self.elements = 0
+        self.passes = 0
+
+    def features(self):
+        try:
+            import osmium
+        except ImportError:
+            raise ValueError(f"{self.path}: reading .pbf needs pyosmium (pip install osmium)")
+
+        reader = self
+        found = []
+
+        class Handler(osmium.SimpleHandler):
+            def node(self, n):
+                reader.elements += 1
+                if len(n.tags) and wanted(n.tags):
+                    found.append(OsmFeature(n.id, dict(n.tags), 'Point',
+                                            [(n.location.lat, n.location.lon)]))
+
+            def way(self, w):
+                reader.elements += 1
+                if is_line(w.tags):
+                    found.append(OsmFeature(w.id, dict(w.tags), 'LineString',
+                                            [(nd.lat, nd.lon) for nd in w.nodes
+                                             if nd.location.valid()]))
+
+            def relation(self, r):
+                reader.elements += 1
+
+            def area(self, a):
+                if wanted(a.tags) and not is_line(a.tags):
+                    for ring in a.outer_rings():
+                        coords = [(nd.lat, nd.lon) for nd in ring]
+                        found.append(OsmFeature(a.orig_id(), dict(a.tags), 'Polygon',
+                                                coords[:-1]))
+
+        Handler().apply_file(self.path, locations=True)
+        self.passes = 1
+        self.bytes = os.path.getsize(self.path)
+        return [f for f in found if f.coords]
+
+
+def read_extract(path):
+    """(OSM features, ImportStats) for an extract on disk"""
+    reader = PbfReader(path) if path.endswith('.pbf') else XmlReader(path)
+    start = time.perf_counter()
+    try:
+        features = reader.features()
+    except ET.ParseError as e:
+        raise ValueError(f"{path}: {e}")
+    stats = ImportStats(reader.bytes, reader.elements, time.perf_counter() - start,
+                        reader.passes, peak_rss_mb())
+    return features, stats
+
+
+def centroid(coords):
+    return (sum(c[0] for c in coords) / len(coords), sum(c[1] for c in coords) / len(coords))
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", '-', name.lower()).strip('-') or 'course'
+
+
+def split_courses(features):
+    """[(name, outline or None, features)] for each leisure=golf_course outline;
+    features outside every outline are dropped. Without outlines everything
+    is one course."""
+    outlines = [f for f in features
+                if f.tags.get('leisure') == 'golf_course' and f.geometry == 'Polygon']
+    parts = [f for f in features if f.tags.get('leisure') != 'golf_course']
+    if not outlines:
+        return [("Imported Course", None, parts)] if parts else []
+
+    courses = []
+    boxes = []
+    for outline in outlines:
+        lats = [c[0] for c in outline.coords]
+        lons = [c[1] for c in outline.coords]
+        boxes.append((min(lats), min(lons), max(lats), max(lons)))
+        courses.append((outline.tags.get('name') or f"Golf Course {outline.id}", outline, []))
+
+    for feature in parts:
+        lat, lon = feature.coords[0] if feature.geometry == 'Point' else centroid(feature.coords)
+        for (min_lat, min_lon, max_lat, max_lon), course in zip(boxes, courses):
+            if (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+                    and point_in_polygon(lat, lon, course[1].coords)):
+                course[2].append(feature)
+                break
+    return [course for course in courses if course[2]]
+
+
+def hole_number(tags):
+    try:
+        return int(tags.get('ref', ''))
+    except ValueError:
+        return None
+
+
+def course_geojson(name, features):
+    """Course GeoJSON FeatureCollection (the format course_data loads)"""
+    points = [c for f in features for c in f.coords]
+    projection = LocalProjection(*centroid(points))
+
+    def local(coords):
+        return [projection.to_local(lat, lon) for lat, lon in coords]
+
+    holes = {}
+    for feature in features:
+        number = hole_number(feature.tags)
+        if feature.tags.get('golf') == 'hole' and number is not None and len(feature.coords) > 1:
+            holes[number] = (feature, local(feature.coords))
+
+    def nearest_hole(kind, points, geometry):
+        """Hole a tee/green/fairway/hazard belongs to"""
+        best, best_distance = None, HOLE_REACH.get(kind, DEFAULT_HOLE_REACH)
+        for number, (_, line) in holes.items():
+            if kind == 'tee':
+                distance = min(math.hypot(x - line[0][0], y - line[0][1]) for x, y in points)
+            elif kind == 'green' and geometry == 'Polygon':
+                distance = polygon_distance(*line[-1], points)
+            else:
+                cx, cy = centroid(points)
+                distance = polyline_distance(cx, cy, line)
+            if distance < best_distance:
+                best, best_distance = number, distance
+        return best
+
+    out = []
+    counters = {}
+
+    def add(kind, geometry, coords, name, **props):
+        props.update(kind=kind, name=name)
+        if geometry == 'Point':
+            coordinates = [round(coords[0][1], 7), round(coords[0][0], 7)]
+        elif geometry == 'LineString':
+            coordinates = [[round(lon, 7), round(lat, 7)] for lat, lon in coords]
+        else:
+            coordinates = [[[round(lon, 7), round(lat, 7)] for lat, lon in coords + coords[:1]]]
+        out.append({'type': 'Feature', 'properties': props,
+                    'geometry': {'type': geometry, 'coordinates': coordinates}})
+
+    for number in sorted(holes):
+        feature, _ = holes[number]
+        props = {'hole': number, 'osm_id': feature.id}
+        if feature.tags.get('par', '').isdigit():
+            props['par'] = int(feature.tags['par'])
+        add('hole', 'LineString', feature.coords, f"Hole {number}", **props)
+
+    for feature in features:
+        tags = feature.tags
+        golf = tags.get('golf')
+        if golf == 'hole':
+            continue
+        if golf in GOLF_KINDS:
+            kind, geometry = GOLF_KINDS[golf]
+        else:
+            kind, geometry = AMENITY_KINDS[tags['amenity']], 'Point'
+        coords = feature.coords
+        if geometry == 'Point' and feature.geometry != 'Point':
+            coords = [centroid(coords)]
+        elif geometry == 'Polygon' and feature.geometry != 'Polygon':
+            continue  # an unclosed green or bunker cannot be used
+        elif geometry == 'LineString' and len(coords) < 2:
+            continue
+
+        props = {'osm_id': feature.id}
+        hole = None
+        if kind in ('tee', 'green', 'fairway', 'hazard'):
+            hole = nearest_hole(kind, local(coords), geometry)
+        if hole is not None:
+            props['hole'] = hole
+        label = f"Hole {hole} " if hole is not None else ""
+        count = counters[(hole, golf)] = counters.get((hole, golf), 0) + 1
+
+        if kind == 'tee':
+            title = f"{label}Tee" + (f" ({count})" if count > 1 else "")
+            props['destination'] = hole in (1, 10) and count == 1
+        elif kind == 'hazard':
+            props['hazard'] = HAZARDS[golf]
+            title = f"{label}{HAZARDS[golf].title()} {count}"
+        elif kind == 'green':
+            title = f"{label}Green"
+        elif kind == 'fairway':
+            title = f"{label}Fairway"
+        elif kind == 'cart_path':
+            title = tags.get('name', "Cart Path")
+        else:
+            title = tags.get('name') or kind.replace('_', ' ').title()
+            if kind in ('clubhouse', 'parking', 'driving_range'):
+                props['destination'] = True
+            if kind in ('restroom', 'snack_bar'):
+                props['amenity'] = tags['amenity']
+        if not props.get('destination'):
+            props.pop('destination', None)
+        add(kind, geometry, coords, title, **props)
+
+        if kind == 'green' and hole is not None:
+            add_green_targets(add, holes[hole][1], local(coords), projection, hole, title)
+
+    return {'type': 'FeatureCollection', 'name': name, 'features': out}
+
+
+def add_green_targets(add, hole_line, green, projection, hole, name):
+    """Front/middle/back points of a green along the line the hole arrives on"""
+    (ax, ay), (bx, by) = hole_line[-2], hole_line[-1]
+    length = math.hypot(bx - ax, by - ay) or 1.0
+    ux, uy = (bx - ax) / length, (by - ay) / length
+    cx, cy = centroid(green)
+    along = [(x - cx) * ux + (y - cy) * uy for x, y in green]
+    for position, t in (('front', min(along)), ('middle', 0.0), ('back', max(along))):
+        lat, lon = projection.to_latlon(cx + ux * t, cy + uy * t)
+        add(f"green_{position}", 'Point', [(lat, lon)], f"{name} ({position.title()})",
+            hole=hole)
+
+
+def import_extract(path):
+    """[(course name, GeoJSON)] for every golf course in an extract, plus stats"""
+    features, stats = read_extract(path)
+    courses = [(name, course_geojson(name, parts)) for name, _, parts in split_courses(features)]
+    logger.info(f"Imported {len(courses)} course(s) from {path}: {format_stats(stats)}")
+    return courses, stats
+
+
+def format_stats(stats):
+    megabytes = stats.bytes / 1e6
+    seconds = max(stats.seconds, 1e-9)
+    text = (f"read {megabytes:.1f} MB, {stats.elements} elements in {stats.seconds:.1f} s "
+            f"({megabytes / seconds:.1f} MB/s, {stats.elements / seconds / 1000:.0f}k elements/s) "
+            f"over {stats.passes} pass(es)")
+    if stats.peak_rss_mb is not None:
+        text += f"; peak memory {stats.peak_rss_mb:.0f} MB"
+    return text
+
+
+def write_geojson(data, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build course GeoJSON from an OSM extract")
+    parser.add_argument('extract', help=".osm, .osm.gz, .osm.bz2 or .osm.pbf file")
+    parser.add_argument('--course', help="only the golf course with this name")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--out', help="GeoJSON file for a single course")
+    target.add_argument('--out-dir', help="one GeoJSON file per course")
+    parser.add_argument('--pack', action='store_true', help="also write course packs (--out-dir)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    try:
+        courses, stats = import_extract(args.extract)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.course:
+        courses = [c for c in courses if c[0].lower() == args.course.lower()]
+    print(format_stats(stats), file=sys.stderr)
+    if not courses:
+        print("No golf courses found", file=sys.stderr)
+        return 1
+
+    if args.out:
+        if len(courses) > 1:
+            print("Several courses found, pick one with --course:", file=sys.stderr)
+            for name, _ in courses:
+                print(f"  {name}", file=sys.stderr)
+            return 1
+        write_geojson(courses[0][1], args.out)
+        print(f"{courses[0][0]}: {len(courses[0][1]['features'])} features -> {args.out}",
+              file=sys.stderr)
+        return 0
+
+    for name, data in courses:
+        path = os.path.join(args.out_dir, slugify(name) + '.geojson')
+        write_geojson(data, path)
+        print(f"{name}: {len(data['features'])} features -> {path}", file=sys.stderr)
+        if args.pack:
+            from .course_data import course_from_geojson
+            from .course_pack import write_pack
+            write_pack(course_from_geojson(data), os.path.splitext(path)[0] + '.cpk')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
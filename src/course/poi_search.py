@@ -0,0 +1,190 @@
+"""
+POI Search - Offline search-as-you-type over course and venue points of interest
+"""
+
+import re
+import bisect
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# x, y are local meters in the course projection
+Poi = namedtuple('Poi', ['name', 'kind', 'lat', 'lon', 'x', 'y', 'keywords'])
+
+SearchResult = namedtuple('SearchResult', ['poi', 'distance', 'edits'])
+
+# Course features that are not worth offering as search results
+SKIPPED_KINDS = {'cart_path', 'no_cart', 'restricted'}
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return WORD.findall(text.lower())
+
+
+def trigrams(word):
+    """Trigrams of the word padded at the front only, so a typed prefix
+    shares its trigrams with every word it is a prefix of"""
+    padded = '  ' + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def prefix_edit_distance(query, word, limit):
+    """Fewest edits turning query into some prefix of word, or limit + 1 if more"""
+    previous = list(range(len(word) + 1))
+    for i, qc in enumerate(query, 1):
+        current = [i]
+        for j, wc in enumerate(word, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (qc != wc)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous)
+
+
+def pois_from_course(course):
+    """Named course features (holes, tees, greens, amenities, parking...) as POIs
+
+    Where a name is used twice (a hole outline and its first tee), the
+    point feature wins since that is where a driver wants to go.
+    """
+    chosen = {}
+    for feature in course.features:
+        if not feature.name or feature.kind in SKIPPED_KINDS:
+            continue
+        current = chosen.get(feature.name)
+        if current is None or (current.geometry != 'Point' and feature.geometry == 'Point'):
+            chosen[feature.name] = feature
+
+    pois = []
+    for feature in chosen.values():
+        lat, lon = feature.anchor
+        x, y = course.to_local(lat, lon)
+        keywords = feature.kind.replace('_', ' ')
+        for key in ('amenity', 'hazard'):
+            if feature.properties.get(key):
+                keywords += ' ' + str(feature.properties[key])
+        pois.append(Poi(feature.name, feature.kind, lat, lon, x, y, keywords))
+    return pois
+
+
+def pois_from_destinations(destinations, projection):
+    """POIs for a plain name -> (lat, lon) mapping (no course file)"""
+    return [Poi(name, 'poi', lat, lon, *projection.to_local(lat, lon), '')
+            for name, (lat, lon) in destinations.items()]
+
+
+class PoiIndex:
+    """Prefix and fuzzy name search ranked by distance from the cart
+
+    Words from every POI's name and keywords form a sorted vocabulary with
+    CSR postings (word -> POI ids), so all POIs with a word starting with
+    the typed text are one bisect and one array slice. Query words that
+    match nothing as a prefix are looked up through a trigram index over
+    the vocabulary and checked with a bounded edit distance. Every query
+    word must match (prefix or fuzzy) for a POI to be returned.
+    """
+
+    def __init__(self, pois):
+        self.pois = list(pois)
+        postings = {}
+        for index, poi in enumerate(self.pois):
+            for word in set(tokenize(poi.name) + tokenize(poi.keywords or '')):
+                postings.setdefault(word, []).append(index)
+
+        self.words = sorted(postings)
+        starts = [0]
+        ids = []
+        for word in self.words:
+            ids.extend(postings[word])
+            starts.append(len(ids))
+        self.starts = np.array(starts, dtype=np.int64)
+        self.postings = np.array(ids, dtype=np.int32)
+
+        grams = {}
+        for word_id, word in enumerate(self.words):
+            for gram in trigrams(word):
+                grams.setdefault(gram, []).append(word_id)
+        self.grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+
+        self.xs = np.array([p.x for p in self.pois], dtype=np.float64)
+        self.ys = np.array([p.y for p in self.pois], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.pois)
+
+    def prefix_matches(self, token):
+        """POI ids having a word that starts with token"""
+        lo = bisect.bisect_left(self.words, token)
+        hi = bisect.bisect_left(self.words, token + '\uffff', lo)
+        return self.postings[self.starts[lo]:self.starts[hi]]
+
+    def fuzzy_matches(self, token, max_edits):
+        """(POI ids, edits) for words within max_edits of a prefix of token"""
+        query_grams = trigrams(token)
+        lists = [self.grams[g] for g in query_grams if g in self.grams]
+        if not lists:
+            return []
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.words))
+        # Each edit spoils at most three of the query's trigrams
+        needed = max(1, len(query_grams) - 3 * max_edits)
+        matches = []
+        for word_id in np.nonzero(counts >= needed)[0]:
+            word = self.words[word_id]
+            edits = prefix_edit_distance(token, word, max_edits)
+            if edits <= max_edits:
+                matches.append((self.postings[self.starts[word_id]:self.starts[word_id + 1]],
+                                edits))
+        return matches
+
+    def token_matches(self, token):
+        """POI id -> fewest edits for one query word"""
+        exact = self.prefix_matches(token)
+        if len(exact) or len(token) < 3:
+            return dict.fromkeys(exact.tolist(), 0)
+        best = {}
+        for ids, edits in self.fuzzy_matches(token, 1 if len(token) < 6 else 2):
+            for poi_id in ids.tolist():
+                if edits < best.get(poi_id, edits + 1):
+                    best[poi_id] = edits
+        return best
+
+    def search(self, query, x=None, y=None, limit=8):
+        """Best matches for the typed text, nearest first within equal edits
+
+        Without a position (no fix yet) results are in name order.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.pois:
+            return []
+
+        # Rarest word first keeps the intersection small
+        per_token = sorted((self.token_matches(t) for t in tokens), key=len)
+        edits = per_token[0]
+        for other in per_token[1:]:
+            edits = {i: e + other[i] for i, e in edits.items() if i in other}
+            if not edits:
+                return []
+
+        ids = np.fromiter(edits, dtype=np.int64, count=len(edits))
+        cost = np.fromiter(edits.values(), dtype=np.float64, count=len(edits))
+        if x is None:
+            distance = np.zeros(len(ids))
+            names = np.array([self.pois[i].name for i in ids.tolist()])
+            order = np.lexsort((names, cost))[:limit]
+        else:
+            distance = np.hypot(self.xs[ids] - x, self.ys[ids] - y)
+            # Whole edits always outrank distance
+            key = cost * 1e9 + distance
+            if len(key) > limit:
+                top = np.argpartition(key, limit)[:limit]
+                order = top[np.argsort(key[top])]
+            else:
+                order = np.argsort(key)
+        return [SearchResult(self.pois[ids[i]], None if x is None else float(distance[i]),
+                             int(cost[i])) for i in order.tolist()]
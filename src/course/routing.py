@@ -0,0 +1,340 @@
+"""
+Cart Path Routing - Shortest routes along cart paths with incremental rerouting
+"""
+
+import math
+import heapq
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_MILE = 1609.344
+MPH_TO_MPS = 0.44704
+
+# Snapped location on the path network: edge id, fraction t from the edge's
+# first node, distance to the edge and the snapped (x, y) point
+Snap = namedtuple('Snap', ['edge', 't', 'distance', 'point'])
+
+# length is meters from the start position to the destination, including
+# the legs from the start onto the path network and from it to the target.
+# points is the polyline in local meters; nodes the graph nodes it visits.
+# remaining maps route nodes to meters left; goal_links does the same for
+# the two ends of the destination's edge.
+Route = namedtuple('Route', ['length', 'points', 'nodes', 'remaining', 'goal_links'])
+
+START = -1
+GOAL = -2
+
+
+def project_onto_segment(px, py, ax, ay, bx, by):
+    """(t, distance, point) of P's closest point on segment AB"""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    qx, qy = ax + t * dx, ay + t * dy
+    return t, math.hypot(px - qx, py - qy), (qx, qy)
+
+
+class PathGraph:
+    """Undirected graph of cart-path vertices in the course's local plane
+
+    Vertices closer than merge_distance are treated as the same node so
+    separately drawn paths join where they touch.
+    """
+
+    def __init__(self, lines, merge_distance=1.0, cell_size=50.0):
+        self.merge_distance = merge_distance
+        self.cell_size = cell_size
+        self.nodes = []        # (x, y)
+        self.adjacency = []    # per node: [(neighbor, length, edge), ...]
+        self.edges = []        # (a, b, length)
+        self.node_keys = {}
+        self.edge_cells = {}
+
+        for points in lines:
+            previous = None
+            for x, y in points:
+                node = self.add_node(x, y)
+                if previous is not None and previous != node:
+                    self.add_edge(previous, node)
+                previous = node
+
+    @classmethod
+    def from_course(cls, course, **kwargs):
+        lines = [f.points for f in course.features
+                 if f.kind == 'cart_path' and f.geometry == 'LineString']
+        graph = cls(lines, **kwargs)
+        logger.info(f"Cart path graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
+        return graph
+
+    @classmethod
+    def from_edges(cls, nodes, edges, **kwargs):
+        """Rebuild a saved graph from its node coordinates and (a, b) node pairs"""
+        graph = cls([], **kwargs)
+        for x, y in nodes:
+            graph.add_node(x, y)
+        for a, b in edges:
+            graph.add_edge(a, b)
+        return graph
+
+    def add_node(self, x, y):
+        key = (round(x / self.merge_distance), round(y / self.merge_distance))
+        node = self.node_keys.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self.node_keys[key] = node
+            self.nodes.append((x, y))
+            self.adjacency.append([])
+        return node
+
+    def add_edge(self, a, b):
+        (ax, ay), (bx, by) = self.nodes[a], self.nodes[b]
+        length = math.hypot(bx - ax, by - ay)
+        edge = len(self.edges)
+        self.edges.append((a, b, length))
+        self.adjacency[a].append((b, length, edge))
+        self.adjacency[b].append((a, length, edge))
+
+        size = self.cell_size
+        for cx in range(math.floor(min(ax, bx) / size), math.floor(max(ax, bx) / size) + 1):
+            for cy in range(math.floor(min(ay, by) / size), math.floor(max(ay, by) / size) + 1):
+                self.edge_cells.setdefault((cx, cy), []).append(edge)
+
+    def snap(self, x, y, max_rings=20):
+        """Nearest point on the network as a Snap, or None if there are no paths"""
+        cx, cy = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        best = None
+        for r in range(max_rings + 1):
+            for gx in range(cx - r, cx + r + 1):
+                for gy in range(cy - r, cy + r + 1):
+                    if max(abs(gx - cx), abs(gy - cy)) != r:
+                        continue
+                    for edge in self.edge_cells.get((gx, gy), ()):
+                        a, b, _ = self.edges[edge]
+                        t, distance, point = project_onto_segment(x, y, *self.nodes[a],
+                                                                  *self.nodes[b])
+                        if best is None or distance < best.distance:
+                            best = Snap(edge, t, distance, point)
+            # Edges in later rings are at least r cells away
+            if best is not None and best.distance <= r * self.cell_size:
+                break
+        return best
+
+    def snap_links(self, snap):
+        """[(node, meters)] from a snapped point to its edge's endpoints"""
+        a, b, length = self.edges[snap.edge]
+        return [(a, snap.t * length), (b, (1 - snap.t) * length)]
+
+    def search(self, start_snap, goal_point, goal_links):
+        """A* from a snapped start to GOAL over the graph plus virtual goal links
+
+        goal_links maps node -> meters from that node to the destination.
+        Returns (length, node list) or None if the goal is unreachable.
+        """
+        gx, gy = goal_point
+        nodes = self.nodes
+        best = {START: 0.0}
+        parent = {START: None}
+        queue = [(math.hypot(start_snap.point[0] - gx, start_snap.point[1] - gy), 0.0, START)]
+        closed = set()
+
+        while queue:
+            _, g, node = heapq.heappop(queue)
+            if node == GOAL:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return g, path[::-1]
+            if node in closed:
+                continue
+            closed.add(node)
+
+            if node == START:
+                neighbors = [(n, d) for n, d in self.snap_links(start_snap)]
+            else:
+                neighbors = [(n, d) for n, d, _ in self.adjacency[node]]
+            if node in goal_links:
+                neighbors.append((GOAL, goal_links[node]))
+
+            for neighbor, length in neighbors:
+                cost = g + length
+                if cost < best.get(neighbor, math.inf):
+                    best[neighbor] = cost
+                    parent[neighbor] = node
+                    if neighbor == GOAL:
+                        h = 0.0
+                    else:
+                        nx, ny = nodes[neighbor]
+                        h = math.hypot(nx - gx, ny - gy)
+                    heapq.heappush(queue, (cost + h, cost, neighbor))
+        return None
+
+    def route(self, start, goal):
+        """Route between two local points, or None if either is off the network"""
+        start_snap = self.snap(*start)
+        goal_snap = self.snap(*goal)
+        if start_snap is None or goal_snap is None:
+            return None
+        approach = goal_snap.distance
+        goal_links = {node: d + approach for node, d in self.snap_links(goal_snap)}
+
+        # Both ends on the same edge: drive straight along it
+        if start_snap.edge == goal_snap.edge:
+            a, b, length = self.edges[start_snap.edge]
+            along = abs(goal_snap.t - start_snap.t) * length
+            direct = start_snap.distance + along + approach
+            points = [start, start_snap.point, goal_snap.point, goal]
+            return self.make_route(direct, points, [], goal_links)
+
+        found = self.search(start_snap, goal_snap.point, goal_links)
+        if found is None:
+            return None
+        length, path = found
+        inner = path[1:-1]
+        points = [start, start_snap.point] + [self.nodes[n] for n in inner] + \
+            [goal_snap.point, goal]
+        return self.make_route(length + start_snap.distance, points, inner, goal_links)
+
+    def make_route(self, length, points, nodes, goal_links):
+        """Route with the remaining meters to the destination from each node on it"""
+        remaining = {}
+        if nodes:
+            # Walk backwards from the last node, which links straight to the goal
+            distance = goal_links[nodes[-1]]
+            remaining[nodes[-1]] = distance
+            for node, following in zip(reversed(nodes[:-1]), reversed(nodes[1:])):
+                (ax, ay), (bx, by) = self.nodes[node], self.nodes[following]
+                distance += math.hypot(bx - ax, by - ay)
+                remaining[node] = distance
+        return Route(length, points, nodes, remaining, goal_links)
+
+
+class Router:
+    """Keeps the active route and follows the cart along it
+
+    While the cart stays within off_route_distance of the route the
+    remaining distance is read off the route. When it strays, the search
+    only has to reach any node of the remaining route - whose distance to
+    the destination is already known - instead of the destination itself.
+
+    With a speed_model (course.speed_model.SpeedModel) the ETA uses the
+    learned speeds along the rest of the route; speed_mph is the fallback
+    where the model has too few samples.
+
+    When no route is found the search is not repeated on every fix: it is
+    tried again once the cart has moved retry_distance from where it
+    failed, or when the destination changes.
+    """
+
+    def __init__(self, graph, speed_mph=15.0, off_route_distance=25.0, speed_model=None,
+                 retry_distance=25.0):
+        self.graph = graph
+        self.speed = speed_mph * MPH_TO_MPS
+        self.off_route_distance = off_route_distance
+        self.retry_distance = retry_distance
+        self.speed_model = speed_model
+        self.destination = None
+        self.unreachable_from = None
+        self.route = None
+        self.remaining = None
+        self.ahead = None
+        self.reroutes = 0
+
+    def set_destination(self, start, destination):
+        self.destination = destination
+        self.route = self.graph.route(start, destination)
+        self.remaining = self.route.length if self.route else None
+        self.ahead = self.route.points if self.route else None
+        # Where the search failed, so later fixes nearby don't repeat it
+        self.unreachable_from = None if self.route else start
+        return self.route
+
+    def clear(self):
+        self.destination = self.route = self.remaining = self.ahead = None
+        self.unreachable_from = None
+
+    def eta_seconds(self, remaining=None):
+        if remaining is None and self.speed_model is not None and self.ahead:
+            return self.speed_model.predict_seconds(self.ahead, self.speed)
+        remaining = self.remaining if remaining is None else remaining
+        if remaining is None:
+            return None
+        return remaining / self.speed
+
+    def progress(self, x, y):
+        """(distance off the route, remaining meters, points ahead) at the closest route segment"""
+        points = self.route.points
+        best = (math.inf, None, None)
+        total = self.route.length
+        travelled = 0.0
+        for i, ((ax, ay), (bx, by)) in enumerate(zip(points, points[1:])):
+            segment = math.hypot(bx - ax, by - ay)
+            t, distance, point = project_onto_segment(x, y, ax, ay, bx, by)
+            if distance < best[0]:
+                best = (distance, max(0.0, total - travelled - t * segment), (point, i + 1))
+            travelled += segment
+        distance, remaining, (point, following) = best
+        return distance, remaining, [point] + points[following:]
+
+    def update(self, x, y):
+        """Remaining meters to the destination after the cart moved to (x, y)"""
+        if self.route is None:
+            # No route yet (e.g. destination picked before the first fix)
+            if self.destination is not None and self.should_retry(x, y):
+                self.set_destination((x, y), self.destination)
+            return self.remaining
+
+        off_route, remaining, ahead = self.progress(x, y)
+        if off_route <= self.off_route_distance:
+            self.remaining = remaining
+            self.ahead = ahead
+            return remaining
+
+        rerouted = self.reroute(x, y)
+        if rerouted is not None:
+            self.route = rerouted
+            self.remaining = rerouted.length
+            self.ahead = rerouted.points
+            self.reroutes += 1
+        return self.remaining
+
+    def should_retry(self, x, y):
+        """False while the cart is still near where the last search failed"""
+        if self.unreachable_from is None:
+            return True
+        fx, fy = self.unreachable_from
+        return math.hypot(x - fx, y - fy) >= self.retry_distance
+
+    def reroute(self, x, y):
+        graph = self.graph
+        start_snap = graph.snap(x, y)
+        if start_snap is None:
+            return None
+        route = self.route
+
+        # Every way to the destination ends through its edge's two ends,
+        # so keeping those links lets the cart arrive from either direction
+        goal_links = dict(route.goal_links)
+        goal_links.update(route.remaining)
+        found = graph.search(start_snap, self.destination, goal_links)
+        if found is None:
+            return None
+        length, path = found
+        joined = path[1:-1]
+        rejoin = joined[-1]
+
+        # Splice: new path to the rejoin node, then the rest of the old route
+        rest = route.nodes[route.nodes.index(rejoin) + 1:] if rejoin in route.remaining else []
+        nodes = joined + rest
+        points = [(x, y), start_snap.point] + [graph.nodes[n] for n in nodes] + route.points[-2:]
+
+        remaining = {node: route.remaining[node] for node in rest}
+        distance = goal_links[rejoin]
+        remaining[rejoin] = distance
+        for node, following in zip(reversed(joined[:-1]), reversed(joined[1:])):
+            (ax, ay), (bx, by) = graph.nodes[node], graph.nodes[following]
+            distance += math.hypot(bx - ax, by - ay)
+            remaining[node] = distance
+        return Route(length + start_snap.distance, points, nodes, remaining, route.goal_links)
@@ -0,0 +1,181 @@
+"""
+Spatial Index - Uniform grid over course features for nearest/radius/hole queries
+"""
+
+import math
+import heapq
+
+
+class SpatialIndex:
+    """Buckets features into square grid cells of cell_size meters
+
+    Points go into one cell, cart paths and other lines into the cells
+    along each segment's bounds, and polygons into every cell of their
+    bounds so that a point deep inside one still finds it nearby.
+    """
+
+    def __init__(self, features, cell_size=25.0):
+        self.features = list(features)
+        self.cell_size = cell_size
+        self.cells = {}
+
+        for feature in self.features:
+            if feature.geometry == 'LineString' and len(feature.points) > 1:
+                for a, b in zip(feature.points, feature.points[1:]):
+                    self.insert(feature.index, min(a[0], b[0]), min(a[1], b[1]),
+                                max(a[0], b[0]), max(a[1], b[1]))
+            else:
+                self.insert(feature.index, *feature.bounds())
+
+        self.by_index = {f.index: f for f in self.features}
+        if self.cells:
+            xs = [c[0] for c in self.cells]
+            ys = [c[1] for c in self.cells]
+            self.extent = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.extent = (0, 0, 0, 0)
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, index, min_x, min_y, max_x, max_y):
+        x0, y0 = self.cell(min_x, min_y)
+        x1, y1 = self.cell(max_x, max_y)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells.setdefault((cx, cy), [])
+                if not bucket or bucket[-1] != index:
+                    bucket.append(index)
+
+    def ring(self, cx, cy, r):
+        """Cells at Chebyshev distance r from (cx, cy)"""
+        if r == 0:
+            yield cx, cy
+            return
+        for x in range(cx - r, cx + r + 1):
+            yield x, cy - r
+            yield x, cy + r
+        for y in range(cy - r + 1, cy + r):
+            yield cx - r, y
+            yield cx + r, y
+
+    def nearest(self, x, y, n=1, kinds=None, max_distance=math.inf):
+        """Up to n (distance, feature) pairs closest to local point (x, y)"""
+        cx, cy = self.cell(x, y)
+        min_x, min_y, max_x, max_y = self.extent
+        max_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+
+        seen = set()
+        best = []  # max-heap of the n best as (-distance, index)
+        r = 0
+        while r <= max_ring:
+            for key in self.ring(cx, cy, r):
+                for index in self.cells.get(key, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    feature = self.by_index[index]
+                    if kinds is not None and feature.kind not in kinds:
+                        continue
+                    distance = feature.distance(x, y)
+                    if distance > max_distance:
+                        continue
+                    if len(best) < n:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+            # Anything not yet seen lies at least r cells away
+            reach = r * self.cell_size
+            if (len(best) == n and -best[0][0] <= reach) or reach > max_distance:
+                break
+            r += 1
+
+        return [(-d, self.by_index[i]) for d, i in sorted(best, reverse=True)]
+
+    def within(self, x, y, radius, kinds=None):
+        """(distance, feature) pairs within radius meters, nearest first"""
+        x0, y0 = self.cell(x - radius, y - radius)
+        x1, y1 = self.cell(x + radius, y + radius)
+        seen = set()
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for index in self.cells.get((cx, cy), ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    feature = self.by_index[index]
+                    if kinds is not None and feature.kind not in kinds:
+                        continue
+                    distance = feature.distance(x, y)
+                    if distance <= radius:
+                        found.append((distance, feature))
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class HoleTracker:
+    """Decides which hole the cart is on, with hysteresis at hole boundaries
+
+    The current hole is kept until another hole is closer by more than
+    switch_margin meters for `dwell` consecutive updates, so jitter near a
+    shared boundary does not flip the display back and forth.
+    """
+
+    def __init__(self, index, switch_margin=10.0, dwell=3, max_distance=150.0):
+        self.index = index
+        self.switch_margin = switch_margin
+        self.dwell = dwell
+        self.max_distance = max_distance
+        self.current = None
+        self.candidate = None
+        self.candidate_count = 0
+
+        self.outlines = {}
+        for feature in index.features:
+            if feature.kind == 'hole':
+                self.outlines.setdefault(feature.hole, []).append(feature)
+
+    def distance_to_hole(self, hole, x, y):
+        return min((f.distance(x, y) for f in self.outlines.get(hole, ())),
+                   default=math.inf)
+
+    def update(self, x, y):
+        """Current hole number (or None) after a new local position"""
+        nearby = self.index.nearest(x, y, n=3, kinds={'hole'}, max_distance=self.max_distance)
+        if not nearby:
+            # Off the course (clubhouse, parking, range)
+            self.current = self.candidate = None
+            self.candidate_count = 0
+            return None
+
+        # Overlapping outlines both read 0 m; prefer staying on the current hole
+        best_distance, best = nearby[0]
+        current_distance = math.inf
+        for distance, feature in nearby:
+            if feature.hole == self.current:
+                current_distance = distance
+                if distance <= best_distance:
+                    best_distance, best = distance, feature
+                break
+
+        if self.current is None:
+            self.current = best.hole
+        elif best.hole != self.current:
+            if current_distance == math.inf:
+                current_distance = self.distance_to_hole(self.current, x, y)
+            if current_distance - best_distance > self.switch_margin:
+                if best.hole == self.candidate:
+                    self.candidate_count += 1
+                else:
+                    self.candidate = best.hole
+                    self.candidate_count = 1
+                if self.candidate_count >= self.dwell:
+                    self.current = best.hole
+                    self.candidate = None
+                    self.candidate_count = 0
+                return self.current
+
+        self.candidate = None
+        self.candidate_count = 0
+        return self.current
@@ -0,0 +1,288 @@
+"""
+Speed Model - Learned per-cell cart speeds for ETA prediction
+
+Rebuild the model offline from recorded tracks (CSV, GPX or the cart's
+.trk ring files), from src:
+
+    python3 -m course.speed_model --tracks ../data/tracks \\
+        --course ../config/course.geojson --out ../data/speed_model.bin
+"""
+
+import os
+import sys
+import csv
+import math
+import struct
+import argparse
+import logging
+from array import array
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import xml.etree.ElementTree as ET
+
+from .geo import LocalProjection, haversine_m
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SPDM"
+VERSION = 1
+# magic, version, cell size (m), origin lat, origin lon, cell count
+HEADER = struct.Struct("<4sHfddI")
+# cell x, cell y, sample count, mean speed (m/s), sum of squared deviations
+RECORD = struct.Struct("<iiIff")
+
+# Samples below this speed are the cart parked, not driving
+MIN_MOVING_SPEED = 0.5
+
+
+class SpeedModel:
+    """Streaming mean/variance of cart speed in square grid cells
+
+    Each cell keeps Welford's running count, mean and M2 in preallocated
+    arrays, so memory is fixed by max_cells. Counts stop growing at
+    max_count, after which new samples keep a constant weight and the
+    model follows changes (new cart path, seasonal slow zones).
+    """
+
+    def __init__(self, projection, cell_size=20.0, max_cells=20000, max_count=5000):
+        self.projection = projection
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.max_count = max_count
+
+        self.slots = {}
+        self.keys = []
+        self.counts = array('I', bytes(4 * max_cells))
+        self.means = array('d', bytes(8 * max_cells))
+        self.m2 = array('d', bytes(8 * max_cells))
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def slot(self, key, create=True):
+        index = self.slots.get(key)
+        if index is None and create:
+            if len(self.keys) >= self.max_cells:
+                self.dropped += 1
+                return None
+            index = len(self.keys)
+            self.slots[key] = index
+            self.keys.append(key)
+        return index
+
+    def add(self, x, y, speed):
+        """Record one speed sample (m/s) at a local position"""
+        if speed is None or speed < MIN_MOVING_SPEED:
+            return
+        index = self.slot(self.cell(x, y))
+        if index is None:
+            return
+        count = min(self.counts[index] + 1, self.max_count)
+        delta = speed - self.means[index]
+        self.means[index] += delta / count
+        self.m2[index] += delta * (speed - self.means[index])
+        if count == self.max_count:
+            # Keep M2 in step with the capped count
+            self.m2[index] *= (count - 1) / count
+        self.counts[index] = count
+
+    def add_latlon(self, lat, lon, speed):
+        self.add(*self.projection.to_local(lat, lon), speed)
+
+    def merge(self, key, count, mean, m2):
+        """Combine another model's statistics for one cell (Chan et al.)"""
+        index = self.slot(key)
+        if index is None or count == 0:
+            return
+        n_a = self.counts[index]
+        total = n_a + count
+        delta = mean - self.means[index]
+        self.means[index] += delta * count / total
+        self.m2[index] += m2 + delta * delta * n_a * count / total
+        if total > self.max_count:
+            self.m2[index] *= self.max_count / total
+            total = self.max_count
+        self.counts[index] = total
+
+    def stats(self, x, y):
+        """(count, mean, variance) for the cell containing a local point"""
+        index = self.slot(self.cell(x, y), create=False)
+        if index is None or self.counts[index] == 0:
+            return 0, None, None
+        count = self.counts[index]
+        variance = self.m2[index] / (count - 1) if count > 1 else 0.0
+        return count, self.means[index], variance
+
+    def speed_at(self, x, y, default, min_samples=5):
+        count, mean, _ = self.stats(x, y)
+        return mean if count >= min_samples else default
+
+    def predict_seconds(self, points, default_speed, step=None):
+        """Travel time along a local polyline using learned speeds"""
+        step = step or self.cell_size / 2
+        seconds = 0.0
+        for (ax, ay), (bx, by) in zip(points, points[1:]):
+            length = math.hypot(bx - ax, by - ay)
+            pieces = max(1, int(math.ceil(length / step)))
+            piece = length / pieces
+            for i in range(pieces):
+                t = (i + 0.5) / pieces
+                speed = self.speed_at(ax + (bx - ax) * t, ay + (by - ay) * t, default_speed)
+                seconds += piece / speed
+        return seconds
+
+    def save(self, path):
+        """Write the model atomically; about 20 bytes per visited cell"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.cell_size,
+                                self.projection.origin_lat, self.projection.origin_lon,
+                                len(self.keys)))
+            for index, (cx, cy) in enumerate(self.keys):
+                f.write(RECORD.pack(cx, cy, self.counts[index], self.means[index],
+                                    self.m2[index]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, projection=None, **kwargs):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, cell_size, lat, lon, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a speed model file")
+        if projection is None:
+            projection = LocalProjection(lat, lon)
+        elif (round(projection.origin_lat, 7), round(projection.origin_lon, 7)) != \
+                (round(lat, 7), round(lon, 7)):
+            raise ValueError(f"{path} was built for a different course")
+        if len(data) < HEADER.size + count * RECORD.size:
+            raise ValueError(f"{path} is truncated")
+        model = cls(projection, cell_size, **kwargs)
+        for cx, cy, n, mean, m2 in RECORD.iter_unpack(data[HEADER.size:HEADER.size + count * RECORD.size]):
+            model.merge((cx, cy), n, mean, m2)
+        return model
+
+
+def parse_time(text):
+    """Seconds since the epoch from a number or an ISO 8601 timestamp"""
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.strip().replace('Z', '+00:00')).timestamp()
+
+
+def read_csv_track(path):
+    """[(time, lat, lon, speed or None)] from a CSV with time,lat,lon[,speed] columns"""
+    points = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            speed = row.get('speed')
+            points.append((parse_time(row['time']), float(row['lat']), float(row['lon']),
+                           float(speed) if speed not in (None, '') else None))
+    return points
+
+
+def read_gpx_track(path):
+    from gps.replay import read_gpx
+
+    return [(fix.received, fix.lat, fix.lon, fix.speed) for fix in read_gpx(path)]
+
+
+def read_recorded_track(path):
+    """Points from the cart's own track ring file (gps.track_recorder)"""
+    from gps.track_recorder import TrackRecorder
+
+    recorder = TrackRecorder(path, readonly=True)
+    try:
+        track = recorder.read_range()
+    finally:
+        recorder.close()
+    # Unknown speeds (NaN) are derived from the positions like a CSV without speeds
+    return [(when, lat, lon, None if math.isnan(speed) else speed)
+            for when, lat, lon, speed in zip(track.time.tolist(), track.lat.tolist(),
+                                             track.lon.tolist(), track.speed.tolist())]
+
+
+TRACK_READERS = {'.csv': read_csv_track, '.gpx': read_gpx_track, '.trk': read_recorded_track}
+
+
+def track_samples(points):
+    """(lat, lon, speed) per point, deriving missing speeds from neighbours"""
+    for i, (when, lat, lon, speed) in enumerate(points):
+        if speed is None and i > 0:
+            before = points[i - 1]
+            elapsed = when - before[0]
+            if elapsed > 0:
+                speed = haversine_m(before[1], before[2], lat, lon) / elapsed
+        if speed is not None:
+            yield lat, lon, speed
+
+
+def build_partial(path, origin, cell_size):
+    """Worker: statistics for one track file as [(key, count, mean, m2)]"""
+    reader = TRACK_READERS.get(os.path.splitext(path)[1].lower())
+    model = SpeedModel(LocalProjection(*origin), cell_size, max_cells=1000000)
+    try:
+        for lat, lon, speed in track_samples(reader(path)):
+            model.add_latlon(lat, lon, speed)
+    except (OSError, ValueError, KeyError, ET.ParseError) as e:
+        logger.warning(f"Skipping {path}: {e}")
+        return []
+    return [(key, model.counts[i], model.means[i], model.m2[i])
+            for i, key in enumerate(model.keys)]
+
+
+def rebuild(track_paths, projection, cell_size=20.0, workers=None, **kwargs):
+    """SpeedModel built from many track files in a process pool"""
+    model = SpeedModel(projection, cell_size, **kwargs)
+    origin = (projection.origin_lat, projection.origin_lon)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(build_partial, track_paths,
+                            [origin] * len(track_paths), [cell_size] * len(track_paths))
+        for cells in partials:
+            for key, count, mean, m2 in cells:
+                model.merge(key, count, mean, m2)
+    return model
+
+
+def find_tracks(directory):
+    return sorted(os.path.join(root, name)
+                  for root, _, names in os.walk(directory) for name in names
+                  if os.path.splitext(name)[1].lower() in TRACK_READERS)
+
+
+def main(argv=None):
+    from .course_data import load_course
+
+    parser = argparse.ArgumentParser(description="Rebuild the cart speed model from recorded tracks")
+    parser.add_argument('--tracks', required=True, help="directory of .csv / .gpx / .trk tracks")
+    parser.add_argument('--course', required=True, help="course GeoJSON the model is for")
+    parser.add_argument('--out', required=True, help="speed model file to write")
+    parser.add_argument('--cell-size', type=float, default=20.0, help="grid cell size in meters")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    paths = find_tracks(args.tracks)
+    if not paths:
+        parser.error(f"no .csv, .gpx or .trk tracks under {args.tracks}")
+    course = load_course(args.course)
+    model = rebuild(paths, course.projection, args.cell_size, args.workers)
+    model.save(args.out)
+    print(f"Built speed model from {len(paths)} tracks: {len(model)} cells "
+          f"({os.path.getsize(args.out)} bytes) -> {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
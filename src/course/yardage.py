@@ -0,0 +1,115 @@
+"""
+Yardage Engine - Batched distances and bearings from the cart to every target on a hole
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .geo import METERS_PER_YARD
+
+# Point features that are yardage targets; tees are where you start, not aim
+TARGET_KINDS = ('green_front', 'green_middle', 'green_back', 'poi')
+
+Target = namedtuple('Target', ['name', 'kind', 'hole'])
+
+Yardages = namedtuple('Yardages', ['targets', 'meters', 'yards', 'bearings'])
+
+
+def hazard_targets(feature, tee):
+    """Front edge and carry point of a hazard polygon as seen from the tee"""
+    points = np.asarray(feature.points)
+    distances = np.hypot(points[:, 0] - tee[0], points[:, 1] - tee[1])
+    return ((f"{feature.name} (front)", points[distances.argmin()]),
+            (f"{feature.name} (carry)", points[distances.argmax()]))
+
+
+class YardageEngine:
+    """Holds every hole's targets pre-projected into the course's local plane
+
+    measure() then costs one vectorized subtraction/hypot/arctan2 over a
+    small array, however many targets the hole has.
+    """
+
+    def __init__(self, course, lazy=False):
+        self.course = course
+        self.holes = {}
+        self.collected = set()
+        self.all_targets = None
+        self.all_points = None
+        # A lazy engine collects each hole's targets the first time it is
+        # measured, so a course pack only loads the holes actually played
+        if not lazy:
+            self.collect_all()
+
+    def collect_all(self):
+        all_targets = []
+        all_points = []
+        for hole in self.course.holes:
+            entry = self.hole_targets(hole)
+            if entry is None:
+                continue
+            all_targets.extend(entry[0])
+            all_points.extend(entry[1])
+        self.all_targets = all_targets
+        self.all_points = np.array(all_points, dtype=np.float64).reshape(-1, 2)
+
+    def hole_targets(self, hole):
+        """(targets, points array) for a hole, or None if it has no targets"""
+        if hole not in self.collected and hole in self.course.holes:
+            self.collected.add(hole)
+            targets, points = self.collect_targets(hole)
+            if targets:
+                self.holes[hole] = (targets, np.array(points, dtype=np.float64))
+        return self.holes.get(hole)
+
+    def collect_targets(self, hole):
+        targets = []
+        points = []
+        tee = None
+        for feature in self.course.features_for_hole(hole):
+            if feature.kind == 'tee' and tee is None:
+                tee = feature.points[0]
+            elif feature.kind in TARGET_KINDS and feature.geometry == 'Point':
+                targets.append(Target(feature.name, feature.kind, hole))
+                points.append(feature.points[0])
+
+        if tee is not None:
+            for feature in self.course.features_for_hole(hole, 'hazard'):
+                if feature.geometry != 'Polygon':
+                    continue
+                for name, point in hazard_targets(feature, tee):
+                    targets.append(Target(name, 'hazard', hole))
+                    points.append(tuple(point))
+        return targets, points
+
+    def measure_local(self, x, y, targets, points):
+        dx = points[:, 0] - x
+        dy = points[:, 1] - y
+        meters = np.hypot(dx, dy)
+        bearings = np.degrees(np.arctan2(dx, dy)) % 360.0
+        return Yardages(targets, meters, meters / METERS_PER_YARD, bearings)
+
+    def measure(self, lat, lon, hole):
+        """Yardages to every target on one hole, or None for an unknown hole"""
+        entry = self.hole_targets(hole)
+        if entry is None:
+            return None
+        targets, points = entry
+        return self.measure_local(*self.course.to_local(lat, lon), targets, points)
+
+    def measure_all(self, lat, lon):
+        """Yardages to every target on the course"""
+        if self.all_targets is None:
+            self.collect_all()
+        return self.measure_local(*self.course.to_local(lat, lon),
+                                  self.all_targets, self.all_points)
+
+    def green_yards(self, lat, lon, hole):
+        """(front, middle, back) yards to the green, None where not mapped"""
+        result = self.measure(lat, lon, hole)
+        yards = {}
+        if result is not None:
+            for target, value in zip(result.targets, result.yards):
+                yards.setdefault(target.kind, float(value))
+        return tuple(yards.get(kind) for kind in ('green_front', 'green_middle', 'green_back'))
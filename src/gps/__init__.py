@@ -0,0 +1 @@
+# GPS Module Initialization
\ No newline at end of file
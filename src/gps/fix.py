@@ -0,0 +1,18 @@
+"""
+GPS Fix - Position/speed sample shared by all GPS sources
+"""
+
+from collections import namedtuple
+
+# received is time.monotonic() when the report arrived; speed is m/s and
+# track is degrees true. mode follows gpsd: 0/1 no fix, 2 = 2D, 3 = 3D.
+# hdop is None when the source does not report it.
+GpsFix = namedtuple('GpsFix', [
+    'received', 'lat', 'lon', 'speed', 'track', 'alt', 'mode', 'satellites', 'hdop'
+], defaults=(None,))
+
+MPS_TO_MPH = 2.23694
+
+
+def has_position(fix):
+    return fix is not None and fix.mode >= 2 and fix.lat is not None and fix.lon is not None
@@ -0,0 +1,172 @@
+"""
+gpsd Client - Streams TPV/SKY reports from gpsd in a background thread
+"""
+
+import json
+import time
+import socket
+import threading
+import logging
+
+from .fix import GpsFix
+
+logger = logging.getLogger(__name__)
+
+GPSD_HOST = "127.0.0.1"
+GPSD_PORT = 2947
+WATCH_COMMAND = b'?WATCH={"enable":true,"json":true};\n'
+
+
+def number(value):
+    """float of a report field, None if absent; raises on non-numeric values"""
+    return None if value is None else float(value)
+
+
+def parse_tpv(report, satellites=0, received=None, hdop=None):
+    """GpsFix from a gpsd TPV report"""
+    return GpsFix(
+        received=time.monotonic() if received is None else received,
+        lat=number(report.get('lat')),
+        lon=number(report.get('lon')),
+        speed=number(report.get('speed')),
+        track=number(report.get('track')),
+        alt=number(report.get('altMSL', report.get('alt'))),
+        mode=int(report.get('mode', 0)),
+        satellites=satellites,
+        hdop=hdop,
+    )
+
+
+def count_used_satellites(report):
+    """Satellites used in the solution from a gpsd SKY report"""
+    if 'uSat' in report:
+        return report['uSat']
+    return sum(1 for sat in report.get('satellites', ()) if sat.get('used'))
+
+
+class GpsdClient:
+    """Keeps a live ?WATCH stream open to gpsd and publishes the latest fix
+
+    The reader thread replaces self.fix with a new immutable GpsFix for
+    every TPV report. Reading it from the GUI thread needs no lock: the
+    attribute swap is atomic, so callers always see a complete fix.
+    """
+
+    def __init__(self, host=GPSD_HOST, port=GPSD_PORT, reconnect_initial=1.0,
+                 reconnect_max=30.0, timeout=2.0):
+        self.host = host
+        self.port = port
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.timeout = timeout
+
+        self.fix = None
+        self.smoother = None
+        self.recorder = None
+        self.satellites = 0
+        self.hdop = None
+        self.connected = False
+        self.reports = 0
+        self.reconnects = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.sock = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="gpsd-client", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.thread:
+            self.thread.join(self.timeout + 1)
+            self.thread = None
+
+    def latest(self):
+        """Most recent GpsFix, or None before the first report"""
+        return self.fix
+
+    def fix_age(self):
+        """Seconds since the last TPV report, or None if there has been none"""
+        fix = self.fix
+        if fix is None:
+            return None
+        return time.monotonic() - fix.received
+
+    def run(self):
+        delay = self.reconnect_initial
+        while not self.stop_event.is_set():
+            try:
+                self.stream()
+                delay = self.reconnect_initial
+            except OSError as e:
+                logger.debug(f"gpsd connection to {self.host}:{self.port} failed: {e}")
+            except Exception:
+                # Reconnect rather than lose GPS for the rest of the session
+                logger.exception(f"Error reading gpsd at {self.host}:{self.port}")
+            finally:
+                self.connected = False
+                self.close_socket()
+
+            if self.stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+            self.reconnects += 1
+
+    def stream(self):
+        """Read reports until gpsd closes the connection or stop() is called"""
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.sendall(WATCH_COMMAND)
+        self.connected = True
+        logger.info(f"Connected to gpsd at {self.host}:{self.port}")
+
+        buffer = b""
+        while not self.stop_event.is_set():
+            try:
+                chunk = self.sock.recv(4096)
+            except socket.timeout:
+                continue
+            if not chunk:
+                logger.warning("gpsd closed the connection")
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                try:
+                    self.handle_line(line)
+                except Exception:
+                    logger.exception(f"Error handling gpsd report {line[:80]!r}")
+
+    def handle_line(self, line):
+        try:
+            report = json.loads(line)
+        except ValueError:
+            logger.debug(f"Ignoring malformed gpsd line: {line[:80]!r}")
+            return
+
+        cls = report.get('class')
+        if cls == 'TPV':
+            fix = parse_tpv(report, self.satellites, hdop=self.hdop)
+            self.fix = self.smoother.update(fix) if self.smoother else fix
+            if self.recorder is not None:
+                self.recorder.record(self.fix)
+            self.reports += 1
+        elif cls == 'SKY':
+            self.satellites = count_used_satellites(report)
+            self.hdop = report.get('hdop', self.hdop)
+
+    def close_socket(self):
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            sock.close()
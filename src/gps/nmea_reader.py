@@ -0,0 +1,279 @@
+"""
+NMEA Reader - Reads GGA/RMC/VTG sentences straight from a serial GPS receiver
+"""
+
+import re
+import time
+import threading
+import logging
+
+from .fix import GpsFix
+
+logger = logging.getLogger(__name__)
+
+KNOTS_TO_MPS = 0.514444
+KMH_TO_MPS = 1 / 3.6
+
+# Longest legal NMEA sentence is 82 bytes; anything without a line end
+# after this many bytes is line noise
+MAX_PENDING = 4096
+
+# Field layouts matched directly against the receive buffer; the talker ID
+# (GP, GN, GL, ...) is skipped
+GGA = re.compile(rb"\$..GGA,([^,]*),([^,]*),([NS]?),([^,]*),([EW]?),(\d?),(\d*),([^,]*),([^,]*),")
+RMC = re.compile(rb"\$..RMC,([^,]*),([AV]?),([^,]*),([NS]?),([^,]*),([EW]?),([^,]*),([^,]*),")
+VTG = re.compile(rb"\$..VTG,([^,]*),T?,[^,]*,M?,[^,]*,N?,([^,]*),K?")
+
+
+def nmea_checksum(buf, start, end):
+    """XOR of buf[start:end], computed by folding one big integer in halves
+
+    The width is rounded up to a power of two (the extra high bytes are
+    zero), so each fold pairs byte p with byte p + half and bytes above the
+    live width never need masking off.
+    """
+    if end <= start:
+        return 0
+    value = int.from_bytes(buf[start:end], 'little')
+    half = 1 << (end - start - 1).bit_length() >> 1
+    while half:
+        value ^= value >> (8 * half)
+        half >>= 1
+    return value & 0xFF
+
+
+def parse_coordinate(field, hemisphere):
+    """Degrees from an NMEA ddmm.mmmm / dddmm.mmmm field"""
+    raw = float(field)
+    degrees = int(raw / 100)
+    value = degrees + (raw - degrees * 100) / 60
+    return -value if hemisphere in (b"S", b"W") else value
+
+
+class NmeaParser:
+    """Incremental NMEA parser working on a single reusable bytearray
+
+    Sentences are located by offset and their fields matched in place with
+    precompiled patterns, without decoding lines to str or splitting them
+    into per-sentence field lists.
+
+    A receiver reports each epoch in several sentences (GGA, RMC, VTG) that
+    carry the same UTC time. They are merged into one fix, published when
+    the next epoch starts or, for the last one, by flush() once the burst
+    is over.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+        self.lat = None
+        self.lon = None
+        self.speed = None
+        self.track = None
+        self.alt = None
+        self.mode = 0
+        self.satellites = 0
+        self.hdop = None
+        self.fix = None
+        self.epoch = None
+        self.pending = False
+
+        self.sentences = 0
+        self.checksum_errors = 0
+
+    def feed(self, data):
+        """Append received bytes and parse every complete sentence
+
+        Returns the number of new position fixes.
+        """
+        buf = self.buffer
+        buf += data
+        fixes = 0
+        pos = 0
+        while True:
+            start = buf.find(b"$", pos)
+            if start < 0:
+                pos = len(buf)
+                break
+            end = buf.find(b"\n", start)
+            if end < 0:
+                pos = start
+                break
+            if self.parse_sentence(buf, start, end):
+                fixes += 1
+            pos = end + 1
+
+        if pos:
+            del buf[:pos]
+        if len(buf) > MAX_PENDING:
+            buf.clear()
+        return fixes
+
+    def flush(self):
+        """Publish the epoch received so far (the receiver went quiet); True if it had a position"""
+        return self.pending and self.publish()
+
+    def parse_sentence(self, buf, start, end):
+        """Validate and parse the sentence in buf[start:end]; True if a fix was published"""
+        star = buf.rfind(b"*", start, end)
+        try:
+            expected = int(buf[star + 1:star + 3], 16) if star > start else -1
+        except ValueError:
+            expected = -1
+        if expected != nmea_checksum(buf, start + 1, star):
+            self.checksum_errors += 1
+            return False
+        self.sentences += 1
+
+        if buf.startswith(b"GGA", start + 3):
+            match = GGA.match(buf, start, star)
+            return match is not None and self.parse_gga(match)
+        if buf.startswith(b"RMC", start + 3):
+            match = RMC.match(buf, start, star)
+            return match is not None and self.parse_rmc(match)
+        if buf.startswith(b"VTG", start + 3):
+            match = VTG.match(buf, start, star)
+            if match is not None:
+                self.parse_vtg(match)
+        return False
+
+    def publish(self):
+        self.fix = GpsFix(time.monotonic(), self.lat, self.lon, self.speed,
+                          self.track, self.alt, self.mode, self.satellites, self.hdop)
+        self.pending = False
+        return True
+
+    def begin_epoch(self, utc):
+        """Publish the previous epoch if this sentence starts a new one"""
+        published = self.pending and utc != self.epoch and self.publish()
+        self.epoch = utc
+        return published
+
+    def parse_gga(self, match):
+        utc, lat, ns, lon, ew, quality, satellites, hdop, alt = match.groups()
+        published = self.begin_epoch(utc)
+        if satellites:
+            self.satellites = int(satellites)
+        if hdop:
+            self.hdop = float(hdop)
+        if quality in (b"", b"0") or not lat or not lon:
+            self.mode = 1
+            return published
+        self.lat = parse_coordinate(lat, ns)
+        self.lon = parse_coordinate(lon, ew)
+        if alt:
+            self.alt = float(alt)
+            self.mode = 3
+        else:
+            self.mode = max(self.mode, 2)
+        self.pending = True
+        return published
+
+    def parse_rmc(self, match):
+        utc, status, lat, ns, lon, ew, speed, track = match.groups()
+        published = self.begin_epoch(utc)
+        if status != b"A" or not lat or not lon:
+            self.mode = 1
+            return published
+        self.lat = parse_coordinate(lat, ns)
+        self.lon = parse_coordinate(lon, ew)
+        if speed:
+            self.speed = float(speed) * KNOTS_TO_MPS
+        if track:
+            self.track = float(track)
+        self.mode = max(self.mode, 2)
+        self.pending = True
+        return published
+
+    def parse_vtg(self, match):
+        track, speed = match.groups()
+        if track:
+            self.track = float(track)
+        if speed:
+            self.speed = float(speed) * KMH_TO_MPS
+
+
+class NmeaSerialSource:
+    """Reads an NMEA receiver on a serial port in a background thread
+
+    Same interface as GpsdClient: start(), stop(), latest(), fix_age().
+    """
+
+    def __init__(self, port="/dev/ttyACM0", baudrate=9600, reconnect_initial=1.0,
+                 reconnect_max=30.0, read_timeout=0.2):
+        self.port = port
+        self.baudrate = baudrate
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.read_timeout = read_timeout
+
+        self.parser = NmeaParser()
+        self.fix = None
+        self.smoother = None
+        self.recorder = None
+        self.connected = False
+        self.reconnects = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="nmea-reader", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(self.read_timeout + 1)
+            self.thread = None
+
+    def latest(self):
+        """Most recent GpsFix, or None before the first fix"""
+        return self.fix
+
+    def fix_age(self):
+        """Seconds since the last position fix, or None if there has been none"""
+        fix = self.fix
+        if fix is None:
+            return None
+        return time.monotonic() - fix.received
+
+    def run(self):
+        delay = self.reconnect_initial
+        while not self.stop_event.is_set():
+            try:
+                self.stream()
+                delay = self.reconnect_initial
+            except (OSError, ValueError) as e:
+                logger.debug(f"GPS serial port {self.port} unavailable: {e}")
+            finally:
+                self.connected = False
+
+            if self.stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+            self.reconnects += 1
+
+    def stream(self):
+        import serial
+
+        chunk = bytearray(1024)
+        view = memoryview(chunk)
+        parser = self.parser
+        with serial.Serial(self.port, self.baudrate, timeout=self.read_timeout) as port:
+            self.connected = True
+            logger.info(f"Reading NMEA from {self.port} at {self.baudrate} baud")
+            while not self.stop_event.is_set():
+                # Block for the first byte, then take whatever else is queued;
+                # a read timing out means the epoch's burst is over
+                count = port.readinto(view[:max(1, min(port.in_waiting, len(chunk)))])
+                fixes = parser.feed(view[:count]) if count else parser.flush()
+                if fixes:
+                    fix = parser.fix
+                    self.fix = self.smoother.update(fix) if self.smoother else fix
+                    if self.recorder is not None:
+                        self.recorder.record(self.fix)
@@ -0,0 +1,384 @@
+"""
+GPS Replay - Plays NMEA logs, GPX tracks and recorded .trk files as a GPS source
+
+Serve a recording as a fake gpsd on localhost at 100x, from src:
+
+    python3 -m gps.replay ../data/tracks/round.gpx --speed 100 --port 2947
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import socket
+import argparse
+import threading
+import logging
+from datetime import datetime, timezone
+import xml.etree.ElementTree as ET
+
+from .fix import GpsFix
+from .nmea_reader import NmeaParser
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+EARTH_RADIUS_M = 6371000.0
+
+
+def parse_iso_time(text):
+    return datetime.fromisoformat(text.strip().replace('Z', '+00:00')).timestamp()
+
+
+def nmea_time(line):
+    """Seconds of the UTC day from a GGA/RMC sentence, or None"""
+    if line[3:6] not in (b"GGA", b"RMC"):
+        return None
+    field = line.split(b",", 2)[1]
+    if len(field) < 6:
+        return None
+    try:
+        return int(field[0:2]) * 3600 + int(field[2:4]) * 60 + float(field[4:])
+    except ValueError:
+        return None
+
+
+def read_nmea(path):
+    """GpsFixes from an NMEA log; received is the sentence's UTC time of day"""
+    parser = NmeaParser()
+    fixes = []
+    when = None
+    day = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            start = line.find(b"$")
+            if start < 0:
+                continue
+            line = line[start:]
+            stamp = nmea_time(line)
+            # A fix is published once the next epoch starts, so it belongs
+            # to the time before this sentence's
+            previous = when
+            if stamp is not None:
+                # Logs crossing midnight UTC carry on into the next day
+                if when is not None and stamp + day < when - SECONDS_PER_DAY / 2:
+                    day += SECONDS_PER_DAY
+                when = stamp + day
+            if parser.feed(line if line.endswith(b"\n") else line + b"\n") and previous is not None:
+                fixes.append(parser.fix._replace(received=previous))
+    if parser.flush() and when is not None:
+        fixes.append(parser.fix._replace(received=when))
+    return fixes
+
+
+def read_gpx(path):
+    """GpsFixes from GPX track points; speed/hdop/ele where present"""
+    fixes = []
+    for _, element in ET.iterparse(path):
+        if element.tag.rsplit('}', 1)[-1] != 'trkpt':
+            continue
+        values = {}
+        for child in element.iter():
+            tag = child.tag.rsplit('}', 1)[-1]
+            if tag in ('time', 'speed', 'hdop', 'ele', 'sat', 'course') and child.text:
+                values[tag] = child.text
+        if 'time' in values:
+            fixes.append(GpsFix(
+                parse_iso_time(values['time']),
+                float(element.get('lat')), float(element.get('lon')),
+                float(values['speed']) if 'speed' in values else None,
+                float(values['course']) if 'course' in values else None,
+                float(values['ele']) if 'ele' in values else None,
+                3 if 'ele' in values else 2,
+                int(values.get('sat', 0)),
+                float(values['hdop']) if 'hdop' in values else None,
+            ))
+        element.clear()
+    return fixes
+
+
+def read_trk(path):
+    """GpsFixes from a track ring file written by gps.track_recorder"""
+    from .track_recorder import TrackRecorder, decode
+
+    recorder = TrackRecorder(path, readonly=True)
+    try:
+        records = recorder.read_raw()
+        track = decode(records)
+    finally:
+        recorder.close()
+    fixes = []
+    for i, (when, lat, lon, speed, heading, hdop) in enumerate(zip(*(c.tolist() for c in track))):
+        # Unknown speeds are derived from the positions by fill_motion()
+        fixes.append(GpsFix(when, lat, lon, None if math.isnan(speed) else speed,
+                            None if math.isnan(heading) else heading, None,
+                            int(records['mode'][i]), int(records['satellites'][i]),
+                            None if math.isnan(hdop) else hdop))
+    return fixes
+
+
+READERS = {'.nmea': read_nmea, '.log': read_nmea, '.txt': read_nmea,
+           '.gpx': read_gpx, '.trk': read_trk}
+
+
+def fill_motion(fixes):
+    """Derive missing speed and track from consecutive positions"""
+    filled = []
+    for i, fix in enumerate(fixes):
+        if (fix.speed is None or fix.track is None) and i > 0:
+            before = fixes[i - 1]
+            elapsed = fix.received - before.received
+            north = math.radians(fix.lat - before.lat) * EARTH_RADIUS_M
+            east = math.radians(fix.lon - before.lon) * EARTH_RADIUS_M * \
+                math.cos(math.radians(fix.lat))
+            if fix.speed is None and elapsed > 0:
+                fix = fix._replace(speed=math.hypot(east, north) / elapsed)
+            if fix.track is None and (east or north):
+                fix = fix._replace(track=math.degrees(math.atan2(east, north)) % 360)
+        filled.append(fix)
+    return filled
+
+
+def load_recording(path):
+    """Time-ordered GpsFixes from an NMEA, GPX or .trk file"""
+    reader = READERS.get(os.path.splitext(path)[1].lower(), read_nmea)
+    try:
+        fixes = [fix for fix in reader(path) if fix.lat is not None and fix.lon is not None]
+    except ET.ParseError as e:
+        raise ValueError(f"{path}: {e}") from e
+    if not fixes:
+        raise ValueError(f"No position fixes in {path}")
+    return fill_motion(fixes)
+
+
+class ReplayClock:
+    """Schedules recorded fixes on the wall clock, speed times faster
+
+    A speed of 0 replays as fast as the consumer takes them.
+    """
+
+    def __init__(self, fixes, speed=1.0, loop=True):
+        self.fixes = fixes
+        self.speed = speed
+        self.loop = loop
+        self.laps = 0
+
+    def play(self, stop_event):
+        """Yield each fix when it is due; returns when done or stopped"""
+        while not stop_event.is_set():
+            origin = self.fixes[0].received
+            started = time.monotonic()
+            for fix in self.fixes:
+                if self.speed > 0:
+                    delay = started + (fix.received - origin) / self.speed - time.monotonic()
+                    if delay > 0 and stop_event.wait(delay):
+                        return
+                elif stop_event.is_set():
+                    return
+                yield fix
+            self.laps += 1
+            # Leave a sample's gap between laps (and never spin on one fix)
+            if not self.loop or (self.speed > 0 and stop_event.wait(1.0 / self.speed)):
+                return
+
+
+class ReplaySource:
+    """GPS source that replays a recording in-process
+
+    Same interface as GpsdClient: start(), stop(), latest(), fix_age();
+    published fixes are restamped with time.monotonic().
+    """
+
+    def __init__(self, path, speed=1.0, loop=True):
+        self.path = path
+        self.clock = ReplayClock(load_recording(path), speed, loop)
+
+        self.fix = None
+        self.smoother = None
+        self.recorder = None
+        self.connected = False
+        self.published = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="gps-replay", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(1.0)
+            self.thread = None
+
+    def latest(self):
+        """Most recent GpsFix, or None before the first fix"""
+        return self.fix
+
+    def fix_age(self):
+        """Seconds since the last replayed fix, or None if there has been none"""
+        fix = self.fix
+        if fix is None:
+            return None
+        return time.monotonic() - fix.received
+
+    def run(self):
+        self.connected = True
+        logger.info(f"Replaying {len(self.clock.fixes)} fixes from {self.path} "
+                    f"at {self.clock.speed or 'max'}x")
+        for fix in self.clock.play(self.stop_event):
+            fix = fix._replace(received=time.monotonic())
+            self.fix = self.smoother.update(fix) if self.smoother else fix
+            if self.recorder is not None:
+                self.recorder.record(self.fix)
+            self.published += 1
+        self.connected = False
+
+
+def tpv_report(fix, when):
+    report = {'class': 'TPV', 'device': 'replay', 'mode': fix.mode,
+              'time': datetime.fromtimestamp(when, timezone.utc).isoformat().replace('+00:00', 'Z'),
+              'lat': fix.lat, 'lon': fix.lon}
+    for key, value in (('altMSL', fix.alt), ('speed', fix.speed), ('track', fix.track)):
+        if value is not None:
+            report[key] = value
+    return report
+
+
+def sky_report(fix):
+    report = {'class': 'SKY', 'device': 'replay', 'uSat': fix.satellites}
+    if fix.hdop is not None:
+        report['hdop'] = fix.hdop
+    return report
+
+
+class FakeGpsdServer:
+    """Speaks enough of the gpsd protocol to stream a recording to ?WATCH clients
+
+    Every watching client gets a SKY and a TPV report per replayed fix, so
+    GpsdClient (and gpspipe, cgps, ...) can be driven end-to-end without a
+    receiver. A client that stops reading for send_timeout seconds is
+    dropped, so it cannot hold up the others.
+    """
+
+    def __init__(self, fixes, host='127.0.0.1', port=0, speed=1.0, loop=True, send_timeout=1.0):
+        self.clock = ReplayClock(fixes, speed, loop)
+        self.send_timeout = send_timeout
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((host, port))
+        self.server.listen(4)
+        # Wake up now and then to notice stop()
+        self.server.settimeout(0.5)
+        self.host, self.port = self.server.getsockname()[:2]
+
+        self.clients = []
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for target, name in ((self.accept_loop, "fake-gpsd-accept"),
+                             (self.replay_loop, "fake-gpsd-replay")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Fake gpsd listening on {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.server.close()
+        with self.lock:
+            for client in self.clients:
+                client.close()
+            self.clients = []
+        for thread in self.threads:
+            thread.join(1.0)
+
+    def accept_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                client, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self.serve_client, args=(client,),
+                             name="fake-gpsd-client", daemon=True).start()
+
+    def serve_client(self, client):
+        """Answer ?WATCH, then leave the socket to the replay thread"""
+        try:
+            client.sendall(json.dumps({'class': 'VERSION', 'release': '3.22', 'rev': 'replay',
+                                       'proto_major': 3, 'proto_minor': 14}).encode() + b"\n")
+            client.settimeout(5.0)
+            command = client.recv(1024)
+            if not command.startswith(b"?WATCH"):
+                client.close()
+                return
+            client.settimeout(self.send_timeout)
+            client.sendall(b'{"class":"DEVICES","devices":[{"class":"DEVICE","path":"replay"}]}\n'
+                           b'{"class":"WATCH","enable":true,"json":true}\n')
+        except OSError:
+            client.close()
+            return
+        with self.lock:
+            self.clients.append(client)
+
+    def replay_loop(self):
+        for fix in self.clock.play(self.stop_event):
+            when = time.time()
+            data = (json.dumps(sky_report(fix)) + "\n" +
+                    json.dumps(tpv_report(fix, when)) + "\n").encode()
+            with self.lock:
+                clients = list(self.clients)
+            for client in clients:
+                try:
+                    client.sendall(data)
+                except OSError as e:
+                    logger.warning(f"Dropping fake gpsd client: {e or 'not reading'}")
+                    with self.lock:
+                        if client in self.clients:
+                            self.clients.remove(client)
+                    client.close()
+            self.sent += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a GPS recording as a fake gpsd")
+    parser.add_argument('recording', help="NMEA log, .gpx or .trk file")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="replay speed factor (0 = as fast as possible)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2947)
+    parser.add_argument('--once', action='store_true', help="stop at the end instead of looping")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    fixes = load_recording(args.recording)
+    server = FakeGpsdServer(fixes, args.host, args.port, args.speed, not args.once).start()
+    span = fixes[-1].received - fixes[0].received
+    print(f"Serving {len(fixes)} fixes ({span / 60:.1f} min recorded) on "
+          f"{server.host}:{server.port} at {args.speed or 'max'}x; Ctrl+C to stop")
+    try:
+        while server.threads[1].is_alive():
+            server.threads[1].join(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    print(f"Sent {server.sent} fixes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
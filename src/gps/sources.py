@@ -0,0 +1,46 @@
+"""
+GPS Sources - Builds the configured GPS source from settings
+"""
+
+import os
+import logging
+
+from .gpsd_client import GpsdClient
+from .nmea_reader import NmeaSerialSource
+from .replay import ReplaySource
+from .smoothing import GpsSmoother
+
+logger = logging.getLogger(__name__)
+
+
+def create_gps_source(gps_settings, root=None):
+    """GPS source selected by gps.source ("gpsd", "serial" or "replay"); not started
+
+    Relative replay paths are taken from root.
+    """
+    source = gps_settings.get('source', 'gpsd')
+    if source == 'replay':
+        path = gps_settings.get('replay_path', 'data/tracks/replay.gpx')
+        if root and not os.path.isabs(path):
+            path = os.path.join(root, path)
+        gps_source = ReplaySource(path, gps_settings.get('replay_speed', 1.0))
+    elif source == 'serial':
+        gps_source = NmeaSerialSource(
+            gps_settings.get('serial_port', '/dev/ttyACM0'),
+            gps_settings.get('baudrate', 9600)
+        )
+    else:
+        if source != 'gpsd':
+            logger.warning(f"Unknown GPS source '{source}', using gpsd")
+        gps_source = GpsdClient(
+            gps_settings.get('gpsd_host', '127.0.0.1'),
+            gps_settings.get('gpsd_port', 2947)
+        )
+
+    # Filter every fix on the reader thread, not just the ones the UI samples
+    if gps_settings.get('smoothing', True):
+        gps_source.smoother = GpsSmoother(
+            gps_settings.get('position_noise_m', 5.0),
+            gps_settings.get('speed_noise_mps', 1.5)
+        )
+    return gps_source
@@ -0,0 +1,271 @@
+"""
+Track Recorder - Fixed-size memory-mapped ring file of GPS fixes
+
+Export a time range, from src:
+
+    python3 -m gps.track_recorder ../data/tracks/cart.trk --format gpx \\
+        --start 2024-05-04T08:00 --end 2024-05-04T12:30 --out round.gpx
+"""
+
+import os
+import sys
+import mmap
+import json
+import time
+import struct
+import argparse
+import threading
+import logging
+from collections import namedtuple
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GTRK"
+VERSION = 1
+# magic, version, record size, capacity (records), records ever written
+HEADER = struct.Struct("<4sHHIQ")
+HEADER_SIZE = 64
+
+# time (s since epoch), lat/lon (1e-7 degrees), speed (cm/s), heading and
+# hdop (1/100), gpsd mode, satellites used
+RECORD = struct.Struct("<diiHHHBB")
+RECORD_DTYPE = np.dtype([
+    ('time', '<f8'), ('lat', '<i4'), ('lon', '<i4'), ('speed', '<u2'),
+    ('heading', '<u2'), ('hdop', '<u2'), ('mode', 'u1'), ('satellites', 'u1'),
+])
+COORD_SCALE = 1e7
+UNKNOWN = 0xFFFF
+
+# Decoded records; unknown speed/heading/hdop are NaN
+Track = namedtuple('Track', ['time', 'lat', 'lon', 'speed', 'heading', 'hdop'])
+
+
+def scaled(value, scale, limit=UNKNOWN - 1):
+    return UNKNOWN if value is None else min(limit, max(0, int(round(value * scale))))
+
+
+def decode(records):
+    """Track of float arrays from raw RECORD_DTYPE records"""
+    def optional(column):
+        values = records[column].astype(np.float64) / 100.0
+        values[records[column] == UNKNOWN] = np.nan
+        return values
+
+    return Track(
+        records['time'].astype(np.float64),
+        records['lat'] / COORD_SCALE,
+        records['lon'] / COORD_SCALE,
+        optional('speed'),
+        optional('heading'),
+        optional('hdop'),
+    )
+
+
+class TrackRecorder:
+    """Appends fixes to a ring file of fixed-width records
+
+    The file is preallocated once and mapped; records are written in order
+    round the ring, so the card sees one small, bounded file that is
+    rewritten sequentially and the oldest rounds are overwritten first.
+    Dirty pages are flushed every flush_interval seconds instead of per fix.
+    """
+
+    def __init__(self, path, capacity=500000, min_interval=1.0, flush_interval=30.0,
+                 readonly=False):
+        self.path = path
+        self.min_interval = min_interval
+        self.flush_interval = flush_interval
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self.last_time = None
+        self.last_flush = time.monotonic()
+
+        if readonly:
+            self.file = open(path, 'rb')
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+
+        size = os.fstat(self.file.fileno()).st_size
+        if size >= HEADER_SIZE:
+            magic, version, record_size, stored_capacity, written = \
+                HEADER.unpack(self.file.read(HEADER.size))
+            valid = (magic == MAGIC and version == VERSION and record_size == RECORD.size
+                     and size >= HEADER_SIZE + stored_capacity * RECORD.size)
+            if not valid:
+                self.file.close()
+                raise ValueError(f"{path} is not a track file")
+            if stored_capacity != capacity and not readonly:
+                logger.info(f"Keeping {path} capacity of {stored_capacity} records")
+            capacity = stored_capacity
+        elif readonly:
+            self.file.close()
+            raise ValueError(f"{path} is not a track file")
+        else:
+            written = 0
+            self.file.truncate(HEADER_SIZE + capacity * RECORD.size)
+
+        self.capacity = capacity
+        self.written = written
+        self.map = mmap.mmap(self.file.fileno(), HEADER_SIZE + capacity * RECORD.size,
+                             access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        if not readonly:
+            self.write_header()
+        self.records = np.frombuffer(self.map, RECORD_DTYPE, capacity, HEADER_SIZE)
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def write_header(self):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, self.capacity, self.written)
+
+    def record(self, fix, when=None):
+        """Append a fix with a position; thinned to one per min_interval seconds"""
+        if fix is None or fix.mode < 2 or fix.lat is None or fix.lon is None:
+            return False
+        when = time.time() if when is None else when
+        if self.last_time is not None and 0 <= when - self.last_time < self.min_interval:
+            return False
+        self.last_time = when
+
+        with self.lock:
+            offset = HEADER_SIZE + (self.written % self.capacity) * RECORD.size
+            RECORD.pack_into(
+                self.map, offset, when,
+                int(round(fix.lat * COORD_SCALE)), int(round(fix.lon * COORD_SCALE)),
+                scaled(fix.speed, 100),
+                scaled(None if fix.track is None else fix.track % 360, 100),
+                scaled(fix.hdop, 100), min(fix.mode, 255), min(fix.satellites or 0, 255)
+            )
+            # Count the record only once it is complete
+            self.written += 1
+            self.write_header()
+
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def flush(self):
+        if not self.readonly:
+            self.map.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.map.closed:
+            return
+        self.flush()
+        self.records = None
+        self.map.close()
+        self.file.close()
+
+    def segments(self):
+        """Oldest-first views of the ring: the older part, then the newer part"""
+        head = self.written % self.capacity
+        if self.written <= self.capacity:
+            return [self.records[:self.written]]
+        return [self.records[head:], self.records[:head]]
+
+    def read_raw(self, start=None, end=None):
+        """Copy of the raw records with start <= time < end, oldest first
+
+        Filtered with a mask rather than a binary search: a Pi without an
+        RTC can record with a wrong clock until NTP or the GPS sets it.
+        """
+        with self.lock:
+            parts = []
+            for segment in self.segments():
+                times = segment['time']
+                if start is None and end is None:
+                    parts.append(segment.copy())
+                    continue
+                keep = np.ones(len(segment), bool) if start is None else times >= start
+                if end is not None:
+                    keep &= times < end
+                parts.append(segment[keep])
+        return np.concatenate(parts)
+
+    def read_range(self, start=None, end=None):
+        """Track (NumPy arrays) for fixes recorded in [start, end) epoch seconds"""
+        return decode(self.read_raw(start, end))
+
+
+def iso_time(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def export_gpx(track, out, name="Golf cart track"):
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<gpx version="1.1" creator="golf-cart-carplay" '
+              'xmlns="http://www.topografix.com/GPX/1/1">\n'
+              f'  <trk><name>{escape(name)}</name><trkseg>\n')
+    for when, lat, lon, speed, heading, hdop in zip(*track):
+        # GPX 1.1 has no speed element; it goes in the extensions
+        hdop = f"<hdop>{hdop:.2f}</hdop>" if not np.isnan(hdop) else ""
+        speed = (f"<extensions><speed>{speed:.2f}</speed></extensions>"
+                 if not np.isnan(speed) else "")
+        out.write(f'    <trkpt lat="{lat:.7f}" lon="{lon:.7f}"><time>{iso_time(when)}</time>'
+                  f'{hdop}{speed}</trkpt>\n')
+    out.write('  </trkseg></trk>\n</gpx>\n')
+
+
+def export_geojson(track, out, name="Golf cart track"):
+    feature = {
+        "type": "Feature",
+        "properties": {
+            "name": name,
+            "times": [iso_time(t) for t in track.time],
+            # null where the receiver reported no speed
+            "speeds": [None if np.isnan(v) else round(float(v), 2) for v in track.speed],
+        },
+        "geometry": {
+            "type": "LineString",
+            "coordinates": [[round(float(lon), 7), round(float(lat), 7)]
+                            for lat, lon in zip(track.lat, track.lon)],
+        },
+    }
+    json.dump({"type": "FeatureCollection", "features": [feature]}, out)
+    out.write("\n")
+
+
+EXPORTERS = {'gpx': export_gpx, 'geojson': export_geojson}
+
+
+def parse_when(text):
+    """Epoch seconds from an ISO 8601 time (local time if no zone is given)"""
+    if text is None:
+        return None
+    return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export recorded GPS tracks")
+    parser.add_argument('track', help="track ring file (e.g. data/tracks/cart.trk)")
+    parser.add_argument('--format', choices=sorted(EXPORTERS), default='gpx')
+    parser.add_argument('--start', help="ISO 8601 start time")
+    parser.add_argument('--end', help="ISO 8601 end time")
+    parser.add_argument('--out', help="output file (default stdout)")
+    args = parser.parse_args(argv)
+
+    recorder = TrackRecorder(args.track, readonly=True)
+    try:
+        track = recorder.read_range(parse_when(args.start), parse_when(args.end))
+    finally:
+        recorder.close()
+
+    if args.out:
+        with open(args.out, 'w') as out:
+            EXPORTERS[args.format](track, out)
+        print(f"Exported {len(track.time)} fixes -> {args.out}", file=sys.stderr)
+    else:
+        EXPORTERS[args.format](track, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
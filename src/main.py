@@ -16,6 +16,7 @@ from ui.home_screen_clean import HomeScreen
 from ui.music_player import MusicPlayer
 from ui.gps_navigation import GPSNavigation
 from ui.settings_screen import SettingsScreen
+from ui.render_cache import render_cache
 from carplay.carplay_manager import CarPlayManager
 
 # Configure logging
@@ -25,6 +26,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Window stylesheets by display.theme
+THEMES = {
+    'dark': """
+        QMainWindow {
+            background-color: #1a1f2e;
+        }
+        QWidget {
+            font-family: -apple-system, BlinkMacSystemFont, "SF Pro Display", "Segoe UI", Roboto, sans-serif;
+        }
+    """,
+}
+
 class GolfCartSystem(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -60,15 +73,17 @@ class GolfCartSystem(QMainWindow):
         # Set home screen as default
         self.stacked_widget.setCurrentWidget(self.home_screen)
         
-        # Apply modern dark theme
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1a1f2e;
-            }
-            QWidget {
-                font-family: -apple-system, BlinkMacSystemFont, "SF Pro Display", "Segoe UI", Roboto, sans-serif;
-            }
-        """)
+        # Apply the configured theme (modern dark by default)
+        self.apply_theme()
+        
+    def apply_theme(self):
+        """Apply display.theme, dropping widget renders drawn for the previous one"""
+        theme = self.settings.get('display', {}).get('theme', 'dark')
+        if theme not in THEMES:
+            logger.warning(f"Unknown theme {theme!r}, using dark")
+            theme = 'dark'
+        self.setStyleSheet(THEMES[theme])
+        render_cache.set_theme(theme)
         
     def load_settings(self):
         """Load application settings from config file"""
@@ -96,15 +111,54 @@ class GolfCartSystem(QMainWindow):
             "display": {
                 "brightness": 80,
                 "auto_dim": True,
-                "timeout_seconds": 300
+                "timeout_seconds": 300,
+                "theme": "dark"
             },
             "carplay": {
                 "enabled": True,
-                "auto_launch": True
+                "auto_launch": True,
+                "connect_debounce_ms": 300,
+                "disconnect_debounce_ms": 1500,
+                "poll_timeout": 5,
+                "openauto_standby": True,
+                "openauto_raise_command": ["wmctrl", "-x", "-r", "openauto", "-b",
+                                           "add,fullscreen,above"]
             },
             "gps": {
                 "enabled": True,
-                "update_interval": 1
+                "update_interval": 1,
+                "source": "gpsd",
+                "gpsd_host": "127.0.0.1",
+                "gpsd_port": 2947,
+                "serial_port": "/dev/ttyACM0",
+                "baudrate": 9600,
+                "replay_path": "data/tracks/replay.gpx",
+                "replay_speed": 1.0,
+                "smoothing": True,
+                "position_noise_m": 5.0,
+                "speed_noise_mps": 1.5,
+                "record_track": True,
+                "track_path": "data/tracks/cart.trk",
+                "track_capacity": 500000
+            },
+            "course": {
+                "geojson_path": "config/course.geojson",
+                "cart_speed_mph": 15,
+                "learn_speeds": True,
+                "speed_model_path": "data/speed_model.bin",
+                "green_buffer_m": 8.0,
+                "geofence_dwell_s": 3.0,
+                "packs_dir": "data/courses",
+                "dem_path": "data/elevation/course.tif"
+            },
+            "maps": {
+                "renderer": "web",
+                "mbtiles_path": "data/tiles/course.mbtiles",
+                "tile_server_port": 0,
+                "prefetch": False,
+                "tile_url": "",
+                "prefetch_zooms": [17, 16, 18],
+                "prefetch_kbps": 128
             }
         }
         
@@ -137,6 +191,7 @@ class GolfCartSystem(QMainWindow):
     def on_carplay_disconnected(self):
         """Handle CarPlay device disconnection"""
         logger.info("CarPlay device disconnected")
+        self.carplay_manager.hide_carplay()
         self.show_screen('home')
         
     def show_screen(self, screen_name):
@@ -157,10 +212,29 @@ class GolfCartSystem(QMainWindow):
         self.save_settings()
         if hasattr(self, 'carplay_manager'):
             self.carplay_manager.stop_monitoring()
+        if hasattr(self, 'gps_navigation'):
+            self.gps_navigation.stop_gps()
         event.accept()
 
+def map_renderer_setting():
+    """Read maps.renderer before the QApplication exists"""
+    settings_path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        'config', 'settings.json'
+    )
+    try:
+        with open(settings_path, 'r') as f:
+            return json.load(f).get('maps', {}).get('renderer', 'web')
+    except (OSError, ValueError):
+        return 'web'
+
 def main():
     """Main application entry point"""
+    # QtWebEngine must load before the QApplication is created; skip it
+    # entirely with the native map renderer to save memory and startup time
+    if map_renderer_setting() == 'web':
+        from PyQt5 import QtWebEngineWidgets
+    
     app = QApplication(sys.argv)
     app.setApplicationName("Golf Cart System")
     
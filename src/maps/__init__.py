@@ -0,0 +1 @@
+# Maps Module Initialization
\ No newline at end of file
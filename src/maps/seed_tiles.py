@@ -0,0 +1,111 @@
+"""
+Pre-seed the offline tile store for a course bounding box
+
+Run from the src directory while the cart has connectivity:
+
+    python3 -m maps.seed_tiles --bbox -78.645,35.775,-78.630,35.786 \\
+        --zoom 15-19 --mbtiles ../data/tiles/course.mbtiles \\
+        --url "http://localhost:8080/styles/basic-preview/{z}/{x}/{y}.png"
+
+The tile source must allow bulk downloading; the OpenStreetMap tile
+servers do not.
+"""
+
+import sys
+import time
+import argparse
+import logging
+
+from .tiles import tiles_in_bbox
+from .tile_store import MBTilesStore
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "GolfCartCarPlay/1.0 (offline course tile seeding)"
+
+
+class TileFetcher:
+    """Downloads single tiles from an XYZ tile URL template"""
+
+    def __init__(self, url_template, timeout=10):
+        import requests
+        self.url_template = url_template
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+
+    def fetch(self, z, x, y):
+        """Tile bytes, or None if the server has no tile or is unreachable"""
+        url = self.url_template.format(z=z, x=x, y=y)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Error fetching {url}: {e}")
+            return None
+        if response.status_code != 200:
+            logger.debug(f"{url} returned {response.status_code}")
+            return None
+        return response.content
+
+
+def parse_zoom_range(text):
+    low, _, high = text.partition('-')
+    return range(int(low), int(high or low) + 1)
+
+
+def seed(store, fetcher, bbox, zooms, delay=0.0):
+    """Download every missing tile in bbox (min_lon, min_lat, max_lon, max_lat)"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    fetched = skipped = failed = 0
+    for zoom in zooms:
+        for z, x, y in tiles_in_bbox(min_lat, min_lon, max_lat, max_lon, zoom):
+            if store.has_tile(z, x, y):
+                skipped += 1
+                continue
+            data = fetcher.fetch(z, x, y)
+            if data is None:
+                failed += 1
+                continue
+            store.put_tile(z, x, y, data, commit=False)
+            fetched += 1
+            if fetched % 100 == 0:
+                store.commit()
+                logger.info(f"Seeded {fetched} tiles (zoom {z})")
+            if delay:
+                time.sleep(delay)
+    store.commit()
+    return fetched, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download map tiles for offline use")
+    parser.add_argument('--bbox', required=True,
+                        help="min_lon,min_lat,max_lon,max_lat of the course")
+    parser.add_argument('--zoom', default='15-19', help="zoom level or range, e.g. 15-19")
+    parser.add_argument('--mbtiles', required=True, help="MBTiles file to fill")
+    parser.add_argument('--url', required=True,
+                        help="XYZ tile URL template of a source that allows bulk downloads")
+    parser.add_argument('--delay', type=float, default=0.1,
+                        help="seconds between downloads (respect the tile server's policy)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    bbox = tuple(float(v) for v in args.bbox.split(','))
+    if len(bbox) != 4:
+        parser.error("--bbox needs four comma-separated numbers")
+
+    store = MBTilesStore(args.mbtiles)
+    store.set_metadata('name', 'Golf course tiles')
+    store.set_metadata('format', 'png')
+    store.set_metadata('bounds', args.bbox)
+
+    fetched, skipped, failed = seed(store, TileFetcher(args.url), bbox,
+                                    parse_zoom_range(args.zoom), args.delay)
+    print(f"Fetched {fetched} tiles, {skipped} already cached, {failed} failed "
+          f"({store.tile_count()} tiles in {args.mbtiles})")
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
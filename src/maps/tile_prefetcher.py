@@ -0,0 +1,324 @@
+"""
+Tile Prefetcher - Warms the offline tile store ahead of the cart
+
+The navigation screen plans which tiles the cart is about to need (the
+road ahead along its heading, the rest of the current hole and the next
+hole in sequence) and hands the plan to a background thread that downloads
+the missing ones at low priority within a bandwidth budget.
+"""
+
+import os
+import math
+import time
+import heapq
+import threading
+import logging
+from collections import namedtuple
+
+from .tiles import TILE_SIZE, tile_to_deg, tiles_in_bbox
+
+logger = logging.getLogger(__name__)
+
+PrefetchStats = namedtuple('PrefetchStats', [
+    'queued', 'cached', 'fetched', 'failed', 'bytes', 'hit_rate'])
+
+METERS_PER_DEGREE = 111320.0
+
+# Below this the cart is parked and its heading is noise
+STOPPED_MPS = 1.0
+
+# Speed assumed for travel times while parked (typical cart speed)
+CART_MPS = 5.0
+
+# How far from the cart the map shows when the view size is not known
+VIEW_RADIUS_M = 250.0
+
+# Seconds added per zoom level after the first (the one the map shows)
+ZOOM_PENALTY_S = 10.0
+
+# Largest plan handed to the worker; the rest is too far ahead to matter
+MAX_PLAN = 600
+
+# Wait before trying a tile the server failed on again
+RETRY_SECONDS = 300.0
+
+# Failures in a row (no connectivity out on the course) before backing off,
+# and the longest pause that backoff reaches
+FAILURES_BEFORE_BACKOFF = 3
+MAX_BACKOFF_SECONDS = 60.0
+
+# Niceness of the worker thread (Linux schedules threads individually)
+WORKER_NICENESS = 10
+
+
+def offset(lat, lon, bearing, meters):
+    """Position meters away along a compass bearing (flat-earth, fine for a course)"""
+    rad = math.radians(bearing)
+    return (lat + meters * math.cos(rad) / METERS_PER_DEGREE,
+            lon + meters * math.sin(rad) / (METERS_PER_DEGREE * math.cos(math.radians(lat))))
+
+
+def tile_meters(lat, zoom):
+    """Ground width of one tile at a latitude"""
+    return 40075016.7 * math.cos(math.radians(lat)) / 2 ** zoom
+
+
+def view_radius(lat, zoom, width, height):
+    """Meters from the center to the corner of a map view in pixels"""
+    return math.hypot(width, height) / 2 * tile_meters(lat, zoom) / TILE_SIZE
+
+
+class TravelTime:
+    """Seconds until a position comes into view
+
+    Straight-line distance less the view radius at the current speed,
+    stretched for positions off the cart's heading (twice as long for
+    ones straight behind it).
+    """
+
+    def __init__(self, lat, lon, heading, speed, radius=0.0):
+        self.lat = lat
+        self.lon = lon
+        self.radius = radius
+        self.moving = heading is not None and speed is not None and speed >= STOPPED_MPS
+        self.heading = heading
+        self.speed = speed if self.moving else CART_MPS
+        self.lon_scale = math.cos(math.radians(lat))
+
+    def __call__(self, lat, lon):
+        north = (lat - self.lat) * METERS_PER_DEGREE
+        east = (lon - self.lon) * METERS_PER_DEGREE * self.lon_scale
+        seconds = max(0.0, math.hypot(north, east) - self.radius) / self.speed
+        if self.moving and seconds > 0:
+            turn = math.radians(math.degrees(math.atan2(east, north)) - self.heading)
+            seconds *= 1.5 - 0.5 * math.cos(turn)
+        return seconds
+
+
+def plan_tiles(lat, lon, heading, speed, zooms, areas=(), radius=VIEW_RADIUS_M,
+               horizon_s=60.0):
+    """[(seconds, (z, x, y))] the map is expected to show, soonest first
+
+    zooms are ordered by preference (the map's own zoom first). areas are
+    lists of (lat, lon) outlining where the cart is headed next, such as
+    the features of the current and the next hole; everything within
+    radius (what the map shows around the cart) of them is planned. While
+    moving, the same width along the heading out to horizon_s seconds is
+    added.
+    """
+    travel = TravelTime(lat, lon, heading, speed, radius)
+    pad_lat = radius / METERS_PER_DEGREE
+    pad_lon = pad_lat / travel.lon_scale
+    plan = {}
+
+    def add(tile, seconds):
+        if seconds < plan.get(tile, math.inf):
+            plan[tile] = seconds
+
+    for rank, zoom in enumerate(zooms):
+        penalty = rank * ZOOM_PENALTY_S
+
+        def add_box(min_lat, min_lon, max_lat, max_lon):
+            for tile in tiles_in_bbox(min_lat, min_lon, max_lat, max_lon, zoom):
+                # Timed to the tile's nearest point: it is needed as soon as
+                # its edge scrolls into view
+                north, west = tile_to_deg(tile[1], tile[2], zoom)
+                south, east = tile_to_deg(tile[1] + 1, tile[2] + 1, zoom)
+                add(tile, travel(min(max(lat, south), north), min(max(lon, west), east)) + penalty)
+
+        if travel.moving:
+            reach = travel.speed * horizon_s
+            step = tile_meters(lat, zoom) / 2
+            for i in range(int(reach / step) + 1):
+                ahead = offset(lat, lon, heading, i * step)
+                add_box(ahead[0] - pad_lat, ahead[1] - pad_lon,
+                        ahead[0] + pad_lat, ahead[1] + pad_lon)
+
+        for points in areas:
+            if not points:
+                continue
+            lats = [p[0] for p in points]
+            lons = [p[1] for p in points]
+            add_box(min(lats) - pad_lat, min(lons) - pad_lon,
+                    max(lats) + pad_lat, max(lons) + pad_lon)
+
+        # Whatever the map shows right now comes first
+        add_box(lat - pad_lat, lon - pad_lon, lat + pad_lat, lon + pad_lon)
+
+    return sorted(((seconds, tile) for tile, seconds in plan.items()))[:MAX_PLAN]
+
+
+class ByteBudget:
+    """Token bucket limiting downloads to rate bytes per second
+
+    A download may start while the bucket is not empty and is charged in
+    full afterwards, so one large tile overdraws it and the next waits.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until the next download may start"""
+        self.refill()
+        return 0.0 if self.tokens > 0 else -self.tokens / self.rate
+
+    def charge(self, nbytes):
+        self.refill()
+        self.tokens -= nbytes
+
+
+class TilePrefetcher:
+    """Background thread downloading planned tiles into an MBTilesStore
+
+    request() replaces the plan (an old prediction is worth nothing once
+    the cart turned), so the queue only ever holds what is expected next.
+    Tiles already in the store are skipped; fetched ones are reported by
+    take_fetched() for the map to redraw.
+    """
+
+    def __init__(self, store, fetcher, bytes_per_second=128 * 1024):
+        self.store = store
+        self.fetcher = fetcher
+        self.budget = ByteBudget(bytes_per_second)
+        self.queue = []
+        self.sequence = 0
+        self.present = set()
+        self.failed_at = {}
+        self.fetched_tiles = []
+        self.cached = 0
+        self.fetched = 0
+        self.failed = 0
+        self.bytes = 0
+        self.running = False
+        self.busy = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="tile-prefetcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def request(self, plan):
+        """Queue a plan from plan_tiles() in place of the previous one"""
+        now = time.monotonic()
+        with self.condition:
+            self.queue = []
+            for seconds, tile in plan:
+                if tile in self.present:
+                    continue
+                if now - self.failed_at.get(tile, -math.inf) < RETRY_SECONDS:
+                    continue
+                self.queue.append((seconds, self.sequence, tile))
+                self.sequence += 1
+            heapq.heapify(self.queue)
+            self.condition.notify()
+
+    def set_store(self, store):
+        """Fill another tile file from now on (the cart moved to another course)"""
+        with self.condition:
+            self.store = store
+            self.queue = []
+            self.present.clear()
+
+    def take_fetched(self):
+        """Tiles stored since the last call"""
+        with self.condition:
+            fetched, self.fetched_tiles = self.fetched_tiles, []
+        return fetched
+
+    def stats(self):
+        """Counters, with the hit rate of map reads from the store"""
+        with self.condition:
+            return PrefetchStats(len(self.queue), self.cached, self.fetched, self.failed,
+                                 self.bytes, self.store.hit_rate())
+
+    def idle(self):
+        """True once the plan has been worked through"""
+        with self.condition:
+            return not self.queue and not self.busy
+
+    def pause(self, seconds):
+        """Sleep unless stopped (a new plan does not cut it short); False once stopping"""
+        deadline = time.monotonic() + seconds
+        with self.condition:
+            while self.running and time.monotonic() < deadline:
+                self.condition.wait(deadline - time.monotonic())
+            return self.running
+
+    def run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WORKER_NICENESS)
+        except (AttributeError, OSError):
+            pass
+
+        store = None
+        failures = 0
+        while True:
+            with self.condition:
+                self.busy = False
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                _, _, tile = heapq.heappop(self.queue)
+                self.busy = True
+                # Each thread has its own SQLite connection to the store
+                if store is not self.store:
+                    if store is not None:
+                        store.close()
+                    store = self.store
+
+            if store.has_tile(*tile):
+                with self.condition:
+                    self.present.add(tile)
+                    self.cached += 1
+                continue
+            if not self.pause(self.budget.wait_time()):
+                break
+
+            data = self.fetcher.fetch(*tile)
+            # A tile for the course the cart just left is not kept
+            stored = data is not None and store is self.store
+            if stored:
+                store.put_tile(*tile, data)
+            with self.condition:
+                if data is None:
+                    self.failed_at[tile] = time.monotonic()
+                    self.failed += 1
+                elif stored:
+                    self.present.add(tile)
+                    self.fetched_tiles.append(tile)
+                    self.fetched += 1
+                    self.bytes += len(data)
+            if data is None:
+                failures += 1
+                if failures >= FAILURES_BEFORE_BACKOFF and not self.pause(
+                        min(MAX_BACKOFF_SECONDS, 2.0 ** (failures - FAILURES_BEFORE_BACKOFF))):
+                    break
+            else:
+                failures = 0
+                self.budget.charge(len(data))
+
+        with self.condition:
+            self.busy = False
+        if store is not None:
+            store.close()
@@ -0,0 +1,115 @@
+"""
+Tile Server - Serves stored tiles and the offline map page on localhost
+"""
+
+import os
+import re
+import threading
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'assets')
+
+TILE_PATH = re.compile(r"^/tiles/(\d+)/(\d+)/(\d+)\.(png|jpg|jpeg|webp)$")
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp',
+}
+
+
+class TileRequestHandler(BaseHTTPRequestHandler):
+    """Routes /tiles/{z}/{x}/{y}.png to the tile store, everything else to assets"""
+
+    server_version = "GolfCartTiles/1.0"
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        match = TILE_PATH.match(path)
+        if match:
+            z, x, y = (int(v) for v in match.groups()[:3])
+            data = self.server.store.get_tile(z, x, y)
+            if data is None:
+                self.send_error(404, "Tile not cached")
+                return
+            self.send_body(data, CONTENT_TYPES[match.group(4)], cache=True)
+            return
+
+        if path in ('/', '/index.html'):
+            path = '/offline_map.html'
+        name = os.path.basename(path)
+        extra = self.server.extra_assets.get(name)
+        if extra is not None:
+            self.send_body(extra, CONTENT_TYPES.get(os.path.splitext(name)[1],
+                                                    'application/octet-stream'))
+            return
+        asset = os.path.join(ASSETS_DIR, name)
+        if not name or not os.path.isfile(asset):
+            self.send_error(404)
+            return
+        with open(asset, 'rb') as f:
+            self.send_body(f.read(), CONTENT_TYPES.get(os.path.splitext(name)[1],
+                                                       'application/octet-stream'))
+
+    def send_body(self, data, content_type, cache=False):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        if cache:
+            self.send_header('Cache-Control', 'max-age=86400')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class TileServer:
+    """Background HTTP server bound to 127.0.0.1"""
+
+    def __init__(self, store, port=0):
+        self.store = store
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), TileRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = store
+        self.httpd.extra_assets = {}
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def add_asset(self, name, data):
+        """Serve in-memory bytes as /name (e.g. Qt's bundled qwebchannel.js)"""
+        self.httpd.extra_assets[name] = bytes(data)
+
+    def map_url(self, lat, lon, zoom=17, marker=None):
+        """URL of the offline map page centered on a position"""
+        params = {'lat': f"{lat:.6f}", 'lon': f"{lon:.6f}", 'zoom': zoom}
+        if marker:
+            params['mlat'] = f"{marker[0]:.6f}"
+            params['mlon'] = f"{marker[1]:.6f}"
+        return f"{self.base_url}/?{urlencode(params)}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name="tile-server", daemon=True)
+        self.thread.start()
+        logger.info(f"Tile server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
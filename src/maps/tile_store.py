@@ -0,0 +1,110 @@
+"""
+Tile Store - MBTiles (SQLite) raster tile storage
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom_level INTEGER,
+    tile_column INTEGER,
+    tile_row INTEGER,
+    tile_data BLOB
+);
+CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row);
+"""
+
+# Let SQLite serve reads straight from the page cache via mmap
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+class MBTilesStore:
+    """Reads and writes XYZ tiles in an MBTiles file
+
+    MBTiles stores rows in TMS order (y flipped); callers always use XYZ.
+    Each thread gets its own connection so the tile server can read while
+    the seeder or prefetcher writes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.commit()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self.local.conn = conn
+        return conn
+
+    def get_tile(self, z, x, y):
+        """Tile bytes, or None if the tile is not stored"""
+        row = self.connection().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, (2 ** z - 1) - y)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def has_tile(self, z, x, y):
+        return self.connection().execute(
+            "SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, (2 ** z - 1) - y)
+        ).fetchone() is not None
+
+    def put_tile(self, z, x, y, data, commit=True):
+        conn = self.connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) "
+            "VALUES (?, ?, ?, ?)",
+            (z, x, (2 ** z - 1) - y, sqlite3.Binary(data))
+        )
+        if commit:
+            conn.commit()
+
+    def commit(self):
+        self.connection().commit()
+
+    def tile_count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def get_metadata(self, name, default=None):
+        row = self.connection().execute(
+            "SELECT value FROM metadata WHERE name=?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def set_metadata(self, name, value):
+        conn = self.connection()
+        conn.execute("INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                     (name, str(value)))
+        conn.commit()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
@@ -0,0 +1,34 @@
+"""
+Slippy-map tile math (OpenStreetMap / Web Mercator XYZ scheme)
+"""
+
+import math
+
+TILE_SIZE = 256
+
+
+def deg_to_tile(lat, lon, zoom):
+    """Fractional XYZ tile coordinates for a position"""
+    n = 2 ** zoom
+    lat_rad = math.radians(lat)
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_to_deg(x, y, zoom):
+    """North-west corner of a (possibly fractional) tile"""
+    n = 2 ** zoom
+    lon = x / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    return lat, lon
+
+
+def tiles_in_bbox(min_lat, min_lon, max_lat, max_lon, zoom):
+    """All (z, x, y) tiles covering a bounding box at one zoom level"""
+    x0, y0 = deg_to_tile(max_lat, min_lon, zoom)
+    x1, y1 = deg_to_tile(min_lat, max_lon, zoom)
+    last = 2 ** zoom - 1
+    for x in range(max(0, int(x0)), min(last, int(x1)) + 1):
+        for y in range(max(0, int(y0)), min(last, int(y1)) + 1):
+            yield zoom, x, y
@@ -3,20 +3,189 @@ GPS Navigation UI for Golf Cart System
 """
 
 import os
+import logging
+from math import sin, cos, sqrt, atan2, radians
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QLabel, QFrame, QComboBox, QLineEdit)
+                             QLabel, QFrame, QComboBox, QLineEdit, QListWidget,
+                             QListWidgetItem)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QUrl
-from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtGui import QFont
+from maps.tile_store import MBTilesStore
+from maps.tile_server import TileServer
+from maps.seed_tiles import TileFetcher
+from maps.tile_prefetcher import TilePrefetcher, plan_tiles, view_radius
+from gps.sources import create_gps_source
+from gps.fix import MPS_TO_MPH, has_position
+from gps.track_recorder import TrackRecorder
+from course.course_data import load_course
+from course.course_pack import open_packs, pack_for_position
+from course.spatial_index import SpatialIndex, HoleTracker
+from course.yardage import YardageEngine
+from course.elevation import Dem, PlaysLikeEngine
+from course.routing import PathGraph, Router, METERS_PER_MILE
+from course.speed_model import SpeedModel
+from course.geofence import GeofenceGrid, GeofenceMonitor, fences_from_course, WARNING_KINDS
+from course.geo import LocalProjection, METERS_PER_YARD
+from course.poi_search import PoiIndex, pois_from_course, pois_from_destinations
+from .native_map import NativeMapView
+from .map_bridge import MapBridge
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Map center shown before a destination is picked (clubhouse)
+DEFAULT_CENTER = (35.7796, -78.6382)
+
+# Fixes older than this are treated as lost signal
+STALE_FIX_SECONDS = 5
+
+# Search results shown under the search box while typing
+SEARCH_RESULTS = 6
+
+# Re-plan tile prefetching this often while on the same hole (heading drifts)
+PREFETCH_SECONDS = 5
+
+# Save the learned speed model this often so a cart switched off mid-round keeps it
+SPEED_MODEL_SAVE_MS = 5 * 60 * 1000
+
+# Fallback destinations when no course file is available (example coordinates)
+QUICK_DESTINATIONS = {
+    "Clubhouse": (35.7796, -78.6382),
+    "Driving Range": (35.7810, -78.6370),
+    "Pro Shop": (35.7798, -78.6385),
+    "Hole 1": (35.7802, -78.6378),
+    "Hole 10": (35.7825, -78.6360),
+    "Parking": (35.7790, -78.6390)
+}
 
 class GPSNavigation(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.current_location = None
+        self.current_hole = None
+        self.shown_route = None
+        self.load_course()
         self.init_ui()
         self.setup_gps()
         
+    def load_course(self):
+        """Load the configured course and open the course packs to pick from"""
+        course_settings = getattr(self.parent, 'settings', {}).get('course', {})
+        path = course_settings.get('geojson_path', 'config/course.geojson')
+        if not os.path.isabs(path):
+            path = os.path.join(PROJECT_ROOT, path)
+        packs_dir = course_settings.get('packs_dir', 'data/courses')
+        if not os.path.isabs(packs_dir):
+            packs_dir = os.path.join(PROJECT_ROOT, packs_dir)
+        
+        # The first fix picks the pack of the course the cart is on
+        self.course_packs = open_packs(packs_dir) if os.path.isdir(packs_dir) else []
+        self.course_selected = False
+        self.speed_model = None
+        self.dem = self.open_dem(course_settings)
+        course = None
+        try:
+            course = load_course(path)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            logger.error(f"Error loading course {path}: {e}")
+        self.set_course(course)
+        
+    def set_course(self, course, pack=None):
+        """Build the spatial index, router, geofences and search for a course"""
+        course_settings = getattr(self.parent, 'settings', {}).get('course', {})
+        # Keep what was learned on the previous course
+        self.save_speed_model()
+        
+        self.course = course
+        self.course_pack = pack
+        self.course_index = None
+        self.hole_tracker = None
+        self.yardage = None
+        self.plays_like = None
+        self.router = None
+        self.geofences = None
+        self.speed_model = None
+        self.last_learned = None
+        self.current_hole = None
+        self.shown_route = None
+        self.destinations = dict(QUICK_DESTINATIONS)
+        self.search_projection = LocalProjection(*DEFAULT_CENTER)
+        self.poi_index = PoiIndex(pois_from_destinations(self.destinations,
+                                                         self.search_projection))
+        if course is None:
+            return
+        
+        self.course_index = SpatialIndex(course.features)
+        self.hole_tracker = HoleTracker(self.course_index)
+        # A pack loads each hole's targets the first time the cart is on it
+        self.yardage = YardageEngine(course, lazy=pack is not None)
+        if self.dem is not None:
+            self.plays_like = PlaysLikeEngine(self.yardage, self.dem)
+        self.load_speed_model(course_settings)
+        fences = fences_from_course(course, course_settings.get('green_buffer_m', 8.0))
+        if fences:
+            self.geofences = GeofenceMonitor(GeofenceGrid(fences),
+                                             course_settings.get('geofence_dwell_s', 3.0))
+            self.geofences.subscribe(self.on_geofence_event)
+        graph = pack.path_graph() if pack else PathGraph.from_course(course)
+        if graph.edges:
+            self.router = Router(graph, course_settings.get('cart_speed_mph', 15),
+                                 speed_model=self.speed_model)
+        self.destinations = course.destinations() or self.destinations
+        # Offline search over every named course feature
+        self.search_projection = course.projection
+        self.poi_index = PoiIndex(pack.pois(course.projection) if pack
+                                  else pois_from_course(course))
+        
+    def open_dem(self, course_settings):
+        """Memory-map the elevation raster used for plays-like yardages, if any"""
+        path = course_settings.get('dem_path')
+        if not path:
+            return None
+        if not os.path.isabs(path):
+            path = os.path.join(PROJECT_ROOT, path)
+        if not os.path.exists(path):
+            logger.info(f"No elevation data at {path}, plays-like yardages disabled")
+            return None
+        try:
+            return Dem.open(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error opening elevation data {path}: {e}")
+            return None
+        
+    def load_speed_model(self, course_settings):
+        """Load the learned cart speeds for this course, or start a new model"""
+        if not course_settings.get('learn_speeds', True):
+            return
+        path = course_settings.get('speed_model_path', 'data/speed_model.bin')
+        if not os.path.isabs(path):
+            path = os.path.join(PROJECT_ROOT, path)
+        if self.course_pack is not None:
+            # One model per course: speeds are keyed to the course's own plane
+            root, ext = os.path.splitext(path)
+            path = f"{root}-{self.course_pack.slug}{ext}"
+        self.speed_model_path = path
+        
+        if os.path.exists(path):
+            try:
+                self.speed_model = SpeedModel.load(path, self.course.projection)
+                logger.info(f"Loaded speed model with {len(self.speed_model)} cells")
+                return
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring speed model {path}: {e}")
+        self.speed_model = SpeedModel(self.course.projection)
+        
+    def save_speed_model(self):
+        """Persist the learned cart speeds between rounds"""
+        if self.speed_model is None or not len(self.speed_model):
+            return
+        try:
+            self.speed_model.save(self.speed_model_path)
+        except OSError as e:
+            logger.error(f"Error saving speed model: {e}")
+        
     def init_ui(self):
         """Initialize the GPS navigation UI"""
         layout = QVBoxLayout()
@@ -27,9 +196,39 @@ class GPSNavigation(QWidget):
         header = self.create_header()
         layout.addWidget(header)
         
-        # Map view (using QWebEngineView for web-based maps)
-        self.map_view = QWebEngineView()
-        self.map_view.setUrl(QUrl("https://www.openstreetmap.org"))
+        # Geofence warning (no-cart zones, restricted areas)
+        self.geofence_banner = QLabel()
+        self.geofence_banner.setAlignment(Qt.AlignCenter)
+        self.geofence_banner.setFixedHeight(44)
+        self.geofence_banner.setStyleSheet(
+            "background-color: #FC3C44; color: white; font-size: 18px; font-weight: bold;"
+        )
+        self.geofence_banner.hide()
+        layout.addWidget(self.geofence_banner)
+        
+        # Search-as-you-type results, nearest first
+        self.search_results = QListWidget()
+        self.search_results.setStyleSheet("""
+            QListWidget {
+                background-color: #2a2a2a;
+                color: white;
+                border: none;
+                font-size: 18px;
+            }
+            QListWidget::item {
+                padding: 10px 20px;
+                border-bottom: 1px solid #3a3a3a;
+            }
+            QListWidget::item:selected {
+                background-color: #4285F4;
+            }
+        """)
+        self.search_results.itemClicked.connect(self.select_search_result)
+        self.search_results.hide()
+        layout.addWidget(self.search_results)
+        
+        # Map view (native QPainter renderer or offline web page)
+        self.map_view = self.create_map_view()
         layout.addWidget(self.map_view)
         
         # GPS info bar
@@ -38,6 +237,73 @@ class GPSNavigation(QWidget):
         
         self.setLayout(layout)
         
+    def create_map_view(self):
+        """Create the map widget selected by the maps.renderer setting"""
+        maps_settings = getattr(self.parent, 'settings', {}).get('maps', {})
+        path = maps_settings.get('mbtiles_path', 'data/tiles/course.mbtiles')
+        if not os.path.isabs(path):
+            path = os.path.join(PROJECT_ROOT, path)
+        self.tile_store = MBTilesStore(path)
+        self.map_renderer = maps_settings.get('renderer', 'web')
+        self.tile_prefetcher = self.create_tile_prefetcher(maps_settings)
+        
+        overlays = [(name, lat, lon) for name, (lat, lon) in self.destinations.items()]
+        if self.map_renderer == 'native':
+            # Draws tiles straight from the store - no Chromium process
+            map_view = NativeMapView(self.tile_store, DEFAULT_CENTER, 16)
+            map_view.set_overlays(overlays)
+            self.map_updates = map_view
+            return map_view
+        
+        # Web renderer: offline map page served from the local tile cache,
+        # loaded once and then updated in place over a QWebChannel
+        from PyQt5.QtWebEngineWidgets import QWebEngineView
+        from PyQt5.QtWebChannel import QWebChannel
+        from PyQt5.QtCore import QFile, QIODevice
+        self.tile_server = TileServer(
+            self.tile_store, maps_settings.get('tile_server_port', 0)
+        ).start()
+        script = QFile(':/qtwebchannel/qwebchannel.js')
+        if script.open(QIODevice.ReadOnly):
+            self.tile_server.add_asset('qwebchannel.js', script.readAll())
+            script.close()
+        
+        self.map_bridge = MapBridge(self)
+        self.map_bridge.set_center(*DEFAULT_CENTER, 16)
+        self.map_bridge.set_overlays(overlays)
+        self.map_channel = QWebChannel(self)
+        self.map_channel.registerObject('bridge', self.map_bridge)
+        map_view = QWebEngineView()
+        map_view.page().setWebChannel(self.map_channel)
+        map_view.setUrl(QUrl(self.tile_server.map_url(*DEFAULT_CENTER, zoom=16)))
+        self.map_updates = self.map_bridge
+        return map_view
+        
+    def create_tile_prefetcher(self, maps_settings):
+        """Start the background thread that downloads tiles ahead of the cart"""
+        self.prefetch_zooms = maps_settings.get('prefetch_zooms', [17, 16, 18])
+        self.prefetch_hole = None
+        self.last_prefetch = None
+        # Off unless an operator names a tile source they may bulk-download from
+        url = maps_settings.get('tile_url', '')
+        if not maps_settings.get('prefetch', False) or not url:
+            return None
+        if 'tile.openstreetmap.org' in url:
+            logger.warning("maps.tile_url is the OpenStreetMap tile server, whose usage "
+                           "policy forbids bulk downloading for offline use")
+        try:
+            fetcher = TileFetcher(url)
+        except ImportError as e:
+            logger.warning(f"Tile prefetching disabled: {e}")
+            return None
+        return TilePrefetcher(self.tile_store, fetcher,
+                              maps_settings.get('prefetch_kbps', 128) * 1024).start()
+        
+    def show_map_location(self, lat, lon, zoom=17):
+        """Center the map on a destination and mark it"""
+        self.map_updates.set_center(lat, lon, zoom)
+        self.map_updates.set_destination(lat, lon)
+        
     def create_header(self):
         """Create header with navigation controls"""
         header = QFrame()
@@ -79,6 +345,7 @@ class GPSNavigation(QWidget):
                 font-size: 16px;
             }
         """)
+        self.search_input.textChanged.connect(self.update_search_results)
         self.search_input.returnPressed.connect(self.search_location)
         layout.addWidget(self.search_input)
         
@@ -126,6 +393,18 @@ class GPSNavigation(QWidget):
         eta_frame = self.create_info_widget("ETA", "--:--", "")
         layout.addWidget(eta_frame)
         
+        # Current hole display
+        hole_frame = self.create_info_widget("Hole", "--", "")
+        layout.addWidget(hole_frame)
+        
+        # Front / middle / back of the current green
+        green_frame = self.create_info_widget("Green", "--", "yd")
+        layout.addWidget(green_frame)
+        
+        # Middle of the green adjusted for the rise or fall to it
+        plays_like_frame = self.create_info_widget("Plays Like", "--", "yd")
+        layout.addWidget(plays_like_frame)
+        
         # Quick destinations
         quick_dest = QFrame()
         quick_layout = QVBoxLayout()
@@ -135,14 +414,7 @@ class GPSNavigation(QWidget):
         quick_layout.addWidget(dest_label)
         
         self.dest_combo = QComboBox()
-        self.dest_combo.addItems([
-            "Clubhouse",
-            "Driving Range", 
-            "Pro Shop",
-            "Hole 1",
-            "Hole 10",
-            "Parking"
-        ])
+        self.dest_combo.addItems(list(self.destinations))
         self.dest_combo.setStyleSheet("""
             QComboBox {
                 background-color: #2a2a2a;
@@ -175,6 +447,9 @@ class GPSNavigation(QWidget):
         self.speed_label = speed_frame.findChild(QLabel, "value")
         self.distance_label = distance_frame.findChild(QLabel, "value")
         self.eta_label = eta_frame.findChild(QLabel, "value")
+        self.hole_label = hole_frame.findChild(QLabel, "value")
+        self.green_label = green_frame.findChild(QLabel, "value")
+        self.plays_like_label = plays_like_frame.findChild(QLabel, "value")
         
         return info_bar
         
@@ -214,79 +489,292 @@ class GPSNavigation(QWidget):
         
     def setup_gps(self):
         """Setup GPS monitoring"""
-        # GPS update timer
-        self.gps_timer = QTimer()
+        gps_settings = getattr(self.parent, 'settings', {}).get('gps', {})
+        
+        # GPS I/O runs in the source's own thread; the timer only refreshes the UI
+        self.gps_source = None
+        self.track_recorder = None
+        if gps_settings.get('enabled', True):
+            try:
+                self.gps_source = create_gps_source(gps_settings, PROJECT_ROOT)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error opening GPS source: {e}")
+        if self.gps_source is not None:
+            self.gps_source.recorder = self.create_track_recorder(gps_settings)
+            self.gps_source.start()
+        
+        self.gps_timer = QTimer(self)
         self.gps_timer.timeout.connect(self.update_gps_data)
-        self.gps_timer.start(1000)  # Update every second
+        self.gps_timer.start(int(gps_settings.get('update_interval', 1) * 1000))
         
-        # Try to get GPS data
+        self.speed_model_timer = QTimer(self)
+        self.speed_model_timer.timeout.connect(self.save_speed_model)
+        self.speed_model_timer.start(SPEED_MODEL_SAVE_MS)
+            
+    def create_track_recorder(self, gps_settings):
+        """Open the ring file that keeps where the cart has been"""
+        # A replayed recording is not where this cart went
+        if not gps_settings.get('record_track', True) or gps_settings.get('source') == 'replay':
+            return None
+        path = gps_settings.get('track_path', 'data/tracks/cart.trk')
+        if not os.path.isabs(path):
+            path = os.path.join(PROJECT_ROOT, path)
         try:
-            import gpsd
-            gpsd.connect()
-            self.gpsd_connected = True
-        except:
-            self.gpsd_connected = False
+            self.track_recorder = TrackRecorder(path, gps_settings.get('track_capacity', 500000))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error opening track file {path}: {e}")
+        return self.track_recorder
             
     def update_gps_data(self):
-        """Update GPS information"""
-        if self.gpsd_connected:
-            try:
-                import gpsd
-                packet = gpsd.get_current()
-                
-                if packet.mode >= 2:
-                    # Update speed
-                    speed_mph = packet.hspeed * 2.237  # Convert m/s to mph
-                    self.speed_label.setText(f"{speed_mph:.0f}")
-                    
-                    # Store location
-                    self.current_location = (packet.lat, packet.lon)
-                    
-                    # Update map center if significant movement
-                    # (Implementation depends on map provider)
-                    
-            except:
-                pass
+        """Update GPS information from the latest fix"""
+        if self.gps_source is None:
+            return
+        
+        fix = self.gps_source.latest()
+        age = self.gps_source.fix_age()
+        if not has_position(fix) or age is None or age > STALE_FIX_SECONDS:
+            self.speed_label.setText("--")
+            return
+        
+        # Update speed
+        if fix.speed is not None:
+            self.speed_label.setText(f"{fix.speed * MPS_TO_MPH:.0f}")
+        
+        # Store location
+        self.current_location = (fix.lat, fix.lon)
+        
+        if not self.course_selected:
+            self.course_selected = True
+            self.select_course(fix.lat, fix.lon)
+        
+        # Which hole are we on (hysteresis avoids flicker at hole boundaries)
+        if self.hole_tracker:
+            x, y = self.course.to_local(fix.lat, fix.lon)
+            self.current_hole = self.hole_tracker.update(x, y)
+            # Learn cart speeds, once per fix (the timer can outpace the receiver)
+            if self.speed_model is not None and fix.received != self.last_learned:
+                self.last_learned = fix.received
+                self.speed_model.add(x, y, fix.speed)
+            if self.geofences:
+                self.geofences.update(x, y, fix.received)
+            self.hole_label.setText(str(self.current_hole) if self.current_hole else "--")
+            self.update_yardages(fix.lat, fix.lon)
+            
+        # Follow the active route, rerouting if the cart left it
+        if self.router and self.router.destination:
+            self.router.update(*self.course.to_local(fix.lat, fix.lon))
+            self.show_route()
+        
+        # Move the live position marker
+        self.map_updates.set_position(fix.lat, fix.lon, fix.track)
+        self.prefetch_tiles(fix)
+        
+    def prefetch_tiles(self, fix):
+        """Plan the tiles needed next and redraw the ones fetched since the last fix"""
+        if self.tile_prefetcher is None:
+            return
+        fetched = self.tile_prefetcher.take_fetched()
+        if fetched:
+            self.map_updates.forget_missing(fetched)
+        
+        if (self.current_hole == self.prefetch_hole and self.last_prefetch is not None
+                and fix.received - self.last_prefetch < PREFETCH_SECONDS):
+            return
+        self.prefetch_hole = self.current_hole
+        self.last_prefetch = fix.received
+        
+        # The rest of this hole and the next one in sequence
+        areas = []
+        if self.course is not None and self.current_hole in self.course.holes:
+            holes = self.course.holes
+            next_hole = holes[(holes.index(self.current_hole) + 1) % len(holes)]
+            for hole in (self.current_hole, next_hole):
+                areas.append([c for f in self.course.features_for_hole(hole) for c in f.coords])
+        zooms = list(self.prefetch_zooms)
+        if self.map_renderer == 'native':
+            # The zoom on screen first
+            zooms = [self.map_view.zoom] + [z for z in zooms if z != self.map_view.zoom]
+        radius = view_radius(fix.lat, zooms[0], self.map_view.width(), self.map_view.height())
+        self.tile_prefetcher.request(
+            plan_tiles(fix.lat, fix.lon, fix.track, fix.speed, zooms, areas, radius)
+        )
+            
+    def select_course(self, lat, lon):
+        """Switch to the course pack covering a position unless it is already active"""
+        pack = pack_for_position(self.course_packs, lat, lon)
+        if pack is None or pack is self.course_pack:
+            return
+        try:
+            course = pack.course()
+        except ValueError as e:
+            logger.error(f"Error loading course pack {pack.path}: {e}")
+            return
+        logger.info(f"Selected course '{pack.name}' from {pack.path}")
+        self.set_course(course, pack)
+        self.show_course()
+        
+    def show_course(self):
+        """Refresh destinations, overlays and tiles after the course changed"""
+        self.dest_combo.blockSignals(True)
+        self.dest_combo.clear()
+        self.dest_combo.addItems(list(self.destinations))
+        self.dest_combo.blockSignals(False)
+        self.map_updates.set_route([])
+        self.map_updates.set_destination()
+        self.map_updates.set_overlays(
+            [(name, lat, lon) for name, (lat, lon) in self.destinations.items()]
+        )
+        self.hole_label.setText("--")
+        self.distance_label.setText("0.0")
+        self.eta_label.setText("--:--")
+        self.geofence_banner.hide()
+        
+        # Packs name the tile file that covers their course
+        tiles = (self.course_pack.meta.get('tiles') or {}).get('mbtiles')
+        if not tiles:
+            return
+        path = os.path.join(os.path.dirname(self.tile_store.path), tiles)
+        if not os.path.exists(path) or path == self.tile_store.path:
+            return
+        old_store = self.tile_store
+        self.tile_store = MBTilesStore(path)
+        if self.map_renderer == 'native':
+            self.map_view.set_tile_store(self.tile_store)
+        else:
+            self.tile_server.store = self.tile_server.httpd.store = self.tile_store
+        if self.tile_prefetcher is not None:
+            self.tile_prefetcher.set_store(self.tile_store)
+        old_store.close()
+            
+    def update_yardages(self, lat, lon):
+        """Show front/middle/back yards to the current green"""
+        if self.yardage is None or self.current_hole is None:
+            self.green_label.setText("--")
+            self.plays_like_label.setText("--")
+            return
+        yards = self.yardage.green_yards(lat, lon, self.current_hole)
+        self.green_label.setText(
+            "/".join(f"{value:.0f}" if value is not None else "-" for value in yards)
+        )
+        middle = None
+        if self.plays_like is not None:
+            middle = self.plays_like.green_yards(lat, lon, self.current_hole)[1]
+        self.plays_like_label.setText(f"{middle:.0f}" if middle is not None else "--")
+            
+    def on_geofence_event(self, event):
+        """Show or clear the warning banner when the cart crosses a warning fence"""
+        if event.fence.kind not in WARNING_KINDS:
+            return
+        warnings = self.geofences.active(WARNING_KINDS)
+        if not warnings:
+            self.geofence_banner.hide()
+            return
+        fence = warnings[-1]
+        if fence.kind == 'no_cart':
+            self.geofence_banner.setText(f"No carts: {fence.name}")
+        else:
+            self.geofence_banner.setText(f"Restricted area: {fence.name}")
+        self.geofence_banner.show()
+            
+    def stop_gps(self):
+        """Stop the GPS reader thread and keep what was learned this round"""
+        self.gps_timer.stop()
+        self.speed_model_timer.stop()
+        if self.gps_source is not None:
+            self.gps_source.stop()
+        if self.track_recorder is not None:
+            self.track_recorder.close()
+        self.save_speed_model()
+        for pack in self.course_packs:
+            pack.close()
+        if self.map_renderer == 'native':
+            self.map_view.stop_loading()
+        if self.tile_prefetcher is not None:
+            self.tile_prefetcher.stop()
+            stats = self.tile_prefetcher.stats()
+            logger.info(f"Map tile hit rate {stats.hit_rate:.0%}; prefetched {stats.fetched} "
+                        f"tiles ({stats.bytes / 1024:.0f} KB), {stats.failed} failed")
                 
+    def update_search_results(self, text):
+        """List POIs matching the text typed so far, nearest to the cart first"""
+        self.search_results.clear()
+        position = None
+        if self.current_location:
+            position = self.search_projection.to_local(*self.current_location)
+        results = self.poi_index.search(text, *(position or (None, None)),
+                                        limit=SEARCH_RESULTS)
+        for result in results:
+            label = result.poi.name
+            if result.distance is not None and result.distance < 400:
+                label += f"  ·  {result.distance / METERS_PER_YARD:.0f} yd"
+            elif result.distance is not None:
+                label += f"  ·  {result.distance / METERS_PER_MILE:.1f} mi"
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, (result.poi.lat, result.poi.lon))
+            self.search_results.addItem(item)
+        if results:
+            self.search_results.setFixedHeight(
+                self.search_results.sizeHintForRow(0) * len(results) + 4
+            )
+        self.search_results.setVisible(bool(results))
+        
+    def select_search_result(self, item):
+        """Navigate to a picked search result"""
+        self.search_results.hide()
+        self.navigate_to(*item.data(Qt.UserRole))
+        
     def search_location(self):
-        """Search for a location"""
-        query = self.search_input.text()
-        if query:
-            # For OpenStreetMap
-            search_url = f"https://www.openstreetmap.org/search?query={query}"
-            self.map_view.setUrl(QUrl(search_url))
+        """Navigate to the best match for the search text"""
+        if self.search_results.count():
+            self.select_search_result(self.search_results.item(0))
             
     def navigate_to_destination(self, destination):
         """Navigate to a quick destination"""
-        # Golf course destinations (example coordinates)
-        destinations = {
-            "Clubhouse": (35.7796, -78.6382),
-            "Driving Range": (35.7810, -78.6370),
-            "Pro Shop": (35.7798, -78.6385),
-            "Hole 1": (35.7802, -78.6378),
-            "Hole 10": (35.7825, -78.6360),
-            "Parking": (35.7790, -78.6390)
-        }
-        
-        if destination in destinations:
-            lat, lon = destinations[destination]
-            # Center map on destination
-            map_url = f"https://www.openstreetmap.org/?mlat={lat}&mlon={lon}#map=17/{lat}/{lon}"
-            self.map_view.setUrl(QUrl(map_url))
+        if destination in self.destinations:
+            self.navigate_to(*self.destinations[destination])
             
-            # Calculate distance and ETA if we have current location
+    def navigate_to(self, lat, lon):
+        """Center the map on a point and route there along the cart paths"""
+        # Center map on destination
+        self.show_map_location(lat, lon)
+        
+        # Route along the cart paths; planned at the first fix if there is none yet
+        if self.router:
+            self.router.clear()
+            self.shown_route = None
+            self.map_updates.set_route([])
+            self.router.destination = self.course.to_local(lat, lon)
             if self.current_location:
-                distance = self.calculate_distance(self.current_location, (lat, lon))
-                self.distance_label.setText(f"{distance:.1f}")
-                
-                # Estimate ETA (assuming 15 mph average golf cart speed)
-                eta_minutes = (distance / 15) * 60
-                self.eta_label.setText(f"{int(eta_minutes)}min")
+                self.router.update(*self.course.to_local(*self.current_location))
+            if self.router.route:
+                self.show_route()
+                return
+        
+        # Calculate distance and ETA if we have current location
+        if self.current_location:
+            distance = self.calculate_distance(self.current_location, (lat, lon))
+            self.distance_label.setText(f"{distance:.1f}")
+            
+            # Estimate ETA (assuming 15 mph average golf cart speed)
+            eta_minutes = (distance / 15) * 60
+            self.eta_label.setText(f"{int(eta_minutes)}min")
+            
+    def show_route(self):
+        """Show remaining route distance, ETA and polyline"""
+        route = self.router.route
+        if route is None:
+            return
+        self.distance_label.setText(f"{self.router.remaining / METERS_PER_MILE:.1f}")
+        self.eta_label.setText(f"{int(self.router.eta_seconds() / 60)}min")
+        # The polyline only changes on a new route or a reroute
+        if route is not self.shown_route:
+            self.shown_route = route
+            self.map_updates.set_route(
+                [self.course.projection.to_latlon(x, y) for x, y in route.points]
+            )
                 
     def calculate_distance(self, pos1, pos2):
         """Calculate distance between two GPS coordinates in miles"""
-        from math import sin, cos, sqrt, atan2, radians
-        
         lat1, lon1 = pos1
         lat2, lon2 = pos2
         
@@ -3,29 +3,24 @@ Home Screen UI for Golf Cart System
 """
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-                             QPushButton, QLabel, QFrame, QGraphicsDropShadowEffect,
-                             QGraphicsOpacityEffect)
+                             QPushButton, QLabel, QFrame, QGraphicsOpacityEffect)
 from PyQt5.QtCore import (Qt, QTimer, pyqtSignal, QPropertyAnimation, QRect, 
                           QEasingCurve, QSequentialAnimationGroup, QParallelAnimationGroup)
 from PyQt5.QtGui import (QFont, QPainter, QPainterPath, QBrush, QColor, 
                          QLinearGradient, QRadialGradient, QPen)
 from datetime import datetime
+from .render_cache import render_cache, gradient_key
+from .shadows import NinePatchShadow, ShadowedFrame
 
-class RoundedFrame(QFrame):
+class RoundedFrame(ShadowedFrame):
     def __init__(self, radius=20, gradient=None, parent=None):
-        super().__init__(parent)
+        # Shadow blurred once, painted with the frame from a cached nine-patch
+        super().__init__(NinePatchShadow(radius, 25, (0, 5), QColor(0, 0, 0, 60)), parent)
         self.radius = radius
         self.gradient = gradient
         self.hover = False
         self.setMouseTracking(True)
         
-        # Add shadow effect
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(25)
-        shadow.setOffset(0, 5)
-        shadow.setColor(QColor(0, 0, 0, 60))
-        self.setGraphicsEffect(shadow)
-        
     def enterEvent(self, event):
         self.hover = True
         self.update()
@@ -35,13 +30,17 @@ class RoundedFrame(QFrame):
         self.update()
         
     def paintEvent(self, event):
-        painter = QPainter(self)
+        state = (self.radius, gradient_key(self.gradient), self.hover)
+        render_cache.paint(self, 'rounded_frame', state, self.draw)
+        
+    def draw(self, painter, width, height):
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.paint_shadow(painter, width, height)
         
         # Create path
         path = QPainterPath()
-        path.addRoundedRect(0, 0, self.width(), self.height(), self.radius, self.radius)
+        path.addRoundedRect(self.body_rect(width, height), self.radius, self.radius)
         
         # Background with gradient or solid color
         if self.gradient:
@@ -70,7 +69,10 @@ class ModernButton(QPushButton):
         self.update()
         
     def paintEvent(self, event):
-        painter = QPainter(self)
+        state = (self.icon_text, self._active, self.isDown())
+        render_cache.paint(self, 'modern_button', state, self.draw)
+        
+    def draw(self, painter, width, height):
         painter.setRenderHint(QPainter.Antialiasing)
         
         # Draw circle background
@@ -91,7 +93,7 @@ class ModernButton(QPushButton):
             painter.setPen(QColor(100, 150, 200))
         font = QFont("Arial", 32)  # Use Arial as fallback
         painter.setFont(font)
-        painter.drawText(self.rect(), Qt.AlignCenter, self.icon_text)
+        painter.drawText(0, 0, width, height, Qt.AlignCenter, self.icon_text)
 
 class HomeScreen(QWidget):
     def __init__(self, parent=None):
@@ -195,7 +197,7 @@ class HomeScreen(QWidget):
     def create_weather_card(self):
         """Create weather information card"""
         card = RoundedFrame(20)
-        card.setFixedHeight(100)
+        card.set_body_height(100)
         card.setStyleSheet("""
             RoundedFrame {
                 background-color: #2a3142;
@@ -232,7 +234,7 @@ class HomeScreen(QWidget):
     def create_music_card(self):
         """Create now playing music card"""
         card = RoundedFrame(20)
-        card.setFixedHeight(200)
+        card.set_body_height(200)
         card.setStyleSheet("""
             RoundedFrame {
                 background-color: #2a3142;
@@ -332,7 +334,7 @@ class HomeScreen(QWidget):
     def create_navigation_card(self):
         """Create navigation card with map preview"""
         card = RoundedFrame(20)
-        card.setMinimumWidth(400)
+        card.set_body_minimum_width(400)
         card.setStyleSheet("""
             RoundedFrame {
                 background-color: #2a3142;
@@ -344,7 +346,7 @@ class HomeScreen(QWidget):
         
         # Navigation instruction
         nav_frame = RoundedFrame(15)
-        nav_frame.setFixedHeight(80)
+        nav_frame.set_body_height(80)
         nav_frame.setStyleSheet("""
             RoundedFrame {
                 background-color: #3b7ff6;
@@ -3,26 +3,22 @@ Clean Modern Home Screen UI for Golf Cart System
 """
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QLabel, QFrame, QGraphicsDropShadowEffect)
+                             QLabel, QFrame)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont, QPainter, QPainterPath, QBrush, QColor, QPen
 from datetime import datetime
+from .render_cache import render_cache
+from .shadows import NinePatchShadow, ShadowedFrame
 
-class CleanCard(QFrame):
+class CleanCard(ShadowedFrame):
     clicked = pyqtSignal()
     
     def __init__(self, parent=None):
-        super().__init__(parent)
+        # Shadow blurred once, painted with the card from a cached nine-patch
+        super().__init__(NinePatchShadow(16, 20, (0, 2), QColor(0, 0, 0, 30)), parent)
         self.setCursor(Qt.PointingHandCursor)
         self._hover = False
         
-        # Shadow effect
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        self.setGraphicsEffect(shadow)
-        
     def enterEvent(self, event):
         self._hover = True
         self.update()
@@ -32,16 +28,19 @@ class CleanCard(QFrame):
         self.update()
         
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
+        if event.button() == Qt.LeftButton and self.contentsRect().contains(event.pos()):
             self.clicked.emit()
             
     def paintEvent(self, event):
-        painter = QPainter(self)
+        render_cache.paint(self, 'clean_card', self._hover, self.draw)
+        
+    def draw(self, painter, width, height):
         painter.setRenderHint(QPainter.Antialiasing)
+        self.paint_shadow(painter, width, height)
         
         # Background
         path = QPainterPath()
-        path.addRoundedRect(0, 0, self.width(), self.height(), 16, 16)
+        path.addRoundedRect(self.body_rect(width, height), 16, 16)
         
         color = QColor("#2a3447")
         if self._hover:
@@ -63,7 +62,9 @@ class IconButton(QPushButton):
         self.update()
         
     def paintEvent(self, event):
-        painter = QPainter(self)
+        render_cache.paint(self, 'icon_button', (self.icon, self._active), self.draw)
+        
+    def draw(self, painter, width, height):
         painter.setRenderHint(QPainter.Antialiasing)
         
         # Background circle
@@ -79,7 +80,7 @@ class IconButton(QPushButton):
         painter.setPen(Qt.white if self._active else QColor("#8a95aa"))
         font = QFont("Arial", 24)
         painter.setFont(font)
-        painter.drawText(self.rect(), Qt.AlignCenter, self.icon)
+        painter.drawText(0, 0, width, height, Qt.AlignCenter, self.icon)
 
 class HomeScreen(QWidget):
     def __init__(self, parent=None):
@@ -175,7 +176,7 @@ class HomeScreen(QWidget):
     def create_weather_widget(self):
         """Create clean weather widget"""
         widget = CleanCard()
-        widget.setFixedHeight(120)
+        widget.set_body_height(120)
         
         layout = QHBoxLayout()
         layout.setContentsMargins(24, 24, 24, 24)
@@ -232,7 +233,7 @@ class HomeScreen(QWidget):
     def create_music_widget(self):
         """Create clean music widget"""
         widget = CleanCard()
-        widget.setFixedHeight(180)
+        widget.set_body_height(180)
         
         layout = QVBoxLayout()
         layout.setContentsMargins(24, 24, 24, 24)
@@ -0,0 +1,125 @@
+"""
+Map Bridge - Sends map updates to the offline web map over QWebChannel
+"""
+
+import json
+import time
+import logging
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+# One batch per display frame at 60 Hz
+FRAME_MS = 16
+
+
+class MapBridge(QObject):
+    """Python side of the map page's channel, registered as "bridge"
+
+    Updates are coalesced per kind (view, destination, route, position,
+    overlays) so only the latest of each is sent, and at most one batch
+    goes out per frame. The page applies a batch in its next animation
+    frame and calls frameDrawn(seq), which closes the latency measurement
+    started when the first update of that batch was posted.
+    """
+
+    batch = pyqtSignal(str)
+
+    def __init__(self, parent=None, frame_ms=FRAME_MS):
+        super().__init__(parent)
+        self.frame_ms = frame_ms
+        self.state = {}
+        self.pending = {}
+        self.pending_since = None
+        self.ready = False
+        self.sequence = 0
+        self.in_flight = {}
+        self.last_flush = 0.0
+        self.latencies = deque(maxlen=100)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def post(self, kind, payload):
+        self.state[kind] = payload
+        self.pending[kind] = payload
+        if self.pending_since is None:
+            self.pending_since = time.perf_counter()
+        self.schedule()
+
+    def schedule(self):
+        if not self.ready or self.timer.isActive():
+            return
+        since = (time.perf_counter() - self.last_flush) * 1000
+        self.timer.start(max(0, int(self.frame_ms - since)))
+
+    # Same update methods as NativeMapView
+
+    def set_center(self, lat, lon, zoom=None):
+        self.post('view', {'lat': round(lat, 7), 'lon': round(lon, 7), 'zoom': zoom})
+
+    def set_destination(self, lat=None, lon=None):
+        self.post('destination', None if lat is None else [round(lat, 7), round(lon, 7)])
+
+    def set_route(self, coords):
+        self.post('route', [[round(lat, 6), round(lon, 6)] for lat, lon in coords or ()])
+
+    def set_position(self, lat, lon, heading=None):
+        self.post('position', {'lat': round(lat, 7), 'lon': round(lon, 7),
+                               'heading': None if heading is None else round(heading, 1)})
+
+    def set_overlays(self, overlays):
+        self.post('overlays', [[name, round(lat, 7), round(lon, 7)] for name, lat, lon in overlays])
+
+    def forget_missing(self, keys):
+        """Have the page reload tiles it showed as missing that have since been stored
+
+        Unlike the other kinds these accumulate until sent, and are not
+        part of the state: a reloaded page requests every tile anyway.
+        """
+        tiles = self.pending.setdefault('tiles', [])
+        tiles.extend(f"{z}/{x}/{y}" for z, x, y in keys)
+        if self.pending_since is None:
+            self.pending_since = time.perf_counter()
+        self.schedule()
+
+    def flush(self):
+        if not self.pending or not self.ready:
+            return
+        self.sequence += 1
+        message = dict(self.pending, seq=self.sequence)
+        self.in_flight[self.sequence] = self.pending_since
+        self.pending = {}
+        self.pending_since = None
+        self.last_flush = time.perf_counter()
+        self.batch.emit(json.dumps(message, separators=(',', ':')))
+
+    @pyqtSlot()
+    def pageReady(self):
+        """Page (re)loaded: send it the full current state"""
+        self.ready = True
+        self.in_flight.clear()
+        self.pending = dict(self.state)
+        if self.state:
+            self.pending_since = self.pending_since or time.perf_counter()
+        else:
+            self.pending_since = None
+        self.schedule()
+
+    @pyqtSlot(int)
+    def frameDrawn(self, seq):
+        """Page finished drawing batch seq"""
+        posted = self.in_flight.pop(seq, None)
+        # Older batches were superseded by this frame
+        for stale in [s for s in self.in_flight if s < seq]:
+            del self.in_flight[stale]
+        if posted is not None:
+            latency = (time.perf_counter() - posted) * 1000
+            self.latencies.append(latency)
+            logger.debug(f"Map batch {seq} drawn {latency:.1f} ms after the update")
+
+    @property
+    def last_latency_ms(self):
+        return self.latencies[-1] if self.latencies else None
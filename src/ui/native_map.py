@@ -0,0 +1,363 @@
+"""
+Native Map View - QPainter tile map, a lightweight alternative to QWebEngineView
+"""
+
+import math
+import time
+import threading
+import logging
+from collections import OrderedDict
+from PyQt5.QtWidgets import QWidget, QPushButton
+from PyQt5.QtCore import Qt, QObject, QPointF, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QImage, QColor, QPen, QBrush, QFont, QPolygonF
+from maps.tiles import TILE_SIZE, deg_to_tile, tile_to_deg
+
+logger = logging.getLogger(__name__)
+
+MIN_ZOOM = 3
+MAX_ZOOM = 20
+
+# Look a tile the store lacked up again after this long; the seeder runs as
+# a separate process and does not tell the map what it stored
+MISSING_RETRY_SECONDS = 30.0
+
+
+class TileLoader(QObject):
+    """Background thread reading and decoding tiles for NativeMapView
+
+    request() replaces the tiles still to load with the ones the view
+    wants now, so a fast pan leaves no backlog of tiles that scrolled
+    away. Each read is reported by loaded as (generation, key, image),
+    image None when the store does not have the tile; set_store() starts
+    a new generation so reads from the previous store can be told apart.
+    """
+
+    loaded = pyqtSignal(int, tuple, object)
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.generation = 0
+        self.queue = []
+        self.reading = None
+        self.running = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="map-tile-loader", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def request(self, keys):
+        """Load these (z, x, y) tiles, first ones first, in place of the previous request"""
+        with self.condition:
+            # The tile being read is reported anyway
+            self.queue = [key for key in keys if key != self.reading]
+            self.condition.notify()
+
+    def set_store(self, store):
+        with self.condition:
+            self.store = store
+            self.generation += 1
+            self.queue = []
+            # Its read is for the old store and will be discarded
+            self.reading = None
+
+    def idle(self):
+        """True once every requested tile has been read"""
+        with self.condition:
+            return not self.queue and self.reading is None
+
+    def run(self):
+        store = None
+        while True:
+            with self.condition:
+                self.reading = None
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                key = self.reading = self.queue.pop(0)
+                generation = self.generation
+                # Each thread has its own SQLite connection to the store
+                if store is not self.store:
+                    if store is not None:
+                        store.close()
+                    store = self.store
+
+            image = None
+            try:
+                data = store.get_tile(*key) if store else None
+            except Exception:
+                logger.exception(f"Error reading map tile {key}")
+                data = None
+            if data:
+                image = QImage.fromData(data)
+                if image.isNull():
+                    logger.warning(f"Undecodable map tile {key}")
+                    image = None
+            self.loaded.emit(generation, key, image)
+
+        with self.condition:
+            self.reading = None
+        if store is not None:
+            store.close()
+
+
+class NativeMapView(QWidget):
+    """Draws cached raster tiles plus course overlays with pan/zoom"""
+
+    def __init__(self, tile_store, center=(0.0, 0.0), zoom=17, max_tiles=96, parent=None):
+        super().__init__(parent)
+        self.tile_store = tile_store
+        self.center = center
+        self.zoom = zoom
+        self.destination = None
+        self.route = []
+        self.position = None
+        self.heading = None
+        self.overlays = []
+
+        # Decoded tiles, least recently used first, and when tiles the store
+        # did not have were looked up. Both are filled by the loader thread;
+        # painting only draws what is already here.
+        self.tiles = OrderedDict()
+        self.missing = OrderedDict()
+        self.max_tiles = max_tiles
+        self.loader = TileLoader(tile_store).start()
+        self.loader.loaded.connect(self.tile_loaded)
+        self.drag_start = None
+        self.last_frame_ms = 0.0
+
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setMinimumSize(200, 200)
+        self.create_zoom_buttons()
+
+    def create_zoom_buttons(self):
+        style = """
+            QPushButton {
+                background-color: rgba(42, 42, 42, 230);
+                color: white;
+                border: none;
+                border-radius: 10px;
+                font-size: 26px;
+            }
+            QPushButton:pressed {
+                background-color: rgba(70, 70, 70, 230);
+            }
+        """
+        self.zoom_buttons = []
+        for label, delta in (("+", 1), ("−", -1)):
+            btn = QPushButton(label, self)
+            btn.setFixedSize(48, 48)
+            btn.setStyleSheet(style)
+            btn.clicked.connect(lambda checked, d=delta: self.zoom_by(d))
+            self.zoom_buttons.append(btn)
+
+    def resizeEvent(self, event):
+        for i, btn in enumerate(self.zoom_buttons):
+            btn.move(self.width() - 58, 10 + i * 56)
+        super().resizeEvent(event)
+
+    # View state
+
+    def set_center(self, lat, lon, zoom=None):
+        self.center = (lat, lon)
+        if zoom is not None:
+            self.zoom = max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+        self.update()
+
+    def set_destination(self, lat=None, lon=None):
+        """Destination marker; no arguments clears it"""
+        self.destination = None if lat is None else (lat, lon)
+        self.update()
+
+    def set_route(self, coords):
+        """Route polyline to draw: [(lat, lon), ...]"""
+        self.route = list(coords)
+        self.update()
+
+    def set_position(self, lat, lon, heading=None):
+        """Move the live position marker"""
+        self.position = (lat, lon)
+        self.heading = heading
+        self.update()
+
+    def set_overlays(self, overlays):
+        """Course features to draw as labelled points: [(name, lat, lon), ...]"""
+        self.overlays = list(overlays)
+        self.update()
+
+    def zoom_by(self, delta):
+        self.set_center(*self.center, zoom=self.zoom + delta)
+
+    def set_tile_store(self, tile_store):
+        """Draw tiles from another store (the cart moved to another course)"""
+        self.tile_store = tile_store
+        self.loader.set_store(tile_store)
+        self.invalidate_tiles()
+
+    def invalidate_tiles(self):
+        """Forget decoded tiles, e.g. after the tile store was updated"""
+        self.tiles.clear()
+        self.missing.clear()
+        self.update()
+
+    def forget_missing(self, keys):
+        """Load tiles found missing earlier that have since been stored"""
+        dropped = False
+        for key in keys:
+            if self.missing.pop(key, None) is not None:
+                dropped = True
+        if dropped:
+            self.update()
+
+    def stop_loading(self):
+        """Stop the tile loader thread"""
+        self.loader.stop()
+
+    # Projection
+
+    def world_origin(self):
+        """World pixel coordinates of the widget's top-left corner"""
+        x, y = deg_to_tile(*self.center, self.zoom)
+        return x * TILE_SIZE - self.width() / 2, y * TILE_SIZE - self.height() / 2
+
+    def to_screen(self, lat, lon, origin):
+        x, y = deg_to_tile(lat, lon, self.zoom)
+        return QPointF(x * TILE_SIZE - origin[0], y * TILE_SIZE - origin[1])
+
+    def tile_pixmap(self, z, x, y):
+        """Decoded tile, or None while it is not loaded"""
+        key = (z, x, y)
+        pixmap = self.tiles.get(key)
+        if pixmap is not None:
+            self.tiles.move_to_end(key)
+        return pixmap
+
+    def wants_tile(self, key, now):
+        """True unless the tile was found missing less than MISSING_RETRY_SECONDS ago"""
+        checked = self.missing.get(key)
+        return checked is None or now - checked >= MISSING_RETRY_SECONDS
+
+    def tile_loaded(self, generation, key, image):
+        if generation != self.loader.generation:
+            return
+        if image is None:
+            self.missing[key] = time.monotonic()
+            self.missing.move_to_end(key)
+            if len(self.missing) > self.max_tiles:
+                self.missing.popitem(last=False)
+            return
+        self.missing.pop(key, None)
+        self.tiles[key] = QPixmap.fromImage(image)
+        self.tiles.move_to_end(key)
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        # Repaints requested while tiles stream in are merged by Qt
+        self.update()
+
+    # Painting
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1a1f2e"))
+
+        origin = self.world_origin()
+        last = 2 ** self.zoom - 1
+        first_x = math.floor(origin[0] / TILE_SIZE)
+        first_y = math.floor(origin[1] / TILE_SIZE)
+        last_x = math.floor((origin[0] + self.width()) / TILE_SIZE)
+        last_y = math.floor((origin[1] + self.height()) / TILE_SIZE)
+
+        wanted = []
+        now = time.monotonic()
+        for tx in range(max(0, first_x), min(last, last_x) + 1):
+            for ty in range(max(0, first_y), min(last, last_y) + 1):
+                left = round(tx * TILE_SIZE - origin[0])
+                top = round(ty * TILE_SIZE - origin[1])
+                pixmap = self.tile_pixmap(self.zoom, tx, ty)
+                if pixmap is not None:
+                    painter.drawPixmap(left, top, pixmap)
+                    continue
+                painter.fillRect(left, top, TILE_SIZE, TILE_SIZE, QColor("#232a3b"))
+                painter.setPen(QColor("#2a3142"))
+                painter.drawRect(left, top, TILE_SIZE, TILE_SIZE)
+                if self.wants_tile((self.zoom, tx, ty), now):
+                    wanted.append((self.zoom, tx, ty))
+        # Loaded off the paint path; each tile repaints the view as it arrives
+        if wanted:
+            self.loader.request(wanted)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_overlays(painter, origin)
+        painter.end()
+        self.last_frame_ms = (time.perf_counter() - start) * 1000
+
+    def draw_overlays(self, painter, origin):
+        if len(self.route) > 1:
+            painter.setPen(QPen(QColor(74, 158, 255, 200), 6, Qt.SolidLine, Qt.RoundCap,
+                                Qt.RoundJoin))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPolyline(QPolygonF([self.to_screen(lat, lon, origin)
+                                            for lat, lon in self.route]))
+
+        painter.setFont(QFont("Arial", 11))
+        for name, lat, lon in self.overlays:
+            point = self.to_screen(lat, lon, origin)
+            painter.setPen(QPen(Qt.white, 2))
+            painter.setBrush(QBrush(QColor("#30D158")))
+            painter.drawEllipse(point, 6, 6)
+            painter.drawText(point + QPointF(10, 5), name)
+
+        if self.destination:
+            point = self.to_screen(*self.destination, origin)
+            painter.setPen(QPen(Qt.white, 3))
+            painter.setBrush(QBrush(QColor("#FC3C44")))
+            painter.drawEllipse(point, 9, 9)
+
+        if self.position:
+            point = self.to_screen(*self.position, origin)
+            if self.heading is not None:
+                # Heading wedge pointing along the direction of travel
+                painter.save()
+                painter.translate(point)
+                painter.rotate(self.heading)
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QBrush(QColor(74, 158, 255, 120)))
+                painter.drawPolygon(QPolygonF([QPointF(0, -26), QPointF(-10, -6), QPointF(10, -6)]))
+                painter.restore()
+            painter.setPen(QPen(Qt.white, 3))
+            painter.setBrush(QBrush(QColor("#4a9eff")))
+            painter.drawEllipse(point, 8, 8)
+
+    # Interaction
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.drag_start = (event.pos(), self.world_origin())
+
+    def mouseMoveEvent(self, event):
+        if self.drag_start is None:
+            return
+        pos, origin = self.drag_start
+        delta = event.pos() - pos
+        center_x = origin[0] - delta.x() + self.width() / 2
+        center_y = origin[1] - delta.y() + self.height() / 2
+        self.set_center(*tile_to_deg(center_x / TILE_SIZE, center_y / TILE_SIZE, self.zoom))
+
+    def mouseReleaseEvent(self, event):
+        self.drag_start = None
+
+    def wheelEvent(self, event):
+        self.zoom_by(1 if event.angleDelta().y() > 0 else -1)
@@ -0,0 +1,105 @@
+"""
+Render Cache - Shared pixmap cache for custom-painted widgets
+"""
+
+from collections import OrderedDict
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QPixmap, QPainter, QGradient
+from PyQt5.QtCore import Qt
+
+
+def gradient_key(gradient):
+    """Hashable description of a QGradient for cache keys
+
+    Built from the gradient's geometry, stops and colors: an id() could be
+    reused by another gradient once the first one is garbage collected.
+    """
+    if gradient is None:
+        return None
+    kind = gradient.type()
+    if kind == QGradient.LinearGradient:
+        start, stop = gradient.start(), gradient.finalStop()
+        geometry = (start.x(), start.y(), stop.x(), stop.y())
+    elif kind == QGradient.RadialGradient:
+        center, focal = gradient.center(), gradient.focalPoint()
+        geometry = (center.x(), center.y(), gradient.radius(), focal.x(), focal.y(),
+                    gradient.focalRadius())
+    elif kind == QGradient.ConicalGradient:
+        center = gradient.center()
+        geometry = (center.x(), center.y(), gradient.angle())
+    else:
+        geometry = ()
+    stops = tuple((position, color.rgba()) for position, color in gradient.stops())
+    return (kind, geometry, gradient.spread(), gradient.coordinateMode(), stops)
+
+
+class RenderCache:
+    """LRU cache of pre-rendered widget pixmaps
+
+    Entries are keyed by (widget kind, size, state, device pixel ratio) and
+    the whole cache is dropped when the theme or application palette changes.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.theme = None
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.watching_palette = False
+
+    def set_theme(self, theme):
+        """Flush cached renders when the main window applies another theme"""
+        if theme != self.theme:
+            self.theme = theme
+            self.clear()
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def pixmap(self, kind, width, height, state, dpr, render):
+        """Return the cached render, calling render(painter, width, height) on a miss"""
+        if not self.watching_palette:
+            app = QApplication.instance()
+            if app is not None:
+                app.paletteChanged.connect(self.clear)
+                self.watching_palette = True
+
+        key = (kind, width, height, state, dpr)
+        pixmap = self.entries.get(key)
+        if pixmap is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return pixmap
+
+        self.misses += 1
+        pixmap = QPixmap(round(width * dpr), round(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        render(painter, width, height)
+        painter.end()
+
+        self.entries[key] = pixmap
+        self.total_bytes += pixmap.width() * pixmap.height() * 4
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.width() * evicted.height() * 4
+        return pixmap
+
+    def paint(self, widget, kind, state, render):
+        """Blit a widget's cached render (used from paintEvent)"""
+        painter = QPainter(widget)
+        width, height = widget.width(), widget.height()
+        if not self.enabled:
+            render(painter, width, height)
+            return
+        dpr = widget.devicePixelRatioF()
+        painter.drawPixmap(0, 0, self.pixmap(kind, width, height, state, dpr, render))
+
+
+# Shared by all custom-painted widgets
+render_cache = RenderCache()
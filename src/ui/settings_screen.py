@@ -396,6 +396,7 @@ class SettingsScreen(QWidget):
         
         # Save to file
         self.parent.save_settings()
+        self.parent.apply_theme()
         
         # Return to home
         self.parent.show_screen('home')
@@ -404,6 +405,7 @@ class SettingsScreen(QWidget):
         """Reset all settings to defaults"""
         self.parent.settings = self.parent.get_default_settings()
         self.parent.save_settings()
+        self.parent.apply_theme()
         # Refresh UI
         self.parent.show_screen('settings')
         
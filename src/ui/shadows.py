@@ -0,0 +1,167 @@
+"""
+Cached nine-patch drop shadows for custom-painted cards
+"""
+
+import math
+from PyQt5.QtWidgets import (QFrame, QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect,
+                             QProxyStyle, QStyle)
+from PyQt5.QtCore import Qt, QEvent, QRect, QRectF
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QPainterPath, QColor, qAlpha
+
+# (radius, blur, rgba, dpr) -> (pixmap, corner px, outset px)
+_patches = {}
+
+
+def _build_patch(radius, blur, rgba, dpr):
+    """Blur a rounded rect once into a nine-patch with a 1px stretchable center"""
+    r = radius * dpr
+    b = blur * dpr
+    # Middle row/column must sit beyond the corner curve plus the blur reach
+    corner = math.ceil(r + 2 * b)
+    side = 2 * corner + 1
+
+    body = QPixmap(side, side)
+    body.fill(Qt.transparent)
+    painter = QPainter(body)
+    painter.setRenderHint(QPainter.Antialiasing)
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(b, b, side - 2 * b, side - 2 * b), r, r)
+    painter.fillPath(path, QColor.fromRgba(rgba))
+    painter.end()
+
+    # Same blur QGraphicsDropShadowEffect applies, but run a single time
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(body)
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(b)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    image = QImage(side, side, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(0, 0, side, side), QRectF(0, 0, side, side))
+    painter.end()
+
+    # Drop fully transparent rows/columns so repaints cover only what shows
+    trim = 0
+    while trim < corner and qAlpha(image.pixel(corner, trim)) == 0:
+        trim += 1
+    image = image.copy(trim, trim, side - 2 * trim, side - 2 * trim)
+
+    pixmap = QPixmap.fromImage(image)
+    return pixmap, corner - trim, math.ceil(b) - trim
+
+
+class NinePatchShadow:
+    """Drop shadow stretched from a cached nine-patch
+
+    The blur is computed once per (radius, blur, color, dpr) and painted
+    by the widget itself, instead of rendering it offscreen through a
+    QGraphicsEffect on every repaint.
+    """
+
+    def __init__(self, radius, blur, offset=(0, 0), color=QColor(0, 0, 0, 60)):
+        self.radius = radius
+        self.blur = blur
+        self.offset = offset
+        self.rgba = QColor(color).rgba()
+
+    def patch(self, dpr=1.0):
+        key = (self.radius, self.blur, self.rgba, dpr)
+        if key not in _patches:
+            _patches[key] = _build_patch(self.radius, self.blur, self.rgba, dpr)
+        return _patches[key]
+
+    def margins(self, dpr=1.0):
+        """(left, top, right, bottom) logical pixels the shadow reaches past the body"""
+        _, _, outset = self.patch(dpr)
+        out = math.ceil(outset / dpr)
+        dx, dy = self.offset
+        return max(0, out - dx), max(0, out - dy), max(0, out + dx), max(0, out + dy)
+
+    def paint(self, painter, body):
+        """Draw the shadow for a body rect (logical pixels)"""
+        dpr = painter.device().devicePixelRatioF()
+        pixmap, corner, outset = self.patch(dpr)
+
+        dx, dy = self.offset
+        out = outset / dpr
+        target = QRectF(body).translated(dx, dy).adjusted(-out, -out, out, out)
+        c = corner / dpr
+        size = pixmap.width()
+
+        xs = (target.left(), target.left() + c, target.right() - c, target.right())
+        ys = (target.top(), target.top() + c, target.bottom() - c, target.bottom())
+        src = (0, corner, corner + 1, size)
+        for row in range(3):
+            for col in range(3):
+                painter.drawPixmap(
+                    QRectF(xs[col], ys[row], xs[col + 1] - xs[col], ys[row + 1] - ys[row]),
+                    pixmap,
+                    QRectF(src[col], src[row], src[col + 1] - src[col], src[row + 1] - src[row])
+                )
+
+
+class ShadowStyle(QProxyStyle):
+    """Reports a ShadowedFrame's body as its layout item rect
+
+    Layouts then give the body the space they would give the card, and the
+    widget reaches past it by the shadow margins to paint the shadow.
+    """
+
+    def subElementRect(self, element, option, widget):
+        if element == QStyle.SE_FrameLayoutItem and isinstance(widget, ShadowedFrame):
+            left, top, right, bottom = widget.shadow_margins()
+            return QRect(option.rect).adjusted(left, top, -right, -bottom)
+        return super().subElementRect(element, option, widget)
+
+
+_style = None
+
+
+def shadow_style():
+    global _style
+    if _style is None:
+        _style = ShadowStyle()
+    return _style
+
+
+class ShadowedFrame(QFrame):
+    """Card that paints its own nine-patch shadow around its body
+
+    The body is contentsRect(); subclasses paint it after paint_shadow().
+    Sizes set with set_body_height() / set_body_minimum_width() refer to
+    the body, as a layout sees it.
+    """
+
+    def __init__(self, shadow, parent=None):
+        super().__init__(parent)
+        self.shadow = shadow
+        self.setStyle(shadow_style())
+        self.setContentsMargins(*self.shadow_margins())
+
+    def shadow_margins(self):
+        return self.shadow.margins(self.devicePixelRatioF())
+
+    def body_rect(self, width, height):
+        left, top, right, bottom = self.shadow_margins()
+        return QRectF(left, top, width - left - right, height - top - bottom)
+
+    def set_body_height(self, height):
+        _, top, _, bottom = self.shadow_margins()
+        self.setFixedHeight(height + top + bottom)
+
+    def set_body_minimum_width(self, width):
+        left, _, right, _ = self.shadow_margins()
+        self.setMinimumWidth(width + left + right)
+
+    def paint_shadow(self, painter, width, height):
+        self.shadow.paint(painter, self.body_rect(width, height))
+
+    def event(self, event):
+        handled = super().event(event)
+        if event.type() in (QEvent.Polish, QEvent.StyleChange):
+            # A stylesheet background would fill the shadow margins too
+            self.setAttribute(Qt.WA_StyledBackground, False)
+        return handled
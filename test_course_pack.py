@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Test course packs: round trip, lazy hole loading, validation and course selection"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from course.course_pack import (CoursePack, hole_section, open_packs, pack_for_position,
+                                validate_pack, write_pack)
+from course.poi_search import pois_from_course
+from course.routing import PathGraph
+from synthetic_course import generate_course
+
+COURSE = course_from_geojson(generate_course(9))
+
+
+def test_pack_round_trips_the_course(tmp_path):
+    path = write_pack(COURSE, str(tmp_path / 'links.cpk'), {'mbtiles': 'links.mbtiles'})
+    with CoursePack(path) as pack:
+        course = pack.course()
+        assert course.name == COURSE.name and course.holes == COURSE.holes
+        assert course.destinations() == COURSE.destinations()
+        assert pack.meta['tiles'] == {'mbtiles': 'links.mbtiles'}
+        for hole in COURSE.holes:
+            course.load_hole(hole)
+        assert sorted(f[:6] for f in course.features) == sorted(f[:6] for f in COURSE.features)
+
+        graph = pack.path_graph()
+        original = PathGraph.from_course(COURSE)
+        assert graph.nodes == original.nodes and graph.edges == original.edges
+        assert pack.pois(course.projection) == pois_from_course(COURSE)
+
+
+def test_holes_load_on_demand(tmp_path):
+    path = write_pack(COURSE, str(tmp_path / 'links.cpk'))
+    with CoursePack(path) as pack:
+        course = pack.course()
+        assert not [f for f in course.features if f.kind == 'tee']
+        tees = course.features_for_hole(3, 'tee')
+        assert [f.name for f in tees] == [f.name for f in COURSE.features_for_hole(3, 'tee')]
+        assert course.loaded == {3}
+        assert {f.hole for f in course.features if f.kind == 'tee'} == {3}
+
+
+def test_validation_finds_damage(tmp_path):
+    path = write_pack(COURSE, str(tmp_path / 'links.cpk'))
+    assert validate_pack(path) == []
+
+    with CoursePack(path) as pack:
+        offset, length, _, _ = pack.index[hole_section(5)]
+    data = bytearray(open(path, 'rb').read())
+    data[offset + length // 2] ^= 0xFF
+    damaged = tmp_path / 'damaged.cpk'
+    damaged.write_bytes(bytes(data))
+    problems = validate_pack(str(damaged))
+    assert problems and "'hole/5'" in problems[0]
+
+    truncated = tmp_path / 'truncated.cpk'
+    truncated.write_bytes(bytes(data[:len(data) // 2]))
+    with pytest.raises(ValueError):
+        CoursePack(str(truncated))
+    assert validate_pack(str(truncated))
+
+
+def test_first_fix_picks_the_nearest_course(tmp_path):
+    for name, origin in (('north', (36.5, -79.0)), ('south', (35.0, -80.0))):
+        course = course_from_geojson(generate_course(4, origin=origin, name=name.title()))
+        write_pack(course, str(tmp_path / f'{name}.cpk'))
+    (tmp_path / 'junk.cpk').write_bytes(b"not a pack")
+
+    packs = open_packs(str(tmp_path))
+    try:
+        assert [p.slug for p in packs] == ['north', 'south']
+        assert pack_for_position(packs, 35.0005, -80.0005).name == 'South'
+        assert pack_for_position(packs, 36.5, -79.0).name == 'North'
+        assert pack_for_position(packs, 40.0, -75.0) is None
+    finally:
+        for pack in packs:
+            pack.close()
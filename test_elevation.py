@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test memory-mapped DEM lookups across file layouts and the plays-like yardages"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from course.elevation import Dem, PlaysLikeEngine, write_geotiff
+from synthetic_course import generate_course
+from course.yardage import YardageEngine
+
+PIXEL = 0.0001
+NORTH, WEST = 35.78, -78.64
+
+
+def plane(rows, cols):
+    """Heights rising 0.5 m per pixel east and 0.25 m per pixel south"""
+    r, c = np.mgrid[0:rows, 0:cols]
+    return (50 + 0.5 * c + 0.25 * r).astype(np.float32)
+
+
+def expected(lats, lons):
+    return 50 + 0.5 * (lons - WEST) / PIXEL + 0.25 * (NORTH - lats) / PIXEL
+
+
+def test_geotiff_strips_and_tiles_match_plane(tmp_path):
+    rng = np.random.default_rng(3)
+    lats = NORTH - rng.uniform(0, 99, 500) * PIXEL
+    lons = WEST + rng.uniform(0, 129, 500) * PIXEL
+    for tile in (None, 32):
+        path = str(tmp_path / f"dem-{tile}.tif")
+        # Corner-tied area pixels: the first sample's center is half a pixel in
+        write_geotiff(path, plane(100, 130), WEST - PIXEL / 2, NORTH + PIXEL / 2, PIXEL, tile=tile)
+        dem = Dem.open(path)
+        assert (dem.width, dem.height) == (130, 100)
+        assert np.allclose(dem.heights(lats, lons), expected(lats, lons), atol=1e-3)
+
+    assert np.isnan(dem.heights([NORTH + 0.01], [WEST])[0])
+    assert dem.height_at(NORTH, WEST - 0.01) is None
+
+
+def test_nodata_is_nan(tmp_path):
+    heights = plane(20, 20)
+    heights[5, 5] = -9999
+    path = str(tmp_path / "holes.tif")
+    write_geotiff(path, heights, WEST - PIXEL / 2, NORTH + PIXEL / 2, PIXEL, nodata=-9999)
+    dem = Dem.open(path)
+    near, far = dem.heights([NORTH - 5.5 * PIXEL, NORTH - 12 * PIXEL],
+                            [WEST + 5.5 * PIXEL, WEST + 12 * PIXEL])
+    assert np.isnan(near) and abs(far - (50 + 6 + 3)) < 1e-3
+
+
+def test_hgt_and_bil(tmp_path):
+    heights = (np.arange(11 * 11).reshape(11, 11) * 2).astype('>i2')
+    hgt = tmp_path / "N35W079.hgt"
+    heights.tofile(str(hgt))
+    dem = Dem.open(str(hgt))
+    # Row 0 is the north edge (36N), column 0 the west edge (79W)
+    assert dem.height_at(36.0, -79.0) == 0
+    assert dem.height_at(35.0, -78.0) == 240
+    assert abs(dem.height_at(35.95, -78.95) - 12.0) < 1e-6
+
+    bil = tmp_path / "course.bil"
+    heights.astype('<i2').tofile(str(bil))
+    (tmp_path / "course.hdr").write_text(
+        "BYTEORDER I\nNROWS 11\nNCOLS 11\nNBITS 16\nPIXELTYPE SIGNEDINT\n"
+        "ULXMAP -79.0\nULYMAP 36.0\nXDIM 0.1\nYDIM 0.1\nNODATA -32768\n")
+    other = Dem.open(str(bil))
+    lats, lons = np.array([35.5, 35.13]), np.array([-78.4, -78.77])
+    assert np.allclose(other.heights(lats, lons), dem.heights(lats, lons))
+
+
+def test_uphill_green_plays_longer(tmp_path):
+    course = course_from_geojson(generate_course(2))
+    yardage = YardageEngine(course)
+    green = next(f for f in course.features if f.kind == 'green_middle' and f.hole == 1)
+    tee = next(f for f in course.features if f.kind == 'tee' and f.hole == 1)
+    tee_lat, tee_lon = tee.anchor
+    green_lat, green_lon = green.anchor
+
+    # Ground rising 10 m from the tee towards the green
+    south, north = min(tee_lat, green_lat) - 0.005, max(tee_lat, green_lat) + 0.005
+    west, east = min(tee_lon, green_lon) - 0.005, max(tee_lon, green_lon) + 0.005
+    rows, cols = int((north - south) / PIXEL) + 1, int((east - west) / PIXEL) + 1
+    lat_grid = north - np.arange(rows)[:, None] * PIXEL
+    lon_grid = west + np.arange(cols)[None, :] * PIXEL
+    along = ((lat_grid - tee_lat) * (green_lat - tee_lat) + (lon_grid - tee_lon) * (green_lon - tee_lon))
+    along /= (green_lat - tee_lat) ** 2 + (green_lon - tee_lon) ** 2
+    path = str(tmp_path / "slope.tif")
+    write_geotiff(path, 100 + 10 * along, west, north, PIXEL)
+
+    engine = PlaysLikeEngine(yardage, Dem.open(path))
+    plain = yardage.green_yards(tee_lat, tee_lon, 1)[1]
+    adjusted = engine.green_yards(tee_lat, tee_lon, 1)[1]
+    assert abs(adjusted - plain - 10 / 0.9144) < 0.5
+    # Standing on the green, the front edge is downhill
+    front, middle, _ = engine.green_yards(green_lat, green_lon, 1)
+    assert front < yardage.green_yards(green_lat, green_lon, 1)[0] and abs(middle) < 0.5
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test the geofence grid against brute-force point-in-polygon and the dwell hysteresis"""
+
+import os
+import sys
+import math
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from course.geo import point_in_polygon
+from course.geofence import (Geofence, GeofenceGrid, GeofenceMonitor, buffer_polygon,
+                             fences_from_course, ENTER, EXIT)
+from synthetic_course import generate_course
+
+
+def star(rng, cx, cy, radius, sides):
+    """Random concave polygon around (cx, cy)"""
+    return [(cx + radius * rng.uniform(0.3, 1.0) * math.cos(2 * math.pi * i / sides),
+             cy + radius * rng.uniform(0.3, 1.0) * math.sin(2 * math.pi * i / sides))
+            for i in range(sides)]
+
+
+def test_grid_matches_brute_force():
+    rng = random.Random(5)
+    fences = [Geofence(i, f"zone {i}", 'restricted', None,
+                       star(rng, rng.uniform(0, 600), rng.uniform(0, 600),
+                            rng.uniform(8, 90), rng.randint(3, 24)))
+              for i in range(150)]
+    grid = GeofenceGrid(fences, cell_size=12.0)
+    for _ in range(20000):
+        x, y = rng.uniform(-40, 640), rng.uniform(-40, 640)
+        expected = [f.index for f in fences if point_in_polygon(x, y, f.points)]
+        assert sorted(grid.query(x, y)) == expected
+
+
+def test_buffer_grows_greens_outwards():
+    square = [(0, 0), (20, 0), (20, 20), (0, 20)]
+    for ring in (square, square[::-1]):
+        grown = buffer_polygon(ring, 5.0)
+        assert point_in_polygon(-4, 10, grown) and point_in_polygon(10, 24, grown)
+        assert not point_in_polygon(-6, 10, grown)
+
+
+def test_course_fences():
+    course = course_from_geojson(generate_course(4))
+    kinds = [f.kind for f in fences_from_course(course)]
+    assert kinds.count('no_cart') == 4
+    assert kinds.count('hole') == 4
+    assert kinds.count('clubhouse') == 1
+
+
+def test_enter_and_exit_need_dwell():
+    fence = Geofence(0, "Green 1", 'no_cart', 1, [(0, 0), (30, 0), (30, 30), (0, 30)])
+    monitor = GeofenceMonitor(GeofenceGrid([fence]), dwell=3.0)
+    seen = []
+    monitor.subscribe(seen.append)
+
+    assert monitor.update(-5, 10, 0.0) == []
+    # A two-second excursion (GPS jitter) is ignored
+    monitor.update(5, 10, 1.0)
+    monitor.update(5, 10, 3.0)
+    monitor.update(-5, 10, 3.5)
+    assert seen == [] and monitor.active() == []
+
+    monitor.update(5, 10, 4.0)
+    monitor.update(6, 10, 6.0)
+    events = monitor.update(7, 10, 7.0)
+    assert [(e.type, e.fence.name) for e in events] == [(ENTER, "Green 1")]
+    assert seen == events and monitor.active(['no_cart']) == [fence]
+
+    monitor.update(40, 10, 8.0)
+    assert monitor.update(40, 10, 11.0)[0].type == EXIT
+    assert monitor.active() == []
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test GPS replay from NMEA/GPX/.trk recordings and the fake gpsd server"""
+
+import os
+import sys
+import time
+import math
+import socket
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from gps.fix import GpsFix
+from gps.gpsd_client import GpsdClient
+from gps.nmea_reader import nmea_checksum
+from gps.replay import FakeGpsdServer, ReplaySource, load_recording
+from gps.track_recorder import TrackRecorder, export_gpx
+
+
+def sentence(body):
+    data = body.encode()
+    return b"$" + data + b"*%02X\r\n" % nmea_checksum(data, 0, len(data))
+
+
+def nmea_log(path, seconds, start="235958"):
+    """RMC+GGA pairs once a second, starting just before midnight UTC"""
+    h, m, s = int(start[:2]), int(start[2:4]), int(start[4:])
+    with open(path, 'wb') as f:
+        f.write(b"garbage before the first sentence\n")
+        for i in range(seconds):
+            total = (h * 3600 + m * 60 + s + i) % 86400
+            stamp = f"{total // 3600:02d}{total // 60 % 60:02d}{total % 60:02d}.00"
+            minutes = 47.0 + i * 0.01
+            f.write(sentence(f"GPRMC,{stamp},A,3546.{int(minutes * 100):04d},N,07838.292,W,"
+                             f"9.7,90.0,040524,,,A"))
+            f.write(sentence(f"GPGGA,{stamp},3546.{int(minutes * 100):04d},N,07838.292,W,"
+                             f"1,09,0.8,96.0,M,-33.0,M,,"))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_nmea_log_timing_crosses_midnight(tmp_path):
+    path = str(tmp_path / "round.nmea")
+    nmea_log(path, 5)
+    fixes = load_recording(path)
+    # One fix per epoch, merging its RMC and GGA
+    assert len(fixes) == 5
+    times = [fix.received for fix in fixes]
+    assert [t - times[0] for t in times] == [0, 1, 2, 3, 4]
+    assert fixes[0].hdop == 0.8 and fixes[0].satellites == 9 and fixes[0].mode == 3
+    assert math.isclose(fixes[0].speed, 9.7 * 0.514444)
+
+
+def test_gpx_and_trk_recordings(tmp_path):
+    recorder = TrackRecorder(str(tmp_path / "cart.trk"), capacity=100)
+    for i in range(20):
+        recorder.record(GpsFix(0.0, 35.78 + i * 3e-5, -78.638, 3.3, None, None, 3, 7, 1.2),
+                        when=1714800000.0 + i)
+    track = recorder.read_range()
+    recorder.close()
+    with open(tmp_path / "round.gpx", 'w') as out:
+        export_gpx(track, out)
+
+    for name in ("cart.trk", "round.gpx"):
+        fixes = load_recording(str(tmp_path / name))
+        assert len(fixes) == 20
+        assert fixes[-1].received - fixes[0].received == 19
+        assert math.isclose(fixes[5].speed, 3.3)
+        # Heading derived from the positions: due north
+        assert math.isclose(fixes[5].track, 0.0, abs_tol=1e-6)
+
+
+def test_replay_source_accelerated(tmp_path):
+    path = str(tmp_path / "round.nmea")
+    nmea_log(path, 30)
+    source = ReplaySource(path, speed=100, loop=False).start()
+    try:
+        started = time.monotonic()
+        assert wait_for(lambda: source.published == 30)
+        # 29 recorded seconds at 100x
+        assert 0.25 <= time.monotonic() - started < 2.0
+        assert source.latest() is not None and source.fix_age() < 1.0
+    finally:
+        source.stop()
+
+
+def test_stalled_client_does_not_hold_up_replay(tmp_path):
+    path = str(tmp_path / "round.nmea")
+    nmea_log(path, 10)
+    server = FakeGpsdServer(load_recording(path), speed=0, loop=True, send_timeout=0.2).start()
+    # Asks for reports, then never reads them
+    stalled = socket.create_connection(('127.0.0.1', server.port))
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    stalled.sendall(b'?WATCH={"enable":true,"json":true};\n')
+    client = GpsdClient('127.0.0.1', server.port).start()
+    try:
+        assert wait_for(lambda: len(server.clients) == 2)
+        assert wait_for(lambda: len(server.clients) == 1)
+        reports = client.reports
+        assert wait_for(lambda: client.reports > reports + 100)
+    finally:
+        client.stop()
+        server.stop()
+        stalled.close()
+
+
+def test_fake_gpsd_drives_gpsd_client(tmp_path):
+    path = str(tmp_path / "round.nmea")
+    nmea_log(path, 10)
+    fixes = load_recording(path)
+    server = FakeGpsdServer(fixes, speed=0, loop=True).start()
+    client = GpsdClient('127.0.0.1', server.port).start()
+    try:
+        assert wait_for(lambda: client.reports >= 50)
+        seen = []
+        assert wait_for(lambda: seen.append(client.latest()) or seen[-1].mode == 3)
+        fix = seen[-1]
+        assert fix.hdop == 0.8 and fix.satellites == 9
+        assert 35.77 < fix.lat < 35.78
+    finally:
+        client.stop()
+        server.stop()
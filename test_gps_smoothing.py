@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Test GPS smoothing on synthetic noisy tracks"""
+
+import os
+import sys
+import math
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from gps.fix import GpsFix
+from gps.smoothing import GpsSmoother, EARTH_RADIUS_M
+
+ORIGIN = (35.7796, -78.6382)
+METERS_PER_LON = EARTH_RADIUS_M * math.cos(math.radians(ORIGIN[0]))
+
+
+def to_latlon(east, north):
+    return (ORIGIN[0] + math.degrees(north / EARTH_RADIUS_M),
+            ORIGIN[1] + math.degrees(east / METERS_PER_LON))
+
+
+def to_meters(lat, lon):
+    return (math.radians(lon - ORIGIN[1]) * METERS_PER_LON,
+            math.radians(lat - ORIGIN[0]) * EARTH_RADIUS_M)
+
+
+def cart_path(seconds=120, rate=10):
+    """True (time, east, north, speed, track): straight, 90 degree turn, stop"""
+    truth = []
+    east = north = 0.0
+    dt = 1.0 / rate
+    for i in range(seconds * rate):
+        t = i * dt
+        speed = 5.0 if t < 100 else 0.0
+        track = 0.0 if t < 50 else min(90.0, (t - 50) * 18)
+        truth.append((t, east, north, speed, track))
+        east += speed * math.sin(math.radians(track)) * dt
+        north += speed * math.cos(math.radians(track)) * dt
+    return truth
+
+
+def noisy_fixes(truth, position_sigma=5.0, speed_sigma=1.2, seed=1):
+    rng = random.Random(seed)
+    fixes = []
+    for t, east, north, speed, track in truth:
+        lat, lon = to_latlon(east + rng.gauss(0, position_sigma),
+                             north + rng.gauss(0, position_sigma))
+        fixes.append(GpsFix(t, lat, lon, max(0.0, speed + rng.gauss(0, speed_sigma)),
+                            track, 90.0, 3, 8))
+    return fixes
+
+
+def position_rms(fixes, truth):
+    total = 0.0
+    for fix, (_, east, north, _, _) in zip(fixes, truth):
+        fe, fn = to_meters(fix.lat, fix.lon)
+        total += (fe - east) ** 2 + (fn - north) ** 2
+    return math.sqrt(total / len(fixes))
+
+
+def speed_rms(fixes, truth):
+    return math.sqrt(sum((fix.speed - t[3]) ** 2 for fix, t in zip(fixes, truth)) / len(fixes))
+
+
+def test_reduces_position_and_speed_jitter():
+    truth = cart_path()
+    raw = noisy_fixes(truth)
+    smoothed = GpsSmoother().filter_track(raw)
+
+    # Skip the first seconds while the filter converges
+    assert position_rms(smoothed[50:], truth[50:]) < 0.5 * position_rms(raw[50:], truth[50:])
+    assert speed_rms(smoothed[50:], truth[50:]) < 0.5 * speed_rms(raw[50:], truth[50:])
+
+
+def test_follows_turns_without_lagging_far_behind():
+    truth = cart_path()
+    smoothed = GpsSmoother().filter_track(noisy_fixes(truth, seed=2))
+    for fix, (_, east, north, _, _) in list(zip(smoothed, truth))[100:]:
+        fe, fn = to_meters(fix.lat, fix.lon)
+        assert math.hypot(fe - east, fn - north) < 10.0
+
+
+def test_stationary_cart_reads_near_zero_speed():
+    truth = [(i / 10, 0.0, 0.0, 0.0, 0.0) for i in range(300)]
+    smoothed = GpsSmoother().filter_track(noisy_fixes(truth, speed_sigma=0.8, seed=3))
+    speeds = [fix.speed for fix in smoothed[100:]]
+    assert max(speeds) < 1.0
+
+
+def test_fixes_without_position_pass_through():
+    smoother = GpsSmoother()
+    no_fix = GpsFix(0.0, None, None, None, None, None, 1, 0)
+    assert smoother.update(no_fix) is no_fix
+    first = GpsFix(1.0, *ORIGIN, 2.0, 45.0, 90.0, 3, 8)
+    assert smoother.update(first) is first
+
+
+def test_restarts_after_signal_gap():
+    smoother = GpsSmoother(max_gap=5.0)
+    smoother.update(GpsFix(0.0, *ORIGIN, 0.0, 0.0, 90.0, 3, 8))
+    far = to_latlon(500.0, 500.0)
+    fix = smoother.update(GpsFix(60.0, *far, 3.0, 10.0, 90.0, 3, 8))
+    # A new track starts at the new fix instead of being pulled toward the old one
+    assert (fix.lat, fix.lon) == far
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Test the streaming gpsd client against a local fake gpsd"""
+
+import os
+import sys
+import json
+import time
+import socket
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from gps.gpsd_client import GpsdClient
+
+
+class FakeGpsd:
+    """Accepts one client at a time and records the commands it sends"""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.client = None
+        self.commands = []
+        self.connections = 0
+
+    def accept(self, timeout=5.0):
+        self.server.settimeout(timeout)
+        self.client, _ = self.server.accept()
+        self.connections += 1
+        self.client.settimeout(timeout)
+        self.commands.append(self.client.recv(1024))
+        self.send({'class': 'VERSION', 'release': '3.22'})
+
+    def send(self, report):
+        self.client.sendall(json.dumps(report).encode() + b"\n")
+
+    def send_raw(self, data):
+        self.client.sendall(data)
+
+    def drop(self):
+        self.client.close()
+        self.client = None
+
+    def close(self):
+        if self.client:
+            self.client.close()
+        self.server.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+TPV = {'class': 'TPV', 'mode': 3, 'lat': 35.7796, 'lon': -78.6382,
+       'speed': 4.5, 'track': 90.0, 'altMSL': 96.0}
+
+
+def test_streams_tpv_and_sky():
+    gpsd = FakeGpsd()
+    client = GpsdClient('127.0.0.1', gpsd.port).start()
+    try:
+        gpsd.accept()
+        assert gpsd.commands[0].startswith(b'?WATCH=')
+        assert client.latest() is None
+        assert client.fix_age() is None
+
+        gpsd.send({'class': 'SKY', 'satellites': [{'used': True}, {'used': True},
+                                                  {'used': False}]})
+        gpsd.send(TPV)
+        assert wait_for(lambda: client.latest() is not None)
+
+        fix = client.latest()
+        assert (fix.lat, fix.lon, fix.mode) == (35.7796, -78.6382, 3)
+        assert fix.speed == 4.5 and fix.track == 90.0 and fix.alt == 96.0
+        assert fix.satellites == 2
+        assert 0 <= client.fix_age() < 1.0
+    finally:
+        client.stop()
+        gpsd.close()
+
+
+def test_reports_split_across_packets():
+    gpsd = FakeGpsd()
+    client = GpsdClient('127.0.0.1', gpsd.port).start()
+    try:
+        gpsd.accept()
+        line = json.dumps(TPV).encode() + b"\n"
+        gpsd.send_raw(b"not json\n" + line[:20])
+        time.sleep(0.05)
+        gpsd.send_raw(line[20:])
+        assert wait_for(lambda: client.reports == 1)
+        assert client.latest().lat == 35.7796
+    finally:
+        client.stop()
+        gpsd.close()
+
+
+def test_bad_reports_do_not_stop_the_reader():
+    class FailingRecorder:
+        def __init__(self):
+            self.calls = 0
+
+        def record(self, fix):
+            self.calls += 1
+            if self.calls == 1:
+                raise OSError("disk full")
+
+    gpsd = FakeGpsd()
+    client = GpsdClient('127.0.0.1', gpsd.port)
+    client.recorder = FailingRecorder()
+    client.start()
+    try:
+        gpsd.accept()
+        gpsd.send_raw(b"[]\n42\n")
+        gpsd.send(dict(TPV, lat="north"))
+        gpsd.send({'class': 'SKY', 'hdop': 0.8, 'uSat': 7})
+        gpsd.send(TPV)
+        gpsd.send(dict(TPV, lat=35.7800))
+        assert wait_for(lambda: client.recorder.calls == 2)
+        assert client.latest().lat == 35.7800 and client.latest().hdop == 0.8
+        assert client.thread.is_alive() and client.connected
+    finally:
+        client.stop()
+        gpsd.close()
+
+
+def test_reconnects_after_gpsd_restart():
+    gpsd = FakeGpsd()
+    client = GpsdClient('127.0.0.1', gpsd.port, reconnect_initial=0.05).start()
+    try:
+        gpsd.accept()
+        gpsd.send(TPV)
+        assert wait_for(lambda: client.reports == 1)
+
+        gpsd.drop()
+        assert wait_for(lambda: not client.connected)
+
+        gpsd.accept()
+        gpsd.send(dict(TPV, lat=35.7800))
+        assert wait_for(lambda: client.reports == 2)
+        assert client.latest().lat == 35.7800
+        assert gpsd.connections == 2 and client.reconnects >= 1
+    finally:
+        client.stop()
+        gpsd.close()
+
+
+def test_fix_age_grows_without_reports():
+    gpsd = FakeGpsd()
+    client = GpsdClient('127.0.0.1', gpsd.port).start()
+    try:
+        gpsd.accept()
+        gpsd.send(TPV)
+        assert wait_for(lambda: client.latest() is not None)
+        time.sleep(0.2)
+        assert client.fix_age() >= 0.2
+    finally:
+        client.stop()
+        gpsd.close()
+
+
+def test_stop_without_gpsd():
+    client = GpsdClient('127.0.0.1', 1, reconnect_initial=0.05).start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    client.stop()
+    assert time.monotonic() - start < 1.0
+    assert client.latest() is None
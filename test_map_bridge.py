@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Test map update batching in the QWebChannel map bridge"""
+
+import os
+import sys
+import json
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from PyQt5.QtCore import QCoreApplication
+
+from ui.map_bridge import MapBridge
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def pump(ms):
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def collect(bridge):
+    batches = []
+    bridge.batch.connect(lambda message: batches.append(json.loads(message)))
+    return batches
+
+
+def test_nothing_is_sent_before_the_page_is_ready():
+    bridge = MapBridge()
+    batches = collect(bridge)
+    bridge.set_center(35.78, -78.63, 17)
+    bridge.set_overlays([("Clubhouse", 35.7796, -78.6382)])
+    pump(40)
+    assert batches == []
+
+    # The (re)loaded page gets the whole current state at once
+    bridge.pageReady()
+    pump(40)
+    assert len(batches) == 1
+    assert batches[0]['view'] == {'lat': 35.78, 'lon': -78.63, 'zoom': 17}
+    assert batches[0]['overlays'] == [["Clubhouse", 35.7796, -78.6382]]
+
+
+def test_updates_are_coalesced_into_one_batch_per_frame():
+    bridge = MapBridge()
+    batches = collect(bridge)
+    bridge.pageReady()
+    for i in range(50):
+        bridge.set_position(35.78 + i * 1e-5, -78.63, 90.0)
+    bridge.set_destination(35.781, -78.631)
+    bridge.set_route([(35.78, -78.63), (35.781, -78.631)])
+    pump(40)
+    assert len(batches) == 1
+    batch = batches[0]
+    assert batch['position']['lat'] == round(35.78 + 49e-5, 7)
+    assert batch['destination'] == [35.781, -78.631]
+    assert len(batch['route']) == 2
+
+    # Back-to-back updates are held to the frame interval
+    sent = []
+    bridge.batch.connect(lambda message: sent.append(time.perf_counter()))
+    start = time.perf_counter()
+    for i in range(5):
+        bridge.set_position(35.78, -78.63 + i * 1e-5)
+        pump(5)
+    pump(60)
+    assert 1 <= len(sent) <= 3
+    assert sent[0] - start < 0.03
+    assert all(b - a >= 0.015 for a, b in zip(sent, sent[1:]))
+
+
+def test_frame_drawn_measures_update_to_redraw_latency():
+    bridge = MapBridge()
+    batches = collect(bridge)
+    bridge.pageReady()
+    bridge.set_center(35.78, -78.63, 18)
+    pump(30)
+    time.sleep(0.02)
+    bridge.frameDrawn(batches[-1]['seq'])
+    assert bridge.last_latency_ms >= 20
+    assert bridge.in_flight == {}
+
+    # Acks for unknown or superseded batches are ignored
+    bridge.frameDrawn(999)
+    assert len(bridge.latencies) == 1
+
+
+def test_prefetched_tiles_accumulate_until_sent():
+    bridge = MapBridge()
+    batches = collect(bridge)
+    bridge.forget_missing([(17, 1, 2)])
+    bridge.pageReady()
+    pump(40)
+    # A freshly loaded page requests every tile itself
+    assert batches == []
+
+    bridge.forget_missing([(17, 1, 2)])
+    bridge.set_position(35.78, -78.63)
+    bridge.forget_missing([(18, 3, 4), (18, 3, 5)])
+    pump(40)
+    assert len(batches) == 1
+    assert batches[0]['tiles'] == ["17/1/2", "18/3/4", "18/3/5"]
+    bridge.set_position(35.79, -78.63)
+    pump(40)
+    assert 'tiles' not in batches[-1]
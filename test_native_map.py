@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test that the native map loads tiles off the paint path and picks up new ones"""
+
+import os
+import sys
+import time
+import threading
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from PyQt5.QtCore import QBuffer, QByteArray
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+import ui.native_map as native_map
+from maps.tile_store import MBTilesStore
+from maps.tiles import deg_to_tile
+from ui.native_map import NativeMapView
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+CENTER = (35.7796, -78.6382)
+ZOOM = 17
+
+
+def png(color):
+    image = QImage(256, 256, QImage.Format_RGB32)
+    image.fill(QColor(color))
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QBuffer.WriteOnly)
+    image.save(buf, 'PNG')
+    return bytes(data)
+
+
+class RecordingStore(MBTilesStore):
+    """Remembers which threads read tiles"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.readers = set()
+
+    def get_tile(self, z, x, y):
+        self.readers.add(threading.current_thread())
+        return super().get_tile(z, x, y)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def center_tile():
+    x, y = deg_to_tile(*CENTER, ZOOM)
+    return ZOOM, int(x), int(y)
+
+
+def make_view(store):
+    view = NativeMapView(store, CENTER, ZOOM)
+    view.resize(600, 400)
+    view.show()
+    return view
+
+
+def test_tiles_load_off_the_paint_path(tmp_path):
+    store = RecordingStore(str(tmp_path / "course.mbtiles"))
+    z, cx, cy = center_tile()
+    for x in range(cx - 2, cx + 3):
+        for y in range(cy - 2, cy + 3):
+            store.put_tile(z, x, y, png("#3a7d44"))
+    view = make_view(store)
+    try:
+        view.repaint()
+        assert store.readers == set()
+        assert wait_for(lambda: view.tile_pixmap(*center_tile()) is not None)
+        assert threading.main_thread() not in store.readers
+
+        # Loaded tiles are drawn straight from the cache
+        assert wait_for(view.loader.idle)
+        app.processEvents()
+        color = view.grab().toImage().pixelColor(300, 200)
+        assert color.name() == "#3a7d44"
+    finally:
+        view.stop_loading()
+
+
+def test_missing_tiles_show_up_once_stored(tmp_path, monkeypatch):
+    store = MBTilesStore(str(tmp_path / "course.mbtiles"))
+    view = make_view(store)
+    key = center_tile()
+    try:
+        view.repaint()
+        assert wait_for(lambda: key in view.missing)
+        assert view.tile_pixmap(*key) is None
+
+        # Stored by the prefetcher, which reports what it fetched
+        store.put_tile(*key, png("#4a9eff"))
+        view.forget_missing([key])
+        assert wait_for(lambda: view.tile_pixmap(*key) is not None)
+        assert key not in view.missing
+
+        # Stored by the seeder, which nobody hears about: looked up again later
+        other = (key[0], key[1] + 1, key[2])
+        assert wait_for(lambda: other in view.missing)
+        store.put_tile(*other, png("#4a9eff"))
+        monkeypatch.setattr(native_map, 'MISSING_RETRY_SECONDS', 0.0)
+        view.update()
+        assert wait_for(lambda: view.tile_pixmap(*other) is not None)
+    finally:
+        view.stop_loading()
+
+
+def test_reads_from_a_replaced_store_are_dropped(tmp_path):
+    old = MBTilesStore(str(tmp_path / "old.mbtiles"))
+    new = MBTilesStore(str(tmp_path / "new.mbtiles"))
+    key = center_tile()
+    old.put_tile(*key, png("#ff0000"))
+    new.put_tile(*key, png("#00ff00"))
+    view = make_view(old)
+    try:
+        view.repaint()
+        view.set_tile_store(new)
+        assert wait_for(lambda: view.tile_pixmap(*key) is not None)
+        assert wait_for(view.loader.idle)
+        app.processEvents()
+        assert view.tile_pixmap(*key).toImage().pixelColor(0, 0).name() == "#00ff00"
+    finally:
+        view.stop_loading()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Test the incremental NMEA parser on sentences split across serial reads"""
+
+import os
+import sys
+import math
+from functools import reduce
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from gps.nmea_reader import KMH_TO_MPS, KNOTS_TO_MPS, NmeaParser, nmea_checksum
+
+
+def sentence(body, checksum=None):
+    """Framed sentence with its checksum (or a given, wrong one)"""
+    if checksum is None:
+        checksum = reduce(lambda a, b: a ^ b, body.encode(), 0)
+    return f"${body}*{checksum:02X}\r\n".encode()
+
+
+def feed_in_pieces(parser, data, size):
+    """Feed data the way a serial port hands it over, size bytes per read"""
+    return sum(parser.feed(data[i:i + size]) for i in range(0, len(data), size))
+
+
+GGA = "GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"
+RMC = "GNRMC,123519,A,4807.100,N,01131.200,E,022.4,084.4,230394,003.1,W"
+VTG = "GPVTG,054.7,T,034.4,M,005.5,N,010.2,K"
+
+
+def test_checksum_matches_plain_xor():
+    for body in (b"", b"G", GGA.encode(), RMC.encode(), VTG.encode() * 3):
+        buf = b"$" + body + b"*"
+        assert nmea_checksum(buf, 1, len(buf) - 1) == reduce(lambda a, b: a ^ b, body, 0)
+
+
+def test_sentences_split_across_reads():
+    data = b"\x00noise" + sentence(GGA) + sentence(VTG) + sentence(RMC)
+    for size in (1, 3, 7, 64, len(data)):
+        parser = NmeaParser()
+        # One epoch, published once the receiver goes quiet
+        assert feed_in_pieces(parser, data, size) + parser.flush() == 1
+        assert not parser.flush()
+        assert parser.sentences == 3 and parser.checksum_errors == 0
+        assert parser.buffer == b""
+
+        fix = parser.fix
+        assert math.isclose(fix.lat, 48 + 7.1 / 60)
+        assert math.isclose(fix.lon, 11 + 31.2 / 60)
+        # RMC's speed and track replace the ones VTG reported
+        assert math.isclose(fix.speed, 22.4 * KNOTS_TO_MPS)
+        assert fix.track == 84.4
+        assert fix.alt == 545.4 and fix.mode == 3
+        assert fix.satellites == 8 and fix.hdop == 0.9
+
+
+def test_one_fix_per_epoch():
+    epochs = [(f"1235{19 + i}", f"4807.{38 + i:03d}") for i in range(3)]
+    data = b"".join(sentence(f"GPGGA,{utc},{lat},N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,") +
+                    sentence(f"GPRMC,{utc},A,{lat},N,01131.000,E,010.0,084.4,230394,,")
+                    for utc, lat in epochs)
+    parser = NmeaParser()
+    fixes = []
+    for i in range(0, len(data), 11):
+        if parser.feed(data[i:i + 11]):
+            fixes.append(parser.fix)
+    # Each epoch is published when the next one starts, the last on flush
+    assert len(fixes) == 2
+    assert parser.flush()
+    fixes.append(parser.fix)
+    assert [round((f.lat - 48) * 60, 3) for f in fixes] == [7.038, 7.039, 7.040]
+    assert all(f.mode == 3 and math.isclose(f.speed, 10 * KNOTS_TO_MPS) for f in fixes)
+
+
+def test_gga_fix_and_vtg_motion():
+    parser = NmeaParser()
+    assert parser.feed(sentence(GGA)) == 0
+    assert parser.flush()
+    fix = parser.fix
+    assert math.isclose(fix.lat, 48 + 7.038 / 60)
+    assert math.isclose(fix.lon, 11 + 31 / 60)
+    assert fix.speed is None and fix.track is None
+
+    # VTG alone updates motion without publishing a new position
+    assert parser.feed(sentence(VTG)) == 0
+    assert not parser.flush()
+    assert parser.fix is fix
+    south_west = GGA.replace("123519", "123520").replace("N,011", "S,011").replace(",E,", ",W,")
+    assert parser.feed(sentence(south_west)) == 0 and parser.flush()
+    fix = parser.fix
+    assert math.isclose(fix.lat, -(48 + 7.038 / 60))
+    assert math.isclose(fix.lon, -(11 + 31 / 60))
+    assert math.isclose(fix.speed, 10.2 * KMH_TO_MPS) and fix.track == 54.7
+
+
+def test_bad_checksums_are_dropped():
+    parser = NmeaParser()
+    good = sentence(GGA)
+    wrong = sentence(RMC, checksum=0x00)
+    corrupted = sentence(RMC).replace(b"4807.100", b"4807.900")
+    unframed = b"$" + RMC.encode() + b"\r\n"
+    assert feed_in_pieces(parser, wrong + corrupted + unframed + good, 5) + parser.flush() == 1
+    assert parser.checksum_errors == 3 and parser.sentences == 1
+    assert math.isclose(parser.fix.lat, 48 + 7.038 / 60)
+    assert parser.fix.speed is None
+
+
+def test_empty_fields():
+    parser = NmeaParser()
+    # No fix yet: empty position and quality 0 publish nothing
+    assert parser.feed(sentence("GPGGA,123519,,,,,0,00,,,M,,M,,")) == 0
+    assert parser.feed(sentence("GPRMC,123519,V,,,,,,,230394,,")) == 0
+    assert not parser.flush()
+    assert parser.fix is None and parser.mode == 1
+
+    # A 2D fix without altitude, speed or track
+    assert parser.feed(sentence("GPGGA,123520,4807.038,N,01131.000,E,1,04,,,M,,M,,")) == 0
+    assert parser.flush()
+    fix = parser.fix
+    assert fix.mode == 2 and fix.alt is None and fix.hdop is None
+    assert fix.satellites == 4 and fix.speed is None and fix.track is None
+
+    # Empty VTG fields keep the last known motion
+    parser.feed(sentence(VTG))
+    parser.feed(sentence("GPVTG,,T,,M,,N,,K"))
+    assert parser.feed(sentence("GPRMC,123521,A,4807.100,N,01131.200,E,,,230394,,")) == 0
+    assert parser.flush()
+    fix = parser.fix
+    assert math.isclose(fix.speed, 10.2 * KMH_TO_MPS) and fix.track == 54.7
+    assert math.isclose(fix.lat, 48 + 7.1 / 60)
+
+    # Losing the fix drops the mode but keeps the last position
+    assert parser.feed(sentence("GPGGA,123522,,,,,0,00,,,M,,M,,")) == 0
+    assert not parser.flush()
+    assert parser.mode == 1 and parser.fix is fix
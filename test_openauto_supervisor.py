@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Test the OpenAuto supervisor against a stub executable"""
+
+import os
+import sys
+import stat
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from PyQt5.QtCore import QCoreApplication, QEvent, QProcess
+
+from carplay.openauto_supervisor import OpenAutoSupervisor
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+# Stands in for OpenAuto: waits for a "phone" on stdin, then reports the
+# first video frame; "crash" exits non-zero, "quit" exits cleanly.
+STUB_OPENAUTO = f"""#!{sys.executable}
+import sys
+print("[OpenAuto] waiting for device", flush=True)
+for line in sys.stdin:
+    command = line.strip()
+    if command == "connect":
+        print("[OpenAuto] [VideoService] first frame", flush=True)
+    elif command == "crash":
+        sys.exit(3)
+    elif command == "quit":
+        sys.exit(0)
+"""
+
+
+def make_stub(tmp_path):
+    path = tmp_path / "openauto"
+    path.write_text(STUB_OPENAUTO)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_warm_standby_records_first_frame_latency(tmp_path):
+    raised = tmp_path / "raised"
+    supervisor = OpenAutoSupervisor(
+        make_stub(tmp_path), ['--fullscreen', '--fps', '30'],
+        raise_command=[sys.executable, '-c', f"open({str(raised)!r}, 'w')"])
+    supervisor.start_standby()
+    assert wait_for(supervisor.is_running)
+    standby_process = supervisor.process
+    # Waiting for a phone it must not cover the home screen
+    assert standby_process.arguments() == ['--fps', '30']
+    assert not raised.exists()
+
+    supervisor.activate()
+    assert supervisor.process is standby_process  # no cold start
+    assert wait_for(raised.exists)
+    supervisor.process.write(b"connect\n")
+    assert wait_for(lambda: supervisor.launch_latencies)
+
+    metrics = supervisor.metrics()
+    assert metrics['launches'] == 1
+    assert 0 <= metrics['last_latency_ms'] < 5000
+    supervisor.stop()
+    assert not supervisor.is_running()
+
+
+def test_crash_restarts_with_backoff(tmp_path):
+    supervisor = OpenAutoSupervisor(make_stub(tmp_path), backoff_initial=0.05, backoff_max=0.2)
+    exited = []
+    supervisor.exited.connect(lambda: exited.append(True))
+    supervisor.start_standby()
+    assert wait_for(supervisor.is_running)
+
+    delays = []
+    for expected in (1, 2, 3, 4):
+        crashed_process = supervisor.process
+        crashed_process.write(b"crash\n")
+        assert wait_for(lambda: supervisor.restart_count == expected)
+        delays.append(supervisor.restart_timer.interval())
+        assert wait_for(lambda: supervisor.process is not crashed_process and supervisor.is_running())
+
+    # Backoff doubles per consecutive crash and is capped
+    assert delays == [50, 100, 200, 200]
+    assert supervisor.consecutive_failures == 4
+    assert not exited
+
+    # Crashed processes are deleted, not left behind as children
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert supervisor.findChildren(QProcess) == [supervisor.process]
+
+    supervisor.stop()
+    assert wait_for(lambda: exited)
+    assert supervisor.restart_count == 4
+
+
+def test_clean_exit_is_not_a_crash(tmp_path):
+    supervisor = OpenAutoSupervisor(make_stub(tmp_path), standby=False)
+    exited = []
+    supervisor.exited.connect(lambda: exited.append(True))
+    supervisor.activate()
+    assert wait_for(supervisor.is_running)
+
+    supervisor.process.write(b"quit\n")
+    assert wait_for(lambda: exited)
+    assert supervisor.restart_count == 0
+    assert not supervisor.restart_timer.isActive()
+
+
+def test_clean_exit_does_not_respawn_standby(tmp_path):
+    supervisor = OpenAutoSupervisor(make_stub(tmp_path), ['--fullscreen'], backoff_initial=0.05)
+    exited = []
+    supervisor.exited.connect(lambda: exited.append(True))
+    supervisor.start_standby()
+    supervisor.activate()
+    assert wait_for(supervisor.is_running)
+
+    supervisor.process.write(b"quit\n")
+    assert wait_for(lambda: exited)
+    assert not wait_for(supervisor.is_running, timeout=0.3)
+    assert not supervisor.restart_timer.isActive()
+
+    # The next phone gets a fullscreen session again
+    supervisor.activate()
+    assert wait_for(supervisor.is_running)
+    assert supervisor.process.arguments() == ['--fullscreen']
+    supervisor.stop()
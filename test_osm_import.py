@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test the streaming OSM importer against generated courses written as OSM XML"""
+
+import os
+import sys
+import gzip
+import json
+import math
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from course.osm_import import import_extract, join_rings, main
+from synthetic_course import generate_course, write_osm_extract
+from course.yardage import YardageEngine
+
+LINKS = generate_course(9)
+SECOND = generate_course(4, seed=3, origin=(35.9, -78.5), name="Second Four")
+
+
+@pytest.fixture(scope='module')
+def extract(tmp_path_factory):
+    path = tmp_path_factory.mktemp('osm') / 'county.osm.gz'
+    with gzip.open(path, 'wt') as f:
+        write_osm_extract(f, [LINKS, SECOND], filler_nodes=5000)
+    return str(path)
+
+
+def test_courses_are_split_and_rebuilt(extract):
+    courses, stats = import_extract(extract)
+    assert [name for name, _ in courses] == ["Synthetic Links", "Second Four"]
+    assert stats.elements > 5000 and stats.passes == 3 and stats.bytes > 0
+
+    course = course_from_geojson(courses[0][1])
+    original = course_from_geojson(LINKS)
+    assert course.holes == original.holes
+    for kind in ('tee', 'green', 'hazard', 'green_middle'):
+        assert (len([f for f in course.features if f.kind == kind]) ==
+                len([f for f in original.features if f.kind == kind]))
+    assert "Hole 1 Tee" in course.destinations()
+    # Water hazards come from multipolygon relations
+    assert any(f.properties.get('hazard') == 'water' and f.geometry == 'Polygon'
+               for f in course.features)
+
+
+def test_features_land_on_the_right_hole(extract):
+    courses, _ = import_extract(extract)
+    course = course_from_geojson(courses[0][1])
+    original = course_from_geojson(LINKS)
+    for feature in course.features:
+        if feature.kind in ('tee', 'green', 'hazard'):
+            lat, lon = feature.anchor
+            match = min((f for f in original.features if f.kind == feature.kind),
+                        key=lambda f: math.hypot(f.anchor[0] - lat, f.anchor[1] - lon))
+            assert feature.hole == match.hole, feature.name
+
+    tee = course.features_for_hole(3, 'tee')[0].anchor
+    imported = YardageEngine(course).green_yards(*tee, 3)
+    expected = YardageEngine(original).green_yards(*tee, 3)
+    assert abs(imported[1] - expected[1]) < 1.0
+    assert imported[0] < imported[1] < imported[2]
+
+
+def test_join_rings_closes_split_outlines():
+    assert join_rings([[1, 2, 3], [3, 4, 1]]) == [[1, 2, 3, 4, 1]]
+    assert join_rings([[1, 2, 3], [1, 4, 3]]) == [[1, 2, 3, 4, 1]]
+    assert join_rings([[1, 2, 3]]) == []
+
+
+def test_cli_needs_a_course_name_when_there_are_several(extract, tmp_path):
+    out = tmp_path / 'course.geojson'
+    assert main([extract, '--out', str(out)]) == 1
+    assert main([extract, '--course', 'second four', '--out', str(out)]) == 0
+    assert course_from_geojson(json.loads(out.read_text())).holes == [1, 2, 3, 4]
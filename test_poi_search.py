@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Test offline POI search: prefix and typo matching, ranking by distance"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from course.poi_search import Poi, PoiIndex, pois_from_course, prefix_edit_distance
+from synthetic_course import generate_course
+
+
+def poi(name, x, y, kind='poi', keywords=''):
+    return Poi(name, kind, 0.0, 0.0, x, y, keywords)
+
+
+INDEX = PoiIndex([
+    poi("North Restroom", 0, 900, 'restroom', 'toilets'),
+    poi("South Restroom", 0, -100, 'restroom', 'toilets'),
+    poi("Snack Bar", 50, 0, 'snack_bar', 'food drinks'),
+    poi("Parking Lot A", 300, 0, 'parking'),
+    poi("Hole 1", 10, 10, 'tee'),
+    poi("Hole 10", 20, 20, 'tee'),
+])
+
+
+def names(results):
+    return [r.poi.name for r in results]
+
+
+def test_prefixes_match_as_you_type_nearest_first():
+    assert names(INDEX.search("res", 0, 0)) == ["South Restroom", "North Restroom"]
+    assert names(INDEX.search("rest", 0, 1000)) == ["North Restroom", "South Restroom"]
+    assert names(INDEX.search("snack b", 0, 0)) == ["Snack Bar"]
+    assert names(INDEX.search("hole 1", 0, 0)) == ["Hole 1", "Hole 10"]
+    # Keywords match too, and every typed word has to
+    assert names(INDEX.search("toil", 0, 0)) == ["South Restroom", "North Restroom"]
+    assert INDEX.search("parking snack", 0, 0) == []
+    assert INDEX.search("  ", 0, 0) == []
+
+
+def test_typos_match_after_exact_prefixes():
+    assert names(INDEX.search("restrom", 0, 0)) == ["South Restroom", "North Restroom"]
+    assert names(INDEX.search("snak bar", 0, 0)) == ["Snack Bar"]
+    assert INDEX.search("parkng")[0].edits == 1
+    assert INDEX.search("xyzzy", 0, 0) == []
+    assert prefix_edit_distance("restrom", "restroom", 2) == 1
+    assert prefix_edit_distance("ab", "xyz", 1) == 2
+
+
+def test_course_pois_prefer_points_and_skip_paths():
+    index = PoiIndex(pois_from_course(course_from_geojson(generate_course(9))))
+    kinds = {p.name: p.kind for p in index.pois}
+    assert kinds["Hole 1"] == 'tee'
+    assert kinds["Snack Bar"] == 'snack_bar'
+    assert not any(kind == 'cart_path' for kind in kinds.values())
+    assert names(index.search("restroom", 0, 0)) == ["Restroom (Hole 4)"]
+    assert names(index.search("food", 0, 0)) == ["Snack Bar"]
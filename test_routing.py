@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test cart-path routing on small hand-built and generated path networks"""
+
+import os
+import sys
+import math
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from course.routing import PathGraph, Router
+from synthetic_course import generate_course
+
+# A loop around a pond with a tail: the straight line from A to C crosses
+# the water, the cart has to go round.
+#
+#   D(0,200) ---- C(200,200)
+#     |             |
+#   A(0,0) ------ B(200,0) ---- E(400,0)
+LOOP = [
+    [(0, 0), (200, 0), (400, 0)],
+    [(200, 0), (200, 200)],
+    [(200, 200), (0, 200), (0, 0)],
+]
+
+
+def dijkstra_length(graph, start, goal):
+    """Reference shortest path between two graph nodes"""
+    best = {start: 0.0}
+    pending = {start}
+    while pending:
+        node = min(pending, key=best.get)
+        pending.remove(node)
+        if node == goal:
+            return best[node]
+        for neighbor, length, _ in graph.adjacency[node]:
+            if best[node] + length < best.get(neighbor, math.inf):
+                best[neighbor] = best[node] + length
+                pending.add(neighbor)
+    return None
+
+
+def polyline_length(points):
+    return sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:]))
+
+
+def test_builds_connected_graph():
+    graph = PathGraph(LOOP)
+    assert len(graph.nodes) == 5
+    assert len(graph.edges) == 5
+
+
+def test_routes_around_along_paths():
+    graph = PathGraph(LOOP)
+    route = graph.route((10, -5), (190, 205))
+    # 5 m onto the path, 190 m to B, 200 m up to C, 10 m back to the target, 5 m off
+    assert math.isclose(route.length, 5 + 190 + 200 + 10 + 5, abs_tol=1e-6)
+    assert math.isclose(polyline_length(route.points), route.length, abs_tol=1e-6)
+    assert route.points[0] == (10, -5) and route.points[-1] == (190, 205)
+
+
+def test_same_edge_route_goes_straight():
+    graph = PathGraph(LOOP)
+    route = graph.route((250, 3), (350, -4))
+    assert math.isclose(route.length, 3 + 100 + 4)
+    assert route.nodes == []
+
+
+def test_unreachable_destination():
+    graph = PathGraph(LOOP + [[(1000, 1000), (1100, 1000)]])
+    assert graph.route((10, 0), (1050, 1000)) is None
+
+
+def test_unreachable_destination_is_not_searched_every_fix():
+    graph = PathGraph(LOOP + [[(1000, 1000), (1100, 1000)]])
+    searches = []
+    route = graph.route
+    graph.route = lambda start, goal: searches.append(start) or route(start, goal)
+    router = Router(graph, retry_distance=50.0)
+    assert router.set_destination((10, 0), (1050, 1000)) is None
+
+    # Fixes close to where the search failed reuse the result
+    for x in (15, 20, 40, 59):
+        assert router.update(x, 0) is None
+    assert searches == [(10, 0)]
+
+    # Far enough away the cart may have reached another path: search again
+    assert router.update(60, 0) is None
+    assert searches == [(10, 0), (60, 0)]
+    assert router.update(70, 0) is None
+    assert len(searches) == 2
+
+    # A new destination is searched straight away
+    router.clear()
+    router.destination = (100, 200)
+    assert math.isclose(router.update(70, 0), 70 + 200 + 100)
+    assert searches[-1] == (70, 0) and router.route is not None
+
+
+def test_matches_dijkstra_on_generated_course():
+    course = course_from_geojson(generate_course(18, seed=3))
+    graph = PathGraph.from_course(course)
+    rng = random.Random(4)
+    for _ in range(30):
+        a, b = rng.sample(range(len(graph.nodes)), 2)
+        route = graph.route(graph.nodes[a], graph.nodes[b])
+        expected = dijkstra_length(graph, a, b)
+        assert route is not None and expected is not None
+        assert math.isclose(route.length, expected, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def test_follows_route_without_rerouting():
+    router = Router(PathGraph(LOOP), speed_mph=10)
+    router.set_destination((30, 0), (190, 200))
+    assert math.isclose(router.remaining, 170 + 200 + 10)
+    remaining = router.update(200, 100)
+    assert math.isclose(remaining, 100 + 10)
+    assert router.reroutes == 0
+    assert math.isclose(router.eta_seconds(), 110 / (10 * 0.44704))
+
+
+def test_reroutes_when_leaving_route():
+    graph = PathGraph(LOOP)
+    router = Router(graph)
+    router.set_destination((390, 0), (10, 200))
+    # Planned via B and C; the cart takes the path west past A instead
+    assert graph.nodes.index((200, 200)) in router.route.nodes
+    remaining = router.update(0, 100)
+    assert router.reroutes == 1
+    assert math.isclose(remaining, 100 + 10)
+    assert math.isclose(remaining, graph.route((0, 100), (10, 200)).length)
+
+
+def test_incremental_reroute_is_optimal():
+    course = course_from_geojson(generate_course(18, seed=5))
+    graph = PathGraph.from_course(course)
+    rng = random.Random(6)
+    for _ in range(20):
+        a, b = rng.sample(range(len(graph.nodes)), 2)
+        router = Router(graph, off_route_distance=5.0)
+        if router.set_destination(graph.nodes[a], graph.nodes[b]) is None:
+            continue
+        # Jump to a random point on the network far from the route
+        stray = graph.nodes[rng.randrange(len(graph.nodes))]
+        stray = (stray[0] + 30, stray[1])
+        remaining = router.update(*stray)
+        full = graph.route(stray, graph.nodes[b])
+        if router.reroutes:
+            assert math.isclose(remaining, full.length, rel_tol=1e-9, abs_tol=1e-6)
+            assert math.isclose(polyline_length(router.route.points), remaining, abs_tol=1e-6)
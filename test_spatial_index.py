@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Test the course spatial index against brute force and hole tracking hysteresis"""
+
+import os
+import sys
+import math
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import Feature, course_from_geojson
+from course.spatial_index import HoleTracker, SpatialIndex
+from synthetic_course import generate_course
+
+
+def hole_outline(index, hole, min_x, max_x):
+    points = [(min_x, 0), (max_x, 0), (max_x, 300), (min_x, 300), (min_x, 0)]
+    return Feature(index, 'hole', f"Hole {hole}", hole, 'Polygon', points, points, {})
+
+
+def two_holes():
+    """Holes 1 and 2 side by side, sharing the boundary at x = 100"""
+    return SpatialIndex([hole_outline(0, 1, 0, 100), hole_outline(1, 2, 100, 200)])
+
+
+def test_nearest_matches_brute_force():
+    course = course_from_geojson(generate_course(18, seed=2))
+    index = SpatialIndex(course.features)
+    xs = [p[0] for f in course.features for p in f.points]
+    ys = [p[1] for f in course.features for p in f.points]
+    rng = random.Random(9)
+    for _ in range(200):
+        x = rng.uniform(min(xs) - 200, max(xs) + 200)
+        y = rng.uniform(min(ys) - 200, max(ys) + 200)
+        n = rng.choice((1, 3, 8))
+        kinds = rng.choice((None, {'green', 'green_middle'}, {'hazard', 'tee'}))
+        max_distance = rng.choice((math.inf, 100.0))
+
+        expected = sorted(d for d in (f.distance(x, y) for f in course.features
+                                      if kinds is None or f.kind in kinds)
+                          if d <= max_distance)[:n]
+        found = index.nearest(x, y, n=n, kinds=kinds, max_distance=max_distance)
+        assert [d for d, _ in found] == expected
+        assert all(math.isclose(d, f.distance(x, y)) for d, f in found)
+
+
+def test_jitter_at_shared_boundary_keeps_hole():
+    tracker = HoleTracker(two_holes(), switch_margin=10.0, dwell=3)
+    assert tracker.update(50, 150) == 1
+    # GPS noise either side of the boundary never gets 10 m into hole 2
+    for x in (95, 104, 98, 109, 101, 106, 99, 108, 103):
+        assert tracker.update(x, 150) == 1
+    assert tracker.candidate_count < tracker.dwell
+
+
+def test_sustained_move_switches_after_dwell():
+    tracker = HoleTracker(two_holes(), switch_margin=10.0, dwell=3)
+    assert tracker.update(50, 150) == 1
+
+    # A brief excursion that comes back starts the count over
+    assert tracker.update(130, 150) == 1
+    assert tracker.update(135, 150) == 1
+    assert tracker.update(90, 150) == 1
+    assert tracker.candidate_count == 0
+
+    assert tracker.update(130, 150) == 1
+    assert tracker.update(140, 150) == 1
+    assert tracker.update(150, 150) == 2
+
+    # Back on the boundary the new hole is kept just the same
+    assert tracker.update(95, 150) == 2
+    assert tracker.update(500, 150) is None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Test the learned cart speed model: statistics, ETA, persistence and rebuild"""
+
+import os
+import sys
+import math
+import random
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from course.geo import LocalProjection
+from course.routing import PathGraph, Router
+from course.speed_model import SpeedModel, rebuild
+
+PROJECTION = LocalProjection(35.78, -78.638)
+
+
+def test_cell_statistics_match_batch_mean_and_variance():
+    model = SpeedModel(PROJECTION, cell_size=10.0)
+    rng = random.Random(1)
+    speeds = [rng.uniform(2.0, 7.0) for _ in range(500)]
+    for speed in speeds:
+        model.add(3.0, 4.0, speed)
+    model.add(3.0, 4.0, 0.1)  # parked, ignored
+
+    count, mean, variance = model.stats(5.0, 9.0)
+    assert count == 500
+    assert math.isclose(mean, statistics.mean(speeds), rel_tol=1e-9)
+    assert math.isclose(variance, statistics.variance(speeds), rel_tol=1e-9)
+    assert model.stats(15.0, 4.0) == (0, None, None)
+
+
+def test_memory_is_bounded():
+    model = SpeedModel(PROJECTION, cell_size=1.0, max_cells=100, max_count=50)
+    for i in range(1000):
+        model.add(i, 0.0, 5.0)
+        model.add(0.0, 0.0, 5.0)
+    assert len(model) == 100
+    assert model.dropped == 900
+    assert model.stats(0.0, 0.0)[0] == 50
+
+
+def test_eta_uses_slow_zone_near_the_green():
+    # 400 m straight path; the last 100 m is a 2 m/s slow zone
+    graph = PathGraph([[(0, 0), (400, 0)]])
+    model = SpeedModel(PROJECTION, cell_size=20.0)
+    for x in range(0, 400, 2):
+        for _ in range(5):
+            model.add(x, 0.0, 2.0 if x >= 300 else 6.0)
+
+    router = Router(graph, speed_mph=15, speed_model=model)
+    router.set_destination((0, 0), (400, 0))
+    assert math.isclose(router.eta_seconds(), 300 / 6.0 + 100 / 2.0, rel_tol=1e-6)
+
+    router.update(200, 3)
+    assert math.isclose(router.eta_seconds(), 100 / 6.0 + 100 / 2.0, rel_tol=1e-6)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    model = SpeedModel(PROJECTION)
+    for i in range(300):
+        model.add(i * 3.0, -i * 2.0, 3.0 + (i % 7) * 0.5)
+    path = str(tmp_path / "speed_model.bin")
+    model.save(path)
+
+    loaded = SpeedModel.load(path, PROJECTION)
+    assert len(loaded) == len(model)
+    for i in range(0, 300, 17):
+        count, mean, variance = loaded.stats(i * 3.0, -i * 2.0)
+        expected = model.stats(i * 3.0, -i * 2.0)
+        assert count == expected[0]
+        assert math.isclose(mean, expected[1], rel_tol=1e-6)
+        assert math.isclose(variance, expected[2], rel_tol=1e-5, abs_tol=1e-6)
+    assert os.path.getsize(path) < 40 + 20 * len(model) + 1
+
+
+def test_rebuild_from_track_directory_matches_streaming(tmp_path):
+    streaming = SpeedModel(PROJECTION)
+    rng = random.Random(4)
+    for track in range(3):
+        lines = ["time,lat,lon,speed"]
+        for i in range(200):
+            x, y = i * 4.0, track * 30.0
+            speed = rng.uniform(3.0, 6.0)
+            lat, lon = (round(v, 8) for v in PROJECTION.to_latlon(x, y))
+            lines.append(f"{1700000000 + i},{lat},{lon},{speed}")
+            streaming.add_latlon(lat, lon, speed)
+        (tmp_path / f"round{track}.csv").write_text("\n".join(lines) + "\n")
+
+    paths = sorted(str(p) for p in tmp_path.glob("*.csv"))
+    rebuilt = rebuild(paths, PROJECTION, workers=2)
+    assert len(rebuilt) == len(streaming)
+    for key in streaming.keys:
+        a = streaming.stats(key[0] * 20.0 + 1, key[1] * 20.0 + 1)
+        b = rebuilt.stats(key[0] * 20.0 + 1, key[1] * 20.0 + 1)
+        assert a[0] == b[0]
+        assert math.isclose(a[1], b[1], rel_tol=1e-9)
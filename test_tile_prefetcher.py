@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Test tile prediction, the download budget and prefetching from a local tile server"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+from course.course_data import course_from_geojson
+from synthetic_course import generate_course
+from maps.seed_tiles import TileFetcher
+from maps.tile_prefetcher import ByteBudget, TilePrefetcher, plan_tiles
+from maps.tile_server import TileServer
+from maps.tile_store import MBTilesStore
+from maps.tiles import deg_to_tile, tile_to_deg, tiles_in_bbox
+
+ZOOMS = [17, 16, 18]
+
+
+def hole_area(course, hole):
+    return [c for f in course.features_for_hole(hole) for c in f.coords]
+
+
+def wait_idle(prefetcher, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not prefetcher.idle():
+        assert time.monotonic() < deadline, "prefetcher did not finish"
+        time.sleep(0.01)
+
+
+def test_plan_follows_heading_and_holes():
+    x, y = 36904, 51568
+    lat, lon = tile_to_deg(x + 0.5, y + 0.5, 17)
+    plan = plan_tiles(lat, lon, 0.0, 8.0, [17], radius=50.0)
+    order = {tile: seconds for seconds, tile in plan}
+    assert plan[0] == (0.0, (17, x, y))
+    # Heading north: the strip runs up the map (decreasing y), nothing behind
+    assert (17, x, y - 2) in order and (17, x, y + 1) not in order
+    assert order[(17, x, y - 1)] < order[(17, x, y - 2)]
+
+    course = course_from_geojson(generate_course(4))
+    tee = next(f for f in course.features_for_hole(2) if f.kind == 'tee')
+    parked = plan_tiles(lat, lon, None, 0.0, ZOOMS, [hole_area(course, 2)])
+    planned = {tile for _, tile in parked}
+    for zoom in ZOOMS:
+        x, y = deg_to_tile(*tee.coords[0], zoom)
+        assert (zoom, int(x), int(y)) in planned
+    # Preferred zoom first among tiles equally far away
+    assert parked[0][1][0] == 17 and [s for s, _ in parked] == sorted(s for s, _ in parked)
+
+
+def test_budget_limits_bytes_per_second():
+    now = [0.0]
+    budget = ByteBudget(1000, clock=lambda: now[0])
+    assert budget.wait_time() == 0.0
+    budget.charge(2500)
+    assert budget.wait_time() == 1.5
+    now[0] = 1.0
+    assert budget.wait_time() == 0.5
+    now[0] = 10.0
+    # Idle time refills up to the burst, not beyond
+    budget.charge(999)
+    assert budget.wait_time() == 0.0 and budget.tokens == 1.0
+
+
+def test_prefetch_from_local_tile_server(tmp_path):
+    course = course_from_geojson(generate_course(4))
+    lats = [c[0] for f in course.features for c in f.coords]
+    lons = [c[1] for f in course.features for c in f.coords]
+    remote = MBTilesStore(str(tmp_path / "remote.mbtiles"))
+    for zoom in ZOOMS:
+        for z, x, y in tiles_in_bbox(min(lats) - 0.02, min(lons) - 0.02,
+                                     max(lats) + 0.02, max(lons) + 0.02, zoom):
+            remote.put_tile(z, x, y, f"tile {z}/{x}/{y}".encode(), commit=False)
+    remote.commit()
+
+    tee = next(f for f in course.features_for_hole(1) if f.kind == 'tee')
+    green = next(f for f in course.features_for_hole(1) if f.kind == 'green_middle')
+    missing = tuple(int(v) for v in deg_to_tile(*green.coords[0], 18))
+    remote.connection().execute(
+        "DELETE FROM tiles WHERE zoom_level=18 AND tile_column=? AND tile_row=?",
+        (missing[0], 2 ** 18 - 1 - missing[1]))
+    remote.commit()
+
+    server = TileServer(remote).start()
+    local = MBTilesStore(str(tmp_path / "cart.mbtiles"))
+    fetcher = TileFetcher(server.base_url + "/tiles/{z}/{x}/{y}.png", timeout=5)
+    prefetcher = TilePrefetcher(local, fetcher).start()
+    try:
+        plan = plan_tiles(*tee.coords[0], 0.0, 4.0, ZOOMS,
+                          [hole_area(course, 1), hole_area(course, 2)])
+        prefetcher.request(plan)
+        wait_idle(prefetcher)
+
+        stats = prefetcher.stats()
+        assert stats.failed == 1 and stats.fetched == len(plan) - 1
+        assert sorted(prefetcher.take_fetched()) == sorted(t for _, t in plan if t != (18,) + missing)
+        assert prefetcher.take_fetched() == []
+
+        # Driving the hole, the map finds every tile it asks for
+        for feature in course.features_for_hole(1):
+            for zoom in ZOOMS:
+                x, y = deg_to_tile(*feature.coords[0], zoom)
+                if (zoom, int(x), int(y)) != (18,) + missing:
+                    data = local.get_tile(zoom, int(x), int(y))
+                    assert data == f"tile {zoom}/{int(x)}/{int(y)}".encode()
+        assert prefetcher.stats().hit_rate == 1.0
+
+        # The same plan again downloads nothing and skips the failed tile
+        prefetcher.request(plan)
+        wait_idle(prefetcher)
+        assert prefetcher.stats()[1:5] == (0, stats.fetched, 1, stats.bytes)
+    finally:
+        prefetcher.stop()
+        server.stop()
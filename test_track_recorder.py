@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test the memory-mapped GPS track ring file and its exporters"""
+
+import io
+import os
+import sys
+import json
+import math
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from gps.fix import GpsFix
+from gps.track_recorder import TrackRecorder, RECORD, HEADER_SIZE, export_gpx, export_geojson
+from course.speed_model import read_gpx_track, read_recorded_track
+from gps.replay import load_recording
+
+T0 = 1714800000.0
+
+
+def fix(i, hdop=0.9):
+    return GpsFix(0.0, 35.78 + i * 1e-5, -78.638 - i * 1e-5, 4.5, (i * 10) % 360, 90.0, 3, 9, hdop)
+
+
+def test_records_round_trip_with_fixed_width(tmp_path):
+    path = str(tmp_path / "cart.trk")
+    recorder = TrackRecorder(path, capacity=100)
+    assert os.path.getsize(path) == HEADER_SIZE + 100 * RECORD.size
+    for i in range(10):
+        assert recorder.record(fix(i, hdop=None if i == 3 else 0.9), when=T0 + i)
+    assert not recorder.record(GpsFix(0.0, None, None, None, None, None, 1, 0), when=T0 + 20)
+    # Thinned to min_interval
+    assert not recorder.record(fix(10), when=T0 + 9.5)
+
+    track = recorder.read_range()
+    recorder.close()
+    assert len(track.time) == 10
+    assert np.allclose(track.lat, [35.78 + i * 1e-5 for i in range(10)], atol=1e-7)
+    assert np.allclose(track.speed, 4.5)
+    assert track.heading[5] == 50.0
+    assert math.isnan(track.hdop[3]) and track.hdop[4] == 0.9
+
+
+def test_ring_overwrites_oldest_and_reopens(tmp_path):
+    path = str(tmp_path / "cart.trk")
+    recorder = TrackRecorder(path, capacity=50)
+    for i in range(120):
+        recorder.record(fix(i), when=T0 + i)
+    recorder.close()
+    size = os.path.getsize(path)
+
+    recorder = TrackRecorder(path, capacity=999)
+    assert recorder.capacity == 50 and len(recorder) == 50
+    for i in range(120, 130):
+        recorder.record(fix(i), when=T0 + i)
+    times = recorder.read_range().time
+    assert list(times) == [T0 + i for i in range(80, 130)]
+    assert list(recorder.read_range(T0 + 100, T0 + 105).time) == [T0 + i for i in range(100, 105)]
+    recorder.close()
+    assert os.path.getsize(path) == size
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.trk"
+    path.write_bytes(b"x" * 200)
+    try:
+        TrackRecorder(str(path))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_exports_gpx_and_geojson(tmp_path):
+    recorder = TrackRecorder(str(tmp_path / "cart.trk"), capacity=20)
+    for i in range(5):
+        recorder.record(fix(i), when=T0 + i * 2)
+    track = recorder.read_range()
+    recorder.close()
+
+    gpx = io.StringIO()
+    export_gpx(track, gpx)
+    ET.fromstring(gpx.getvalue())
+    gpx_path = tmp_path / "round.gpx"
+    gpx_path.write_text(gpx.getvalue())
+    points = read_gpx_track(str(gpx_path))
+    assert [p[0] for p in points] == [T0 + i * 2 for i in range(5)]
+    assert all(p[3] == 4.5 for p in points)
+
+    geojson = io.StringIO()
+    export_geojson(track, geojson)
+    feature = json.loads(geojson.getvalue())["features"][0]
+    assert len(feature["geometry"]["coordinates"]) == 5
+    assert feature["geometry"]["coordinates"][0] == [-78.638, 35.78]
+
+
+def test_unknown_speed_round_trips_as_missing(tmp_path):
+    path = str(tmp_path / "cart.trk")
+    recorder = TrackRecorder(path, capacity=20)
+    # A GGA-only first fix carries no speed
+    recorder.record(fix(0)._replace(speed=None), when=T0)
+    for i in range(1, 4):
+        recorder.record(fix(i), when=T0 + i)
+    track = recorder.read_range()
+    recorder.close()
+    assert math.isnan(track.speed[0]) and np.allclose(track.speed[1:], 4.5)
+
+    points = read_recorded_track(path)
+    assert points[0][3] is None and points[1][3] == 4.5
+    replayed = load_recording(path)
+    assert replayed[0].speed is None
+    assert all(f.speed is not None and f.speed < 5 for f in replayed[1:])
+
+    gpx = io.StringIO()
+    export_gpx(track, gpx)
+    assert gpx.getvalue().count("<speed>") == 3
+    gpx_path = tmp_path / "round.gpx"
+    gpx_path.write_text(gpx.getvalue())
+    assert [p[3] for p in read_gpx_track(str(gpx_path))] == [None, 4.5, 4.5, 4.5]
+
+    geojson = io.StringIO()
+    export_geojson(track, geojson)
+    assert json.loads(geojson.getvalue())["features"][0]["properties"]["speeds"] == \
+        [None, 4.5, 4.5, 4.5]
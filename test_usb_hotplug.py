@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test USB hotplug detection against a fake netlink event source"""
+
+import os
+import sys
+import time
+import socket
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from PyQt5.QtCore import QCoreApplication
+
+from carplay.usb_hotplug import UsbHotplugMonitor, parse_uevent
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+IPHONE = "/devices/platform/soc/usb1/1-1/1-1.2"
+KEYBOARD = "/devices/platform/soc/usb1/1-1/1-1.3"
+
+
+class FakeNetlinkSource:
+    """Stands in for the kernel uevent socket using a datagram socketpair"""
+
+    def __init__(self):
+        self.reader, self.writer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.reader.setblocking(False)
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def read_events(self):
+        events = []
+        while True:
+            try:
+                event = parse_uevent(self.reader.recv(65536))
+            except BlockingIOError:
+                break
+            if event:
+                events.append(event)
+        return events
+
+    def send(self, action, devpath, product, devtype="usb_device"):
+        fields = [f"{action}@{devpath}", f"ACTION={action}", f"DEVPATH={devpath}",
+                  "SUBSYSTEM=usb", f"DEVTYPE={devtype}", f"PRODUCT={product}"]
+        self.writer.send("\0".join(fields).encode() + b"\0")
+
+    def close(self):
+        self.reader.close()
+        self.writer.close()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def make_monitor(present=None):
+    source = FakeNetlinkSource()
+    monitor = UsbHotplugMonitor(source, present)
+    events = []
+    monitor.device_connected.connect(lambda: events.append("connected"))
+    monitor.device_disconnected.connect(lambda: events.append("disconnected"))
+    return source, monitor, events
+
+
+def test_parse_uevent_ignores_udev_rebroadcast():
+    assert parse_uevent(b"libudev\0\xfe\xed\xca\xfe") is None
+    event = parse_uevent(b"add@/devices/x\0ACTION=add\0DEVPATH=/devices/x\0PRODUCT=5ac/12a8/1102\0")
+    assert event["ACTION"] == "add"
+    assert event["PRODUCT"] == "5ac/12a8/1102"
+
+
+def test_apple_device_add_and_remove():
+    source, monitor, events = make_monitor()
+
+    source.send("add", IPHONE, "5ac/12a8/1102")
+    assert wait_for(lambda: events == ["connected"])
+
+    source.send("remove", IPHONE, "5ac/12a8/1102")
+    assert wait_for(lambda: events == ["connected", "disconnected"])
+    monitor.stop()
+
+
+def test_non_apple_devices_and_interfaces_ignored():
+    source, monitor, events = make_monitor()
+
+    source.send("add", KEYBOARD, "46d/c31c/6400")
+    source.send("add", IPHONE + ":1.0", "5ac/12a8/1102", devtype="usb_interface")
+    source.send("add", IPHONE, "5ac/12a8/1102")
+    assert wait_for(lambda: events == ["connected"])
+
+    # Unplugging something else must not drop the CarPlay connection
+    source.send("remove", KEYBOARD, "46d/c31c/6400")
+    app.processEvents()
+    assert events == ["connected"]
+    assert monitor.is_device_present()
+    monitor.stop()
+
+
+def test_already_present_device_disconnects():
+    source, monitor, events = make_monitor(present={IPHONE})
+    assert monitor.is_device_present()
+
+    source.send("remove", IPHONE, "5ac/12a8/1102")
+    assert wait_for(lambda: events == ["disconnected"])
+    monitor.stop()